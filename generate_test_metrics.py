@@ -9,15 +9,28 @@ Ce script crée des métriques artificielles avec des anomalies pour tester l'ag
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import time
-import random
-import math
+import numpy as np
 from datetime import datetime
 
 PUSHGATEWAY_URL = "http://localhost:9091/metrics/job/test_app"
 
-def send_metric(name, value, labels=None):
-    """Envoie une métrique au Pushgateway."""
+# Session partagée: les envois réutilisent la même connexion keep-alive
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+# Tirages aléatoires et sinusoïde pré-calculés une fois en NumPy,
+# indexés ensuite à chaque itération
+SAMPLES_SIZE = 1000
+SINE_TABLE_SIZE = 10000
+_rng = np.random.default_rng()
+NORMAL_SAMPLES = _rng.uniform(-1, 1, size=SAMPLES_SIZE)
+REQUESTS_SAMPLES = _rng.integers(50, 151, size=SAMPLES_SIZE)
+SINE_TABLE = 100 + 50 * np.sin(np.arange(SINE_TABLE_SIZE) * 0.5)
+
+def format_metric(name, value, labels=None):
+    """Formate une métrique au format texte d'exposition Prometheus."""
     metric_data = f"{name}"
     
     if labels:
@@ -25,19 +38,29 @@ def send_metric(name, value, labels=None):
         metric_data += f"{{{label_str}}}"
     
     metric_data += f" {value}\n"
+    return metric_data
+
+def send_metrics(metrics):
+    """Envoie un lot de métriques au Pushgateway en une seule requête."""
+    body = "".join(format_metric(name, value, labels) for name, value, labels in metrics)
     
     try:
-        response = requests.post(PUSHGATEWAY_URL, data=metric_data)
+        response = SESSION.post(PUSHGATEWAY_URL, data=body)
         if response.status_code == 200:
-            print(f"✓ Envoyé: {name}={value}")
+            for name, value, _ in metrics:
+                print(f"✓ Envoyé: {name}={value}")
         else:
             print(f"✗ Erreur: {response.status_code}")
     except Exception as e:
         print(f"✗ Erreur de connexion: {e}")
 
-def generate_normal_data(base=100, variation=10):
-    """Génère une valeur normale avec variation."""
-    return base + random.uniform(-variation, variation)
+def send_metric(name, value, labels=None):
+    """Envoie une métrique au Pushgateway."""
+    send_metrics([(name, value, labels)])
+
+def generate_normal_data(base=100, variation=10, index=0):
+    """Génère une valeur normale avec variation (tirage pré-calculé)."""
+    return base + variation * float(NORMAL_SAMPLES[index % SAMPLES_SIZE])
 
 def main():
     print("🚀 Générateur de Métriques de Test")
@@ -59,31 +82,35 @@ def main():
             print("-" * 50)
             
             # Métrique 1: Valeurs normales
-            normal_value = generate_normal_data(100, 5)
-            send_metric("test_normal_metric", normal_value, {"type": "normal"})
+            normal_value = generate_normal_data(100, 5, iteration)
             
             # Métrique 2: Avec spike occasionnel
             if iteration % 10 == 0:  # Spike toutes les 10 itérations
                 spike_value = 500  # Énorme spike !
                 print("🔥 GÉNÉRATION D'UN SPIKE !")
             else:
-                spike_value = generate_normal_data(100, 10)
-            send_metric("test_spike_metric", spike_value, {"type": "spike"})
+                spike_value = generate_normal_data(100, 10, iteration + SAMPLES_SIZE // 2)
             
             # Métrique 3: Augmentation progressive (threshold)
             threshold_value = 50 + (iteration * 5)  # Augmente progressivement
-            send_metric("test_threshold_metric", threshold_value, {"type": "threshold"})
             
             # Métrique 4: Pattern sinusoïdal
-            sine_value = 100 + (50 * math.sin(iteration * 0.5))
-            send_metric("test_pattern_metric", sine_value, {"type": "pattern"})
+            sine_value = float(SINE_TABLE[iteration % SINE_TABLE_SIZE])
             
             # Métrique 5: Request rate (counter simulé)
-            requests_total = iteration * random.randint(50, 150)
-            send_metric("test_requests_total", requests_total, {
-                "status": "200",
-                "method": "GET"
-            })
+            requests_total = iteration * int(REQUESTS_SAMPLES[iteration % SAMPLES_SIZE])
+            
+            # Un seul POST pour les 5 métriques
+            send_metrics([
+                ("test_normal_metric", normal_value, {"type": "normal"}),
+                ("test_spike_metric", spike_value, {"type": "spike"}),
+                ("test_threshold_metric", threshold_value, {"type": "threshold"}),
+                ("test_pattern_metric", sine_value, {"type": "pattern"}),
+                ("test_requests_total", requests_total, {
+                    "status": "200",
+                    "method": "GET"
+                })
+            ])
             
             print(f"\n💤 Attente 15 secondes...")
             time.sleep(15)
@@ -2,10 +2,11 @@
 """
 Script minimal qui collecte les anomalies et imprime leur JSON via to_orchestrator_dict().
 """
-import json
 import sys
 from pathlib import Path
 
+import orjson
+
 # Assurer que le projet est dans le path
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
@@ -16,9 +17,17 @@ def main():
     agent = MetricsAgent(config_dir="config")
     anomalies = agent.collector.collect_and_analyze()
 
-    out = [a.to_orchestrator_dict() for a in anomalies]
-
-    print(json.dumps(out, indent=2, ensure_ascii=False))
+    # Écriture anomalie par anomalie: pas de liste intermédiaire en mémoire
+    options = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+    sys.stdout.flush()
+    out = sys.stdout.buffer
+    out.write(b'[')
+    sep = b'\n'
+    for a in anomalies:
+        out.write(sep + orjson.dumps(a.to_orchestrator_dict(), option=options))
+        sep = b',\n'
+    out.write(b'\n]\n' if sep != b'\n' else b']\n')
+    out.flush()
 
 
 if __name__ == '__main__':
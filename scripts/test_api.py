@@ -4,7 +4,9 @@ Script de test de l'API pour tester l'agent de détection d'anomalies.
 Teste les endpoints principaux et affiche les résultats en JSON.
 """
 
-import requests
+import asyncio
+import importlib.util
+import httpx
 import json
 import time
 import sys
@@ -20,15 +22,21 @@ class APITester:
     def __init__(self, base_url: str = API_BASE_URL):
         self.base_url = base_url
         self.results = []
+        # Client partagé: une seule connexion (HTTP/2 si h2 est installé)
+        # pour toutes les requêtes, envoyées en parallèle
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=TIMEOUT,
+            http2=importlib.util.find_spec("h2") is not None
+        )
     
-    def _make_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
+    async def _make_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
         """Effectue une requête HTTP."""
-        url = f"{self.base_url}{endpoint}"
         try:
             if method == "GET":
-                response = requests.get(url, timeout=TIMEOUT, **kwargs)
+                response = await self.client.get(endpoint, **kwargs)
             elif method == "POST":
-                response = requests.post(url, timeout=TIMEOUT, **kwargs)
+                response = await self.client.post(endpoint, **kwargs)
             else:
                 raise ValueError(f"Unsupported method: {method}")
             
@@ -39,13 +47,13 @@ class APITester:
                 "data": response.json()
             }
         
-        except requests.exceptions.ConnectTimeout:
+        except httpx.ConnectTimeout:
             return {
                 "success": False,
                 "error": f"Connection timeout. Is the API running at {self.base_url}?",
                 "hint": f"Run: uvicorn src.api:app --host 0.0.0.0 --port 8001 --reload"
             }
-        except requests.exceptions.ConnectionError as e:
+        except httpx.ConnectError as e:
             return {
                 "success": False,
                 "error": f"Connection error: {str(e)}",
@@ -57,35 +65,20 @@ class APITester:
                 "error": str(e)
             }
     
-    def test_root(self):
-        """Teste l'endpoint racine."""
-        print("\n" + "="*60)
-        print("TEST 1: GET / (Root endpoint)")
-        print("="*60)
+    async def _run_test(self, name: str, title: str, method: str, endpoint: str) -> bool:
+        """
+        Exécute un test et affiche son résultat.
         
-        result = self._make_request("GET", "/")
-        self.results.append(("Root", result))
+        L'affichage se fait d'un bloc après la réponse pour que les tests
+        lancés en parallèle ne mélangent pas leurs sorties.
+        """
+        result = await self._make_request(method, endpoint)
+        self.results.append((name, result))
         
-        if result["success"]:
-            print("Status:", result["status_code"])
-            print("Response:")
-            print(json.dumps(result["data"], indent=2, ensure_ascii=False))
-        else:
-            print("Error:", result["error"])
-            if "hint" in result:
-                print("Hint:", result["hint"])
-        
-        return result["success"]
-    
-    def test_health(self):
-        """Teste le health check."""
         print("\n" + "="*60)
-        print("TEST 2: GET /health (Health check)")
+        print(title)
         print("="*60)
         
-        result = self._make_request("GET", "/health")
-        self.results.append(("Health", result))
-        
         if result["success"]:
             print("Status:", result["status_code"])
             print("Response:")
@@ -97,95 +90,37 @@ class APITester:
         
         return result["success"]
     
-    def test_config(self):
+    async def test_root(self):
+        """Teste l'endpoint racine."""
+        return await self._run_test("Root", "TEST 1: GET / (Root endpoint)", "GET", "/")
+    
+    async def test_health(self):
+        """Teste le health check."""
+        return await self._run_test("Health", "TEST 2: GET /health (Health check)", "GET", "/health")
+    
+    async def test_config(self):
         """Teste la récupération de la configuration."""
-        print("\n" + "="*60)
-        print("TEST 3: GET /config (Agent configuration)")
-        print("="*60)
-        
-        result = self._make_request("GET", "/config")
-        self.results.append(("Config", result))
-        
-        if result["success"]:
-            print("Status:", result["status_code"])
-            print("Response:")
-            print(json.dumps(result["data"], indent=2, ensure_ascii=False))
-        else:
-            print("Error:", result["error"])
-        
-        return result["success"]
+        return await self._run_test("Config", "TEST 3: GET /config (Agent configuration)", "GET", "/config")
     
-    def test_detectors(self):
+    async def test_detectors(self):
         """Teste la récupération des détecteurs."""
-        print("\n" + "="*60)
-        print("TEST 4: GET /detectors (Available detectors)")
-        print("="*60)
-        
-        result = self._make_request("GET", "/detectors")
-        self.results.append(("Detectors", result))
-        
-        if result["success"]:
-            print("Status:", result["status_code"])
-            print("Response:")
-            print(json.dumps(result["data"], indent=2, ensure_ascii=False))
-        else:
-            print("Error:", result["error"])
-        
-        return result["success"]
+        return await self._run_test("Detectors", "TEST 4: GET /detectors (Available detectors)", "GET", "/detectors")
     
-    def test_metrics(self):
+    async def test_metrics(self):
         """Teste la récupération des métriques monitorées."""
-        print("\n" + "="*60)
-        print("TEST 5: GET /metrics (Monitored metrics)")
-        print("="*60)
-        
-        result = self._make_request("GET", "/metrics")
-        self.results.append(("Metrics", result))
-        
-        if result["success"]:
-            print("Status:", result["status_code"])
-            print("Response:")
-            print(json.dumps(result["data"], indent=2, ensure_ascii=False))
-        else:
-            print("Error:", result["error"])
-        
-        return result["success"]
+        return await self._run_test("Metrics", "TEST 5: GET /metrics (Monitored metrics)", "GET", "/metrics")
     
-    def test_analyze(self):
+    async def test_analyze(self):
         """Teste une analyse manuelle."""
-        print("\n" + "="*60)
-        print("TEST 6: POST /analyze (Manual analysis)")
-        print("="*60)
-        
-        result = self._make_request("POST", "/analyze")
-        self.results.append(("Analyze", result))
-        
-        if result["success"]:
-            print("Status:", result["status_code"])
-            print("Response:")
-            print(json.dumps(result["data"], indent=2, ensure_ascii=False))
-        else:
-            print("Error:", result["error"])
-        
-        return result["success"]
+        return await self._run_test("Analyze", "TEST 6: POST /analyze (Manual analysis)", "POST", "/analyze")
     
-    def test_anomalies(self):
+    async def test_anomalies(self):
         """Teste la récupération des anomalies."""
-        print("\n" + "="*60)
-        print("TEST 7: GET /anomalies (Detected anomalies)")
-        print("="*60)
-        
-        result = self._make_request("GET", "/anomalies")
-        self.results.append(("Anomalies", result))
-        
-        if result["success"]:
-            print("Status:", result["status_code"])
-            print("Response:")
-            print(json.dumps(result["data"], indent=2, ensure_ascii=False))
-        else:
-            print("Error:", result["error"])
-        
-        return result["success"]
+        return await self._run_test("Anomalies", "TEST 7: GET /anomalies (Detected anomalies)", "GET", "/anomalies")
+    
+    async def aclose(self):
+        """Ferme le client HTTP."""
+        await self.client.aclose()
     
     def print_summary(self):
         """Affiche un résumé des tests."""
@@ -205,53 +140,49 @@ class APITester:
         return success_count == total_count
 
 
-def main():
-    """Fonction principale."""
-    print("\n" + "="*60)
-    print("METRICS AGENT API TEST SUITE")
-    print("="*60)
-    
+async def _run() -> bool:
+    """Exécute les tests et retourne True si tous ont réussi."""
     tester = APITester()
     
-    # Exécuter les tests
-    all_pass = True
-    
     try:
-        # Test 1: Root
-        if not tester.test_root():
-            all_pass = False
+        # Tests 1-5 et 7: GET indépendants, lancés en parallèle
+        root_ok, health_ok, config_ok, detectors_ok, metrics_ok, anomalies_ok = await asyncio.gather(
+            tester.test_root(),
+            tester.test_health(),
+            tester.test_config(),
+            tester.test_detectors(),
+            tester.test_metrics(),
+            tester.test_anomalies()
+        )
+        
+        if not root_ok:
             print("\nWarning: API is not responding. Make sure it's running:")
             print("  cd c:/Users/User/projects/metrics-agent/metrics-agent")
             print("  python -m uvicorn src.api:app --host 0.0.0.0 --port 8001 --reload")
             sys.exit(1)
         
-        # Test 2: Health
-        if not tester.test_health():
-            all_pass = False
-        
-        # Test 3: Config
-        if not tester.test_config():
-            all_pass = False
+        all_pass = all([health_ok, config_ok, detectors_ok, metrics_ok, anomalies_ok])
         
-        # Test 4: Detectors
-        if not tester.test_detectors():
-            all_pass = False
-        
-        # Test 5: Metrics
-        if not tester.test_metrics():
-            all_pass = False
-        
-        # Test 6: Analyze (main test)
-        if not tester.test_analyze():
+        # Test 6: Analyze (POST, exécuté seul)
+        if not await tester.test_analyze():
             print("\nNote: Analysis might have failed if Prometheus is not running.")
             print("Make sure Prometheus is accessible at the configured URL.")
         
-        # Test 7: Anomalies
-        if not tester.test_anomalies():
-            all_pass = False
-        
         # Summary
         tester.print_summary()
+        return all_pass
+    finally:
+        await tester.aclose()
+
+
+def main():
+    """Fonction principale."""
+    print("\n" + "="*60)
+    print("METRICS AGENT API TEST SUITE")
+    print("="*60)
+    
+    try:
+        all_pass = asyncio.run(_run())
         
         if all_pass:
             print("\nAll tests passed!")
@@ -12,6 +12,12 @@ Ce package contient:
 __version__ = "1.0.0"
 __author__ = "Metrics Agent Team"
 
-from .main import MetricsAgent
+__all__ = ['MetricsAgent']
 
-__all__ = ['MetricsAgent']
\ No newline at end of file
+
+def __getattr__(name):
+    """Importe MetricsAgent à la demande (évite de charger toutes les dépendances)."""
+    if name == "MetricsAgent":
+        from .main import MetricsAgent
+        return MetricsAgent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -7,30 +7,64 @@ Point d'entrée HTTP pour:
 - Configurer les détecteurs
 """
 
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from pydantic import BaseModel
-from typing import List, Optional
-from datetime import datetime
+import orjson
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+import asyncio
+import hashlib
 import logging
+import time
 
 from .main import MetricsAgent
 from .models.anomaly import Anomaly
+from .utils.async_prometheus_client import AsyncPrometheusClient
 from .utils.logger import get_logger
 
-# Initialiser FastAPI
-app = FastAPI(
-    title="Metrics Anomaly Detection Agent API",
-    description="API pour tester l'agent de détection d'anomalies de métriques",
-    version="1.0.0"
-)
-
 # Logger
 logger = get_logger()
 
 # Instance globale de l'agent (initialisée au démarrage)
 _agent: Optional[MetricsAgent] = None
 
+# Réponses de configuration pré-calculées au démarrage (/config, /detectors,
+# /metrics): le collecteur et ses détecteurs sont construits une seule fois,
+# ces réponses décrivent donc la configuration effectivement appliquée
+# (une modification des YAML n'est prise en compte qu'au redémarrage)
+_config_cache: Optional[Dict[str, Any]] = None
+_detectors_cache: Optional[Dict[str, Any]] = None
+_metrics_cache: Optional[Dict[str, Any]] = None
+# ETag de ces réponses: hash de leur contenu
+_config_etag: str = ""
+CONFIG_CACHE_CONTROL = "max-age=30"
+
+# Résultat de la dernière analyse (timestamp monotonic, anomalies), partagé
+# entre /analyze et /anomalies pendant _analysis_ttl secondes
+# (api.analysis_cache_ttl dans config.yaml)
+ANALYSIS_CACHE_TTL = 5.0
+_analysis_ttl: float = ANALYSIS_CACHE_TTL
+_last_analysis: Optional[Tuple[float, List[Anomaly]]] = None
+_analysis_lock: Optional[asyncio.Lock] = None
+
+# Horodatage ISO de la seconde courante, recalculé au plus une fois par seconde
+_last_iso_sec: int = -1
+_cached_iso: str = ""
+
+
+def _now_iso() -> str:
+    """Retourne l'heure UTC courante (ISO 8601, à la seconde près)."""
+    global _last_iso_sec, _cached_iso
+    now_sec = int(time.time())
+    if now_sec != _last_iso_sec:
+        _cached_iso = datetime.fromtimestamp(now_sec, timezone.utc).isoformat()
+        _last_iso_sec = now_sec
+    return _cached_iso
+
 
 class AnomalyResponse(BaseModel):
     """Réponse contenant une anomalie détectée."""
@@ -53,23 +87,157 @@ class AnalysisResponse(BaseModel):
     duration_ms: float
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialise l'agent au démarrage de l'API."""
-    global _agent
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Initialise l'agent avant d'accepter des requêtes, puis ferme les
+    connexions HTTP partagées et le thread d'envoi de l'agent à l'arrêt.
+    """
+    global _agent, _analysis_lock, _analysis_ttl
     try:
-        from pathlib import Path
         current_dir = Path(__file__).parent.parent
         config_dir = current_dir / "config"
         
         if not config_dir.exists():
             config_dir = Path("config")
         
-        _agent = MetricsAgent(config_dir=str(config_dir))
+        # Construction bloquante (YAML, client Prometheus) hors de la boucle
+        _agent = await run_in_threadpool(MetricsAgent, config_dir=str(config_dir))
+        app.state.agent = _agent
+        prom_config = _agent.settings.prometheus_config
+        app.state.prom = AsyncPrometheusClient(
+            url=prom_config.get('url', 'http://localhost:9090'),
+            verify_ssl=prom_config.get('verify_ssl', True)
+        )
+        # Valeurs fixes après le démarrage: servies telles quelles par /health
+        app.state.health_payload_template = {
+            "agent_name": _agent.settings.agent_config.get("name", "metrics-agent"),
+            "prometheus_url": prom_config.get("url")
+        }
+        await run_in_threadpool(_rebuild_cache)
+        _analysis_lock = asyncio.Lock()
+        _analysis_ttl = float(
+            _agent.settings.api_config.get('analysis_cache_ttl', ANALYSIS_CACHE_TTL)
+        )
         logger.info("Agent initialized successfully via API startup")
     except Exception as e:
         logger.error(f"Failed to initialize agent: {e}", exc_info=True)
         raise
+    
+    try:
+        yield
+    finally:
+        await app.state.prom.aclose()
+        # Envois en attente vers l'orchestrateur (join borné, hors de la boucle)
+        await run_in_threadpool(_agent.close)
+
+
+# Initialiser FastAPI
+app = FastAPI(
+    title="Metrics Anomaly Detection Agent API",
+    description="API pour tester l'agent de détection d'anomalies de métriques",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
+)
+
+
+def _build_config_payload() -> Dict[str, Any]:
+    """Construit la réponse de /config."""
+    metrics_config = _agent.settings.metrics_config or []
+    return {
+        "agent": _agent.settings.agent_config,
+        "prometheus": _agent.settings.prometheus_config,
+        "detectors": _agent.settings.detectors_config,
+        "metrics_monitored": [m.get("name") for m in metrics_config],
+        "check_interval": _agent.check_interval
+    }
+
+
+def _build_detectors_payload() -> Dict[str, Any]:
+    """Construit la réponse de /detectors."""
+    detectors_info = {}
+    for detector in _agent.collector.detectors:
+        detectors_info[detector.name] = {
+            "enabled": detector.is_enabled(),
+            "class": detector.__class__.__name__,
+            "config": detector.config
+        }
+
+    return {
+        "total_detectors": len(detectors_info),
+        "detectors": detectors_info
+    }
+
+
+def _build_metrics_payload() -> Dict[str, Any]:
+    """Construit la réponse de /metrics."""
+    metrics_list = []
+    for metric_config in _agent.settings.metrics_config or []:
+        metrics_list.append({
+            "name": metric_config.get("name"),
+            "enabled": metric_config.get("enabled", True),
+            "detectors": metric_config.get("detectors", [])
+        })
+
+    return {
+        "total_metrics": len(metrics_list),
+        "metrics": metrics_list
+    }
+
+
+def _compute_config_etag() -> str:
+    """Calcule l'ETag des réponses de configuration (blake2b de leur JSON)."""
+    digest = hashlib.blake2b()
+    for payload in (_config_cache, _detectors_cache, _metrics_cache):
+        digest.update(orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY))
+    return f'"{digest.hexdigest()[:16]}"'
+
+
+def _rebuild_cache():
+    """Reconstruit les réponses de configuration mises en cache."""
+    global _config_cache, _detectors_cache, _metrics_cache, _config_etag
+    _config_cache = _build_config_payload()
+    _detectors_cache = _build_detectors_payload()
+    _metrics_cache = _build_metrics_payload()
+    _config_etag = _compute_config_etag()
+
+
+def _config_response(request: Request, payload: Dict[str, Any]) -> Response:
+    """
+    Sert une réponse de configuration en cache avec son ETag.
+
+    Retourne 304 sans corps si le client possède déjà cette version.
+    """
+    headers = {"ETag": _config_etag, "Cache-Control": CONFIG_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == _config_etag:
+        return Response(status_code=304, headers=headers)
+    return ORJSONResponse(payload, headers=headers)
+
+
+async def _collect_anomalies() -> List[Anomaly]:
+    """
+    Retourne les anomalies de la dernière analyse, en la relançant si besoin.
+
+    La collecte (I/O Prometheus bloquantes) tourne dans le threadpool pour ne
+    pas bloquer la boucle d'événements. Les appels concurrents attendent le
+    verrou puis réutilisent le résultat de l'analyse en cours: une seule
+    collecte par fenêtre de _analysis_ttl secondes, ce qui évite par exemple
+    de relancer la collecte sur /anomalies juste après un /analyze.
+    """
+    global _last_analysis
+
+    if _last_analysis and time.monotonic() - _last_analysis[0] < _analysis_ttl:
+        return _last_analysis[1]
+
+    async with _analysis_lock:
+        # Un autre appel a pu rafraîchir le résultat pendant l'attente
+        if _last_analysis and time.monotonic() - _last_analysis[0] < _analysis_ttl:
+            return _last_analysis[1]
+
+        anomalies = await run_in_threadpool(_agent.collector.collect_and_analyze)
+        _last_analysis = (time.monotonic(), anomalies)
+        return anomalies
 
 
 @app.get("/health")
@@ -80,14 +248,32 @@ async def health_check():
     
     return {
         "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "agent_name": _agent.settings.agent_config.get("name", "metrics-agent"),
-        "prometheus_url": _agent.settings.prometheus_config.get("url")
+        "timestamp": _now_iso(),
+        **app.state.health_payload_template
+    }
+
+
+def _to_response(anomaly: Anomaly) -> Dict[str, Any]:
+    """
+    Convertit une anomalie au format AnomalyResponse.
+
+    Construit directement le dict: les anomalies viennent du process, la
+    validation Pydantic champ par champ est inutile.
+    """
+    return {
+        "metric_name": anomaly.metric_name,
+        "detected_at": anomaly.timestamp.isoformat() if anomaly.timestamp else _now_iso(),
+        "severity": anomaly.severity_str,
+        "value": anomaly.value,
+        "threshold": anomaly.expected_value if anomaly.expected_value else anomaly.value,
+        "description": anomaly.description,
+        "detector": anomaly.detector_name,
+        "recommendations": anomaly.metadata.get('recommendations', []) if anomaly.metadata else None
     }
 
 
-@app.post("/analyze")
-async def analyze_metrics() -> AnalysisResponse:
+@app.post("/analyze", response_model=AnalysisResponse)
+async def analyze_metrics():
     """
     Déclenche une analyse manuelle des métriques.
     
@@ -97,37 +283,22 @@ async def analyze_metrics() -> AnalysisResponse:
         raise HTTPException(status_code=503, detail="Agent not initialized")
     
     try:
-        import time
         start_time = time.time()
         
         # Collecter et analyser les métriques
-        anomalies = _agent.collector.collect_and_analyze()
+        anomalies = await _collect_anomalies()
         
         duration_ms = (time.time() - start_time) * 1000
         
-        # Convertir les anomalies
-        anomalies_response = []
-        for anomaly in anomalies:
-            anomalies_response.append(
-                AnomalyResponse(
-                    metric_name=anomaly.metric_name,
-                    detected_at=anomaly.timestamp.isoformat() if anomaly.timestamp else datetime.now().isoformat(),
-                    severity=anomaly.severity.value,
-                    value=anomaly.value,
-                    threshold=anomaly.expected_value if anomaly.expected_value else anomaly.value,
-                    description=anomaly.description,
-                    detector=anomaly.detector_name,
-                    recommendations=anomaly.metadata.get('recommendations', []) if anomaly.metadata else None
-                )
-            )
-        
-        return AnalysisResponse(
-            success=True,
-            timestamp=datetime.now().isoformat(),
-            anomalies_count=len(anomalies),
-            anomalies=anomalies_response,
-            duration_ms=duration_ms
-        )
+        # AnalysisResponse ne sert qu'au schéma OpenAPI: renvoyer une
+        # Response évite la validation du modèle par FastAPI
+        return ORJSONResponse({
+            "success": True,
+            "timestamp": _now_iso(),
+            "anomalies_count": len(anomalies),
+            "anomalies": [_to_response(anomaly) for anomaly in anomalies],
+            "duration_ms": duration_ms
+        })
     
     except Exception as e:
         logger.error(f"Analysis failed: {e}", exc_info=True)
@@ -143,10 +314,10 @@ async def get_anomalies() -> dict:
         raise HTTPException(status_code=503, detail="Agent not initialized")
     
     try:
-        anomalies = _agent.collector.collect_and_analyze()
+        anomalies = await _collect_anomalies()
         
         return {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _now_iso(),
             "count": len(anomalies),
             "anomalies": [anomaly.to_orchestrator_dict() for anomaly in anomalies]
         }
@@ -157,59 +328,30 @@ async def get_anomalies() -> dict:
 
 
 @app.get("/config")
-async def get_config() -> dict:
+async def get_config(request: Request):
     """Récupère la configuration actuelle de l'agent."""
     if _agent is None:
         raise HTTPException(status_code=503, detail="Agent not initialized")
     
-    return {
-        "agent": _agent.settings.agent_config,
-        "prometheus": _agent.settings.prometheus_config,
-        "detectors": _agent.settings.detectors_config,
-        "metrics_monitored": list(_agent.settings.metrics_config.keys()) if _agent.settings.metrics_config else [],
-        "check_interval": _agent.check_interval
-    }
+    return _config_response(request, _config_cache)
 
 
 @app.get("/detectors")
-async def get_detectors() -> dict:
+async def get_detectors(request: Request):
     """Liste les détecteurs disponibles et leur configuration."""
     if _agent is None:
         raise HTTPException(status_code=503, detail="Agent not initialized")
     
-    detectors_info = {}
-    for detector_name, detector in _agent.collector.detectors.items():
-        detectors_info[detector_name] = {
-            "enabled": True,
-            "class": detector.__class__.__name__,
-            "config": _agent.settings.detectors_config.get(detector_name, {})
-        }
-    
-    return {
-        "total_detectors": len(detectors_info),
-        "detectors": detectors_info
-    }
+    return _config_response(request, _detectors_cache)
 
 
 @app.get("/metrics")
-async def get_monitored_metrics() -> dict:
+async def get_monitored_metrics(request: Request):
     """Liste les métriques monitorées."""
     if _agent is None:
         raise HTTPException(status_code=503, detail="Agent not initialized")
     
-    metrics_list = []
-    if _agent.settings.metrics_config:
-        for metric_name, metric_config in _agent.settings.metrics_config.items():
-            metrics_list.append({
-                "name": metric_name,
-                "enabled": metric_config.get("enabled", True),
-                "detectors": metric_config.get("detectors", [])
-            })
-    
-    return {
-        "total_metrics": len(metrics_list),
-        "metrics": metrics_list
-    }
+    return _config_response(request, _metrics_cache)
 
 
 @app.post("/analyze_metric/{metric_name}")
@@ -222,20 +364,14 @@ async def analyze_specific_metric(metric_name: str) -> dict:
     
     try:
         # Récupérer les données de cette métrique via Prometheus
-        from .utils.prometheus_client import PrometheusClient
-        
-        prom_client = PrometheusClient(
-            url=_agent.settings.prometheus_config.get('url', 'http://localhost:9090')
-        )
-        
-        series_data = prom_client.get_metric_data(metric_name)
+        series_data = await app.state.prom.get_metric_data(metric_name)
         
         if not series_data:
             raise HTTPException(status_code=404, detail=f"Metric '{metric_name}' not found in Prometheus")
         
         return {
             "metric_name": metric_name,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _now_iso(),
             "data_available": len(series_data) > 0,
             "series_count": len(series_data),
             "data_sample": series_data[:10] if series_data else []
@@ -5,24 +5,26 @@ Responsable de la collecte régulière des métriques depuis Prometheus
 et de l'orchestration de la détection d'anomalies.
 """
 
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from itertools import chain
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import os
+import threading
 import time
 
-from ..utils.prometheus_client import PrometheusClient
+from ..utils.prometheus_client import PrometheusClient, BATCH_MAX_QUERIES
 from ..models.metric import Metric
 from ..models.anomaly import Anomaly
-from ..detectors import (
-    SpikeDetector,
-    StatisticalDetector,
-    ThresholdDetector,
-    PatternDetector,
-    LLMValidator
-)
+from ..detectors import DETECTOR_REGISTRY, DetectorPipeline, LLMValidator
 from ..utils.logger import get_logger
 
 logger = get_logger()
 
+# Pas d'échantillonnage des requêtes query_range (1 point par minute)
+QUERY_STEP = "1m"
+QUERY_STEP_SECONDS = 60
+
 
 class PrometheusCollector:
     """
@@ -40,7 +42,9 @@ class PrometheusCollector:
         prometheus_url: str,
         detectors_config: Dict[str, Any],
         metrics_to_monitor: List[Dict[str, Any]],
-        lookback_window: int = 3600
+        lookback_window: int = 3600,
+        max_workers: Optional[int] = None,
+        cache_ttl: float = 0
     ):
         """
         Initialise le collecteur.
@@ -50,32 +54,90 @@ class PrometheusCollector:
             detectors_config: Configuration des détecteurs
             metrics_to_monitor: Liste des métriques à surveiller
             lookback_window: Fenêtre d'analyse en secondes (défaut: 1h)
+            max_workers: Nombre de métriques traitées en parallèle
+                (défaut: variable d'environnement FLT_PARALLELISM, sinon
+                une par métrique dans la limite de 32)
+            cache_ttl: Durée de conservation (secondes) des séries collectées;
+                0 désactive le cache
         """
         self.lookback_window = lookback_window
         self.metrics_to_monitor = metrics_to_monitor
+        # Index nom -> configuration (ordre de la configuration conservé)
+        self._metrics_to_monitor_map: Dict[str, Dict[str, Any]] = {
+            m['name']: m for m in metrics_to_monitor
+        }
+        
+        # Cache des séries: (requête, début, fin, pas) -> (instant monotonic, Metric)
+        self._cache_ttl = cache_ttl
+        self._cache: Dict[Tuple[str, float, float, str], Tuple[float, Metric]] = {}
+        self._cache_lock = threading.Lock()
+        
+        if max_workers is None:
+            max_workers = self._parallelism_from_env() or min(32, len(metrics_to_monitor))
+        max_workers = max(1, max_workers)
         
-        # Initialiser le client Prometheus
+        # Initialiser le client Prometheus (une connexion par thread)
         logger.info(f"Connecting to Prometheus at {prometheus_url}")
-        self.prom_client = PrometheusClient(url=prometheus_url)
+        self.prom_client = PrometheusClient(url=prometheus_url, pool_size=max_workers)
+        
+        # Pool de threads: collecte + détection d'une métrique par tâche
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="prom-fetch"
+        )
         
         # Vérifier la connexion
         if not self.prom_client.check_connection():
+            self.close()
             raise ConnectionError("Cannot connect to Prometheus")
         
         # Initialiser les détecteurs
         self.detectors = self._initialize_detectors(detectors_config)
+        self.pipeline = DetectorPipeline(self.detectors)
         
         # Initialiser le validateur LLM (optionnel)
-        self.llm_validator = LLMValidator(config=detectors_config.get('llm_validator', {}))
+        self.llm_validator = None
+        self._llm_enabled = False
+        try:
+            self.llm_validator = LLMValidator(config=detectors_config.get('llm_validator', {}))
+            self._llm_enabled = self.llm_validator.is_enabled()
+        except Exception as e:
+            logger.error(f"Failed to initialize LLM Validator: {e}")
         
         logger.info(
             f"PrometheusCollector initialized with {len(self.detectors)} detectors "
             f"and {len(self.metrics_to_monitor)} metrics to monitor"
         )
         
-        if self.llm_validator.is_enabled():
+        if self._llm_enabled:
             logger.info("LLM Validator enabled for anomaly enrichment")
     
+    @staticmethod
+    def _parallelism_from_env() -> int:
+        """
+        Lit la variable d'environnement FLT_PARALLELISM.
+        
+        Returns:
+            Nombre de threads demandé, 0 si la variable est absente ou invalide
+        """
+        raw = os.environ.get('FLT_PARALLELISM', '').strip()
+        if not raw:
+            return 0
+        try:
+            return int(raw)
+        except ValueError:
+            logger.warning("Invalid FLT_PARALLELISM value '{}', using default parallelism", raw)
+            return 0
+    
+    def close(self):
+        """
+        Libère le pool de threads et les connexions HTTP vers Prometheus.
+        
+        Les collectes en cours ne sont pas attendues.
+        """
+        self._executor.shutdown(wait=False)
+        self.prom_client.close()
+    
     def _initialize_detectors(self, config: Dict[str, Any]) -> List:
         """
         Initialise tous les détecteurs configurés.
@@ -88,25 +150,13 @@ class PrometheusCollector:
         """
         detectors = []
 
-        # Spike Detector
-        if config.get('spike_detector', {}).get('enabled', True):
-            spike_config = config.get('spike_detector', {})
-            detectors.append(SpikeDetector(config=spike_config))
-
-        # Statistical Detector
-        if config.get('statistical_detector', {}).get('enabled', True):
-            stat_config = config.get('statistical_detector', {})
-            detectors.append(StatisticalDetector(config=stat_config))
-
-        # Threshold Detector
-        if config.get('threshold_detector', {}).get('enabled', True):
-            threshold_config = config.get('threshold_detector', {})
-            detectors.append(ThresholdDetector(config=threshold_config))
-
-        # Pattern Detector
-        if config.get('pattern_detector', {}).get('enabled', True):
-            pattern_config = config.get('pattern_detector', {})
-            detectors.append(PatternDetector(config=pattern_config))
+        for key, detector_class in DETECTOR_REGISTRY:
+            detector_config = config.get(key)
+            if detector_config is None:
+                detector_config = {}
+            elif not detector_config.get('enabled', True):
+                continue
+            detectors.append(detector_class(config=detector_config))
 
         logger.info(f"Initialized {len(detectors)} detectors")
         return detectors
@@ -125,56 +175,36 @@ class PrometheusCollector:
         """
         logger.info("Starting metrics collection and analysis...")
 
-        all_anomalies = []
-
         # Calculer la fenêtre temporelle
-        end_time = datetime.now()
-        start_time = end_time - timedelta(seconds=self.lookback_window)
+        start_epoch, end_epoch = self._time_window()
 
         logger.info(
-            f"Analyzing metrics from {start_time} to {end_time} "
+            f"Analyzing metrics from {datetime.fromtimestamp(start_epoch)} "
+            f"to {datetime.fromtimestamp(end_epoch)} "
             f"({self.lookback_window}s window)"
         )
 
-        # Pour chaque métrique configurée
-        for metric_config in self.metrics_to_monitor:
-            metric_name = metric_config['name']
-
-            try:
-                # Collecter la métrique
-                metric = self._collect_metric(
-                    metric_name,
-                    start_time,
-                    end_time
-                )
-
-                if metric is None or len(metric.values) == 0:
-                    logger.warning(f"No data for metric '{metric_name}'")
-                    continue
-
-                logger.info(
-                    f"Collected {len(metric.values)} points for '{metric_name}'"
-                )
+        # Les noms bruts sont récupérés en une requête groupée, puis chaque
+        # métrique est collectée (si besoin) et analysée dans le pool
+        metric_names = list(self._metrics_to_monitor_map)
+        prefetched = self._collect_batch(metric_names, start_epoch, end_epoch)
 
-                # Appliquer tous les détecteurs
-                metric_anomalies = self._detect_anomalies(metric)
+        futures = [
+            self._executor.submit(
+                self._collect_and_detect_one, metric_name, start_epoch, end_epoch, prefetched
+            )
+            for metric_name in metric_names
+        ]
 
-                if metric_anomalies:
-                    logger.info(
-                        f"Found {len(metric_anomalies)} anomalies in '{metric_name}'"
-                    )
-                    all_anomalies.extend(metric_anomalies)
-
-            except Exception as e:
-                logger.error(f"Error processing metric '{metric_name}': {e}")
-                continue
+        # Résultats dans l'ordre de la configuration, concaténés en une passe
+        all_anomalies = list(chain.from_iterable(self._iter_results(metric_names, futures)))
 
         logger.info(
             f"Statistical detection completed: {len(all_anomalies)} anomalies detected"
         )
 
         # ÉTAPE 3: Validation avec LLM (optionnel)
-        if hasattr(self, 'llm_validator') and self.llm_validator.is_enabled() and all_anomalies:
+        if self._llm_enabled and all_anomalies:
             logger.info("Enriching anomalies with LLM validation...")
             try:
                 all_anomalies = self._enrich_with_llm(all_anomalies)
@@ -187,6 +217,48 @@ class PrometheusCollector:
 
         return all_anomalies
     
+    def collect_many(self, metric_names: List[str]) -> List[Optional[Metric]]:
+        """
+        Collecte plusieurs métriques en parallèle, sans détection.
+        
+        Mêmes chemins que collect_and_analyze: requêtes groupées par lots,
+        puis collecte individuelle dans le pool de threads (connexions
+        keep-alive par thread) pour les métriques restantes.
+        
+        Args:
+            metric_names: Métriques (requêtes PromQL) à collecter
+            
+        Returns:
+            Métriques dans l'ordre de metric_names (None si pas de données
+            ou en cas d'erreur)
+        """
+        start_epoch, end_epoch = self._time_window()
+        collected = self._collect_batch(metric_names, start_epoch, end_epoch)
+        
+        pending = {
+            name: self._executor.submit(self._collect_metric, name, start_epoch, end_epoch)
+            for name in dict.fromkeys(metric_names)
+            if name not in collected
+        }
+        for name, future in pending.items():
+            collected[name] = future.result()
+        
+        return [collected[name] for name in metric_names]
+    
+    def _time_window(self) -> Tuple[float, float]:
+        """
+        Fenêtre d'analyse courante (timestamps Unix, passés tels quels à Prometheus).
+        
+        Returns:
+            Tuple (début, fin)
+        """
+        end_epoch = time.time()
+        if self._cache_ttl > 0:
+            # Fenêtre alignée sur le pas: les cycles successifs d'une même
+            # minute partagent la même clé de cache
+            end_epoch = end_epoch // QUERY_STEP_SECONDS * QUERY_STEP_SECONDS
+        return end_epoch - self.lookback_window, end_epoch
+    
     def _enrich_with_llm(self, anomalies: List[Anomaly]) -> List[Anomaly]:
         """
         Enrichit les anomalies avec validation LLM.
@@ -199,61 +271,178 @@ class PrometheusCollector:
         Returns:
             Anomalies enrichies
         """
-        # Valider avec LLM
-        enriched = self.llm_validator.validate_anomalies(
+        # Valider avec LLM: les résultats sont reportés sur les anomalies
+        return self.llm_validator.validate_anomalies(
             anomalies,
             keep_all=True  # Garder toutes les anomalies avec analysis LLM
         )
+    
+    def _collect_batch(
+        self,
+        metric_names: List[str],
+        start_epoch: float,
+        end_epoch: float
+    ) -> Dict[str, Metric]:
+        """
+        Collecte les métriques par lots de BATCH_MAX_QUERIES requêtes,
+        un seul query_range par lot.
+        
+        Les métriques d'un lot en échec (ex: HTTP 422 sur une expression
+        trop complexe) sont absentes du résultat et seront collectées
+        une par une par _collect_and_detect_one.
+        
+        Args:
+            metric_names: Métriques (requêtes PromQL) à collecter
+            start_epoch: Début de la période (timestamp Unix)
+            end_epoch: Fin de la période (timestamp Unix)
+            
+        Returns:
+            Dictionnaire nom -> Metric (None si pas de données)
+        """
+        collected: Dict[str, Metric] = {}
+        
+        # Les métriques en cache sont servies par _collect_metric
+        to_fetch = [
+            n for n in metric_names
+            if self._get_cached(n, start_epoch, end_epoch) is None
+        ]
+        if len(to_fetch) < 2:
+            return collected
+        
+        for i in range(0, len(to_fetch), BATCH_MAX_QUERIES):
+            chunk = to_fetch[i:i + BATCH_MAX_QUERIES]
+            batch = self.prom_client.get_metrics_range_batch(chunk, start_epoch, end_epoch, step=QUERY_STEP)
+            if batch is None:
+                continue
+            for name in chunk:
+                collected[name] = batch.get(name)
+                self._put_cached(name, start_epoch, end_epoch, collected[name])
         
-        # Convertir back en objets Anomaly
-        result = []
-        for item in enriched:
-            if isinstance(item, Anomaly):
-                result.append(item)
-            elif isinstance(item, dict):
-                # Créer une anomalie depuis le dict enrichi
-                anomaly = Anomaly.from_dict(item)
-                
-                # Ajouter les infos LLM aux metadata
-                if item.get('llm_analysis'):
-                    anomaly.metadata['llm_analysis'] = item['llm_analysis']
-                    anomaly.metadata['llm_validation'] = item.get('llm_validation')
-                
-                result.append(anomaly)
-        
-        return result
+        return collected
+    
+    def _collect_and_detect_one(
+        self,
+        metric_name: str,
+        start_epoch: float,
+        end_epoch: float,
+        prefetched: Optional[Dict[str, Metric]] = None
+    ) -> List[Anomaly]:
+        """
+        Collecte une métrique (sauf si déjà récupérée) puis applique les détecteurs.
+        
+        Args:
+            metric_name: Nom de la métrique
+            start_epoch: Début de la période (timestamp Unix)
+            end_epoch: Fin de la période (timestamp Unix)
+            prefetched: Métriques déjà collectées par _collect_batch
+            
+        Returns:
+            Anomalies détectées sur cette métrique
+        """
+        if prefetched is not None and metric_name in prefetched:
+            metric = prefetched[metric_name]
+        else:
+            metric = self._collect_metric(metric_name, start_epoch, end_epoch)
+        
+        if metric is None or len(metric) == 0:
+            logger.warning("No data for metric '{}'", metric_name)
+            return []
+        
+        logger.info("Collected {} points for '{}'", len(metric), metric_name)
+        
+        # Appliquer tous les détecteurs
+        metric_anomalies = self._detect_anomalies(metric)
+        
+        if metric_anomalies:
+            logger.info("Found {} anomalies in '{}'", len(metric_anomalies), metric_name)
+        
+        return metric_anomalies
     
     def _collect_metric(
         self,
         metric_name: str,
-        start_time: datetime,
-        end_time: datetime
+        start_epoch: float,
+        end_epoch: float
     ) -> Metric:
         """
-        Collecte une métrique depuis Prometheus.
+        Collecte une métrique depuis Prometheus (ou depuis le cache).
         
         Args:
             metric_name: Nom de la métrique
-            start_time: Début de la période
-            end_time: Fin de la période
+            start_epoch: Début de la période (timestamp Unix)
+            end_epoch: Fin de la période (timestamp Unix)
             
         Returns:
             Objet Metric avec les données
         """
+        metric = self._get_cached(metric_name, start_epoch, end_epoch)
+        if metric is not None:
+            return metric
+        
         try:
             metric = self.prom_client.get_metric_range(
                 query=metric_name,
-                start_time=start_time,
-                end_time=end_time,
-                step="1m"  # 1 point par minute
+                start_time=start_epoch,
+                end_time=end_epoch,
+                step=QUERY_STEP
             )
             
+            self._put_cached(metric_name, start_epoch, end_epoch, metric)
             return metric
             
         except Exception as e:
             logger.error(f"Error collecting metric '{metric_name}': {e}")
             return None
     
+    def _get_cached(
+        self,
+        metric_name: str,
+        start_epoch: float,
+        end_epoch: float
+    ) -> Optional[Metric]:
+        """Retourne la série en cache pour cette fenêtre si elle n'a pas expiré."""
+        if self._cache_ttl <= 0:
+            return None
+        
+        key = (metric_name, start_epoch, end_epoch, QUERY_STEP)
+        with self._cache_lock:
+            entry = self._cache.get(key)
+        
+        if entry is None or time.monotonic() - entry[0] >= self._cache_ttl:
+            return None
+        return entry[1]
+    
+    def _put_cached(
+        self,
+        metric_name: str,
+        start_epoch: float,
+        end_epoch: float,
+        metric: Optional[Metric]
+    ):
+        """Met une série en cache et purge les entrées expirées."""
+        if self._cache_ttl <= 0 or metric is None:
+            return
+        
+        now = time.monotonic()
+        key = (metric_name, start_epoch, end_epoch, QUERY_STEP)
+        with self._cache_lock:
+            expired = [k for k, (t, _) in self._cache.items() if now - t >= self._cache_ttl]
+            for k in expired:
+                del self._cache[k]
+            self._cache[key] = (now, metric)
+    
+    def _iter_results(
+        self,
+        metric_names: List[str],
+        futures: List[Future]
+    ) -> Iterator[List[Anomaly]]:
+        """Produit les anomalies de chaque métrique, en ignorant celles en erreur."""
+        for metric_name, future in zip(metric_names, futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                logger.error(f"Error processing metric '{metric_name}': {e}")
+    
     def _detect_anomalies(self, metric: Metric) -> List[Anomaly]:
         """
         Applique tous les détecteurs sur une métrique.
@@ -264,21 +453,19 @@ class PrometheusCollector:
         Returns:
             Liste des anomalies détectées par tous les détecteurs
         """
-        all_anomalies = []
-        
-        for detector in self.detectors:
-            try:
-                anomalies = detector.detect(metric)
-                
-                if anomalies:
-                    logger.debug(f"{detector.name} found {len(anomalies)} anomalies")
-                    all_anomalies.extend(anomalies)
-                    
-            except Exception as e:
-                logger.error(f"Error in {detector.name} for metric '{metric.name}': {e}")
-                continue
+        return self.pipeline.detect(metric)
+    
+    def get_metric_config(self, metric_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Récupère la configuration d'une métrique surveillée.
         
-        return all_anomalies
+        Args:
+            metric_name: Nom de la métrique
+            
+        Returns:
+            Configuration de la métrique ou None si elle n'est pas surveillée
+        """
+        return self._metrics_to_monitor_map.get(metric_name)
     
     def get_metrics_summary(self) -> Dict[str, Any]:
         """
@@ -4,13 +4,100 @@ Système de configuration de l'agent.
 Charge et gère la configuration depuis les fichiers YAML.
 """
 
+import copy
+import hashlib
+import orjson
 import yaml
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from ..utils.logger import get_logger
 
 logger = get_logger()
 
+# Loader libyaml (C) si disponible, sinon le loader Python pur
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Contenu par fichier, avec le (mtime_ns, taille) qui l'a produit: JSON
+# sérialisé (bytes) si l'aller-retour JSON est fidèle, sinon contenu parsé
+_YAML_CACHE: Dict[Path, Tuple[Tuple[int, int], Any]] = {}
+
+
+def load_yaml_cached(path: Path) -> Any:
+    """
+    Charge un fichier YAML en passant par deux niveaux de cache.
+
+    En mémoire: tant que le mtime et la taille du fichier sont inchangés,
+    le contenu est reconstruit depuis sa forme JSON (un seul stat, pas de
+    parsing YAML). Chaque appel retourne une copie indépendante: modifier
+    la configuration d'un Settings n'affecte pas les autres.
+
+    Sur disque: un cache JSON voisin nommé <fichier>.yaml.<hash>.json où
+    <hash> est l'empreinte du contenu YAML: toute modification du fichier
+    change le nom du cache, l'invalidation est donc automatique. Relire du
+    JSON avec orjson est bien plus rapide que parser le YAML.
+
+    Args:
+        path: Chemin du fichier YAML
+
+    Returns:
+        Contenu parsé du fichier
+    """
+    st = path.stat()
+    signature = (st.st_mtime_ns, st.st_size)
+    cached = _YAML_CACHE.get(path)
+    if cached is not None and cached[0] == signature:
+        content = cached[1]
+        if isinstance(content, bytes):
+            return orjson.loads(content)
+        return copy.deepcopy(content)
+
+    data, blob = _load_yaml_file(path)
+    # Le contenu retourné appartient à l'appelant: le cache garde le JSON,
+    # ou à défaut sa propre copie
+    _YAML_CACHE[path] = (signature, blob if blob is not None else copy.deepcopy(data))
+    return data
+
+
+def _load_yaml_file(path: Path) -> Tuple[Any, Optional[bytes]]:
+    """
+    Lit un fichier YAML via son cache JSON voisin (voir load_yaml_cached).
+
+    Returns:
+        Tuple (contenu parsé, JSON du contenu ou None si l'aller-retour
+        JSON n'est pas fidèle)
+    """
+    raw = path.read_bytes()
+    digest = hashlib.blake2b(raw).hexdigest()[:16]
+    cache_file = path.with_name(f"{path.name}.{digest}.json")
+
+    if cache_file.exists():
+        try:
+            blob = cache_file.read_bytes()
+            return orjson.loads(blob), blob
+        except (OSError, orjson.JSONDecodeError) as e:
+            logger.debug(f"Ignoring unreadable config cache {cache_file}: {e}")
+
+    data = yaml.load(raw, Loader=_YAML_LOADER)
+
+    try:
+        blob = orjson.dumps(data)
+        # Ne mettre en cache que si l'aller-retour JSON est fidèle
+        # (pas de dates, clés non-str, etc.)
+        if orjson.loads(blob) != data:
+            return data, None
+    except TypeError as e:
+        logger.debug(f"Config cache not written for {path}: {e}")
+        return data, None
+
+    try:
+        for stale in path.parent.glob(f"{path.name}.*.json"):
+            stale.unlink(missing_ok=True)
+        cache_file.write_bytes(blob)
+    except OSError as e:
+        logger.debug(f"Config cache not written for {path}: {e}")
+
+    return data, blob
+
 
 class Settings:
     """
@@ -31,6 +118,9 @@ class Settings:
         self.config_dir = Path(config_dir)
         self.config: Dict[str, Any] = {}
         self.rules: Dict[str, Any] = {}
+        self._detectors_config: Dict[str, Any] = {}
+        self._metric_rules_flat: Dict[str, Any] = {}
+        self._global_settings: Dict[str, Any] = {}
         
         self._load_configuration()
     
@@ -39,22 +129,27 @@ class Settings:
         # Charger config.yaml
         config_file = self.config_dir / "config.yaml"
         if config_file.exists():
-            with open(config_file, 'r') as f:
-                self.config = yaml.safe_load(f)
+            self.config = load_yaml_cached(config_file)
             logger.info(f"Loaded configuration from {config_file}")
         else:
             logger.warning(f"Config file not found: {config_file}")
             self.config = self._get_default_config()
         
+        # Section lue à chaque accès à detectors_config / get_detector_config
+        self._detectors_config = self.config.get('detectors', {})
+        
         # Charger metrics_rules.yaml
         rules_file = self.config_dir / "metrics_rules.yaml"
         if rules_file.exists():
-            with open(rules_file, 'r') as f:
-                self.rules = yaml.safe_load(f)
+            self.rules = load_yaml_cached(rules_file)
             logger.info(f"Loaded rules from {rules_file}")
         else:
             logger.warning(f"Rules file not found: {rules_file}")
             self.rules = {}
+        
+        # Sections lues par get_metric_rules / get_global_settings
+        self._metric_rules_flat = self.rules.get('rules') or {}
+        self._global_settings = self.rules.get('global_settings') or {}
     
     def _get_default_config(self) -> Dict[str, Any]:
         """Retourne une configuration par défaut."""
@@ -62,7 +157,8 @@ class Settings:
             'prometheus': {
                 'url': 'http://localhost:9090',
                 'timeout': 30,
-                'verify_ssl': False
+                'verify_ssl': False,
+                'cache_ttl': 60
             },
             'agent': {
                 'name': 'metrics-agent',
@@ -103,10 +199,15 @@ class Settings:
         """Configuration de l'orchestrateur."""
         return self.config.get('orchestrator', {})
     
+    @property
+    def api_config(self) -> Dict[str, Any]:
+        """Configuration de l'API HTTP."""
+        return self.config.get('api', {})
+    
     @property
     def detectors_config(self) -> Dict[str, Any]:
         """Configuration des détecteurs."""
-        return self.config.get('detectors', {})
+        return self._detectors_config
     
     @property
     def metrics_config(self) -> list:
@@ -123,7 +224,8 @@ class Settings:
         Returns:
             Configuration du détecteur
         """
-        return self.detectors_config.get(detector_name, {})
+        detector_config = self._detectors_config.get(detector_name)
+        return {} if detector_config is None else detector_config
     
     def get_metric_rules(self, metric_name: str) -> Optional[Dict[str, Any]]:
         """
@@ -135,12 +237,11 @@ class Settings:
         Returns:
             Règles de la métrique ou None
         """
-        rules = self.rules.get('rules', {})
-        return rules.get(metric_name)
+        return self._metric_rules_flat.get(metric_name)
     
     def get_global_settings(self) -> Dict[str, Any]:
         """Récupère les paramètres globaux."""
-        return self.rules.get('global_settings', {})
+        return self._global_settings
     
     def reload(self):
         """Recharge la configuration depuis les fichiers."""
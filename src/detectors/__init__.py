@@ -1,37 +1,61 @@
 """
 Package detectors - Détecteurs d'anomalies.
+
+Les détecteurs (numpy, scipy, groq...) sont importés à la demande, au
+premier accès à leur nom (PEP 562): importer le package seul reste léger.
 """
 
+import importlib
+
 from .base_detector import BaseDetector
-__all__ = ['BaseDetector']
-
-# Import optional detectors safely to allow running without all heavy dependencies
-try:
-    from .spike_detector import SpikeDetector
-    __all__.append('SpikeDetector')
-except Exception:
-    SpikeDetector = None
-
-try:
-    from .statistical_detector import StatisticalDetector
-    __all__.append('StatisticalDetector')
-except Exception:
-    StatisticalDetector = None
-
-try:
-    from .threshold_detector import ThresholdDetector
-    __all__.append('ThresholdDetector')
-except Exception:
-    ThresholdDetector = None
-
-try:
-    from .pattern_detector import PatternDetector
-    __all__.append('PatternDetector')
-except Exception:
-    PatternDetector = None
-
-try:
-    from .llm_validator import LLMValidator
-    __all__.append('LLMValidator')
-except Exception:
-    LLMValidator = None
\ No newline at end of file
+from .pipeline import DetectorPipeline
+
+__all__ = [
+    'BaseDetector',
+    'DetectorPipeline',
+    'SpikeDetector',
+    'StatisticalDetector',
+    'ThresholdDetector',
+    'PatternDetector',
+    'LLMValidator',
+    'DETECTOR_REGISTRY'
+]
+
+# Nom exporté -> module qui le définit
+_LAZY = {
+    'SpikeDetector': '.spike_detector',
+    'StatisticalDetector': '.statistical_detector',
+    'ThresholdDetector': '.threshold_detector',
+    'PatternDetector': '.pattern_detector',
+    'LLMValidator': '.llm_validator',
+}
+
+# Détecteurs instanciés par le collecteur: (clé de configuration, classe).
+# Ajouter un détecteur ici suffit pour qu'il soit pris en compte.
+_REGISTRY_NAMES = [
+    ('spike_detector', 'SpikeDetector'),
+    ('statistical_detector', 'StatisticalDetector'),
+    ('threshold_detector', 'ThresholdDetector'),
+    ('pattern_detector', 'PatternDetector'),
+]
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        # Import optionnel: None si les dépendances du détecteur manquent
+        try:
+            obj = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        except Exception:
+            obj = None
+        globals()[name] = obj
+        return obj
+    if name == 'DETECTOR_REGISTRY':
+        registry = [
+            (key, cls) for key, cls in (
+                (key, __getattr__(class_name)) for key, class_name in _REGISTRY_NAMES
+            )
+            if cls is not None
+        ]
+        globals()[name] = registry
+        return registry
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
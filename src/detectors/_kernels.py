@@ -0,0 +1,113 @@
+"""
+Noyaux numériques compilés avec numba (optionnel).
+
+Boucles de calcul des détecteurs écrites comme fonctions de module sur des
+tableaux NumPy, compilées par @njit quand numba est installé
+(pip install numba). Sans numba, NUMBA_AVAILABLE vaut False et les
+détecteurs gardent leur implémentation NumPy vectorisée: ces fonctions
+restent appelables mais en Python pur (lentes).
+
+Les noyaux sont compilés avec nogil=True: ils relâchent le GIL, de sorte que
+les métriques analysées en parallèle par le pool de threads du collecteur
+s'exécutent réellement sur plusieurs cœurs.
+
+Seules les boucles sans équivalent vectorisé en O(N) ont un noyau: les
+moyennes et écarts-types mobiles restent calculés par PatternDetector à
+partir de sommes cumulées (O(N) quelle que soit la fenêtre).
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Décorateur neutre utilisé quand numba n'est pas installé."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True, nogil=True)
+def ma_deviation_hits(
+    values: np.ndarray,
+    ma: np.ndarray,
+    std: np.ndarray,
+    start: int,
+    threshold: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Points qui s'écartent de la moyenne mobile de plus de 'threshold' σ.
+
+    Les points dont l'écart-type mobile est nul sont ignorés.
+
+    Args:
+        values: Valeurs (float64)
+        ma: Moyennes mobiles
+        std: Écarts-types mobiles
+        start: Premier index analysé
+        threshold: Seuil de déviation (en nombre d'écarts-types)
+
+    Returns:
+        Tuple (index des points retenus, déviations correspondantes)
+    """
+    n = len(values)
+    hits = np.empty(n, dtype=np.int64)
+    deviations = np.empty(n)
+    count = 0
+
+    for i in range(start, n):
+        if std[i] == 0:
+            continue
+        deviation = abs(values[i] - ma[i]) / std[i]
+        if deviation > threshold:
+            hits[count] = i
+            deviations[count] = deviation
+            count += 1
+
+    return hits[:count], deviations[:count]
+
+
+@njit(cache=True, nogil=True)
+def spike_hits(values: np.ndarray, min_change_percent: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Points dont la variation par rapport au point précédent atteint le seuil.
+
+    Même règle que SpikeDetector: passer de 0 à non-zéro compte comme une
+    variation de 100%, 0 -> 0 est ignoré, de même que les transitions
+    depuis ou vers une valeur non finie (NaN, ±Inf).
+
+    Args:
+        values: Valeurs (float64)
+        min_change_percent: Variation minimale en %
+
+    Returns:
+        Tuple (index dans values[1:] des points retenus, variations en %)
+    """
+    n = len(values) - 1
+    hits = np.empty(max(n, 0), dtype=np.int64)
+    changes = np.empty(max(n, 0))
+    count = 0
+
+    for i in range(n):
+        previous = values[i]
+        current = values[i + 1]
+        if not (np.isfinite(previous) and np.isfinite(current)):
+            continue
+        if previous != 0:
+            change = (current - previous) / previous * 100
+        elif current != 0:
+            change = 100.0
+        else:
+            continue
+        if abs(change) >= min_change_percent:
+            hits[count] = i
+            changes[count] = change
+            count += 1
+
+    return hits[:count], changes[:count]
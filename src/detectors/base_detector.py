@@ -6,6 +6,7 @@ Définit l'interface commune que tous les détecteurs doivent implémenter.
 
 from abc import ABC, abstractmethod
 from typing import List, Optional, Dict, Any
+import numpy as np
 from ..models.metric import Metric
 from ..models.anomaly import Anomaly, Severity
 from ..utils.logger import get_logger
@@ -19,6 +20,24 @@ class BaseDetector(ABC):
     
     Chaque détecteur spécifique doit hériter de cette classe
     et implémenter la méthode detect().
+    
+    Calculs numériques: utiliser metric.values_np (tableau float64 partagé,
+    en lecture seule) et metric.timestamps_np (indexé comme values_np)
+    plutôt que de reconstruire des tableaux par détecteur,
+    et garder les boucles numériques dans des fonctions de module (pas des
+    méthodes) prenant et retournant des tableaux NumPy, pour pouvoir les
+    compiler avec numba (@njit) quand il est installé.
+    
+    Les appelants qui peuvent analyser plusieurs fois la même métrique
+    passent par detect_cached, qui mémorise le résultat par version de la
+    métrique; un détecteur dont l'état change (seuils, statistiques
+    cumulées) appelle invalidate_cache.
+    
+    Configuration commune:
+        - enabled: Active le détecteur, défaut True
+        - compute_dtype: Type des tableaux de calcul, défaut "float64";
+          "float32" divise par deux la mémoire parcourue mais arrondit les
+          valeurs à ~7 chiffres significatifs (inadapté aux gros compteurs)
     """
     
     def __init__(self, config: Optional[Dict[str, Any]] = None):
@@ -31,6 +50,9 @@ class BaseDetector(ABC):
         self.config = config or {}
         self.name = self.__class__.__name__
         self.enabled = self.config.get('enabled', True)
+        self.compute_dtype = np.dtype(self.config.get('compute_dtype', 'float64'))
+        # Jeton des résultats mémorisés par detect_cached
+        self._cache_token = object()
         logger.info(f"Initialized detector: {self.name}")
     
     @abstractmethod
@@ -48,6 +70,42 @@ class BaseDetector(ABC):
         """
         pass
     
+    def detect_cached(self, metric: Metric) -> List[Anomaly]:
+        """
+        detect() mémorisé sur la métrique pour sa version courante.
+        
+        Un nouvel appel sur la même métrique, sans point ajouté depuis,
+        retourne les mêmes anomalies sans recalcul. Le cache est porté par
+        la métrique et disparaît avec elle.
+        
+        Args:
+            metric: Métrique à analyser
+            
+        Returns:
+            Liste des anomalies détectées (nouvelle liste, anomalies partagées)
+        """
+        # Détecteur désactivé: ni cache ni accès aux données
+        if not self.enabled:
+            return []
+        
+        cache = metric._detect_cache
+        if cache is None:
+            cache = metric._detect_cache = {}
+        
+        key = (self, self._cache_token)
+        entry = cache.get(key)
+        if entry is not None and entry[0] == metric.version:
+            return list(entry[1])
+        
+        version = metric.version
+        anomalies = self.detect(metric)
+        cache[key] = (version, anomalies)
+        return list(anomalies)
+    
+    def invalidate_cache(self):
+        """Invalide les résultats mémorisés par detect_cached."""
+        self._cache_token = object()
+    
     def is_enabled(self) -> bool:
         """Vérifie si le détecteur est activé."""
         return self.enabled
@@ -63,13 +121,14 @@ class BaseDetector(ABC):
         Returns:
             True si la métrique est valide, False sinon
         """
-        if len(metric.values) < min_points:
-            logger.warning(
-                f"{self.name}: Metric '{metric.name}' has only "
-                f"{len(metric.values)} points (minimum: {min_points})"
-            )
-            return False
-        return True
+        n = len(metric)
+        if n >= min_points:
+            return True
+        logger.warning(
+            f"{self.name}: Metric '{metric.name}' has only "
+            f"{n} points (minimum: {min_points})"
+        )
+        return False
     
     def _create_anomaly(
         self,
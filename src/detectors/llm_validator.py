@@ -9,15 +9,26 @@ This detector uses a free LLM (Groq API with Llama 2/Mixtral) to:
 Conçu pour enrichir (pas remplacer) les détecteurs statistiques.
 """
 
-from typing import List, Optional, Dict, Any
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Dict, Any, Tuple
+import hashlib
+import re
+import time
 from .base_detector import BaseDetector
 from ..models.metric import Metric
 from ..models.anomaly import Anomaly, Severity
-from ..utils.llm_client import get_llm_client, RateLimitError
+from ..utils.llm_client import BatchingLLMClient, get_llm_client, RateLimitError
 from ..utils.logger import get_logger
 
 logger = get_logger()
 
+# Champs du résultat LLM réutilisés pour une anomalie équivalente
+_CACHED_FIELDS = ('llm_validation', 'llm_analysis', 'llm_model')
+
+# Réponses LLM explicitement négatives (faux positifs), en un seul passage
+_NEGATIVE_RE = re.compile(r'\b(?:non|false positive|probably not|unlikely)\b', re.IGNORECASE)
+
 
 class LLMValidator(BaseDetector):
     """
@@ -42,9 +53,28 @@ class LLMValidator(BaseDetector):
         """
         super().__init__(config)
         
+        # Nombre d'appels LLM simultanés
+        self.max_concurrent = self.config.get('max_concurrent', 8)
+        # Nombre d'anomalies validées par requête LLM (1 = une requête par anomalie)
+        self.batch_size = max(1, self.config.get('batch_size', 10))
+        
+        # Cache LRU des réponses LLM: empreinte de l'anomalie -> (instant, résultat)
+        self.cache_ttl = self.config.get('cache_ttl', 86400)
+        self.cache_max_entries = self.config.get('cache_max_entries', 10000)
+        self._llm_cache: 'OrderedDict[bytes, Tuple[float, Dict[str, Any]]]' = OrderedDict()
+        
         # Initialiser le client LLM
         self.llm_client = get_llm_client()
         
+        # Regroupement des appels validate_anomaly concurrents (optionnel)
+        autobatch = self.config.get('autobatch')
+        if self.llm_client and autobatch:
+            self.llm_client = BatchingLLMClient(
+                self.llm_client,
+                max_batch=autobatch.get('max_batch', 8),
+                max_wait_ms=autobatch.get('max_wait_ms', 50)
+            )
+        
         if self.llm_client:
             logger.info("LLMValidator initialized successfully")
         else:
@@ -70,18 +100,56 @@ class LLMValidator(BaseDetector):
         self,
         anomalies: List[Anomaly],
         keep_all: bool = True
-    ) -> List[Dict[str, Any]]:
+    ) -> List[Anomaly]:
         """
         Valide et enrichit une liste d'anomalies avec le LLM.
         
+        Les résultats LLM sont écrits directement sur les anomalies
+        (llm_validated, llm_status, metadata['llm_analysis'], ...):
+        aucune copie ni reconstruction d'objet.
+        
         Args:
             anomalies: Anomalies à valider
             keep_all: Si True, garde toutes les anomalies (avec validation)
                       Si False, filtre les faux positifs
             
+        Returns:
+            Liste des anomalies conservées, enrichies avec l'analyse LLM
+        """
+        kept = []
+        for anomaly, enriched in self._validate(anomalies, keep_all):
+            self._apply_llm_result(anomaly, enriched)
+            kept.append(anomaly)
+        return kept
+    
+    def validate_anomalies_as_dicts(
+        self,
+        anomalies: List[Anomaly],
+        keep_all: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Comme validate_anomalies, mais retourne les anomalies sous forme de
+        dictionnaires (format to_dict enrichi des champs LLM).
+        
+        Args:
+            anomalies: Anomalies (ou dictionnaires) à valider
+            keep_all: Si True, garde toutes les anomalies (avec validation)
+                      Si False, filtre les faux positifs
+            
         Returns:
             Liste des anomalies enrichies avec analyse LLM
         """
+        return [enriched for _, enriched in self._validate(anomalies, keep_all)]
+    
+    def _validate(
+        self,
+        anomalies: List[Anomaly],
+        keep_all: bool
+    ) -> List[Tuple[Any, Dict[str, Any]]]:
+        """
+        Valide les anomalies et retourne les couples (anomalie, dict enrichi)
+        conservés, dans l'ordre d'entrée.
+        """
         if not self.is_enabled():
             logger.debug("LLMValidator is disabled")
             return []
@@ -93,51 +161,226 @@ class LLMValidator(BaseDetector):
         if not anomalies:
             return []
         
-        logger.info(f"Validating {len(anomalies)} anomalies with LLM...")
+        logger.info("Validating {} anomalies with LLM...", len(anomalies))
         
         validated_anomalies = []
         
-        for anomaly in anomalies:
-            try:
-                # Convertir en dict
-                anomaly_dict = anomaly.to_dict() if hasattr(anomaly, 'to_dict') else anomaly
-                # Valider avec LLM
+        anomaly_dicts = [a.to_dict() if hasattr(a, 'to_dict') else a for a in anomalies]
+        keys = [self._cache_key(anomaly_dict) for anomaly_dict in anomaly_dicts]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(anomaly_dicts)
+        
+        # Les anomalies déjà vues (même métrique, type, valeurs...) réutilisent
+        # la réponse LLM en cache, sans appel réseau
+        pending = []
+        for i, key in enumerate(keys):
+            cached = self._cache_get(key)
+            if cached is not None:
+                results[i] = self._enrich(anomaly_dicts[i], cached)
+            else:
+                pending.append(i)
+        
+        if len(pending) < len(keys):
+            logger.info("LLM cache hits: {}/{}", len(keys) - len(pending), len(keys))
+        
+        # Lots de batch_size anomalies (une requête LLM par lot), validés
+        # en parallèle (I/O réseau); résultats dans l'ordre d'entrée.
+        # Sans regroupement (batch_size 1), les requêtes individuelles sont
+        # concurrentes dans une seule boucle asyncio
+        if self.batch_size == 1:
+            chunks = [pending] if pending else []
+            validate = self._validate_each
+        else:
+            chunks = [
+                pending[i:i + self.batch_size]
+                for i in range(0, len(pending), self.batch_size)
+            ]
+            validate = self._validate_chunk
+        if chunks:
+            max_workers = max(1, min(self.max_concurrent, len(chunks)))
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm") as executor:
+                futures = [
+                    executor.submit(validate, [anomaly_dicts[i] for i in chunk])
+                    for chunk in chunks
+                ]
+            
+            for chunk, future in zip(chunks, futures):
                 try:
-                    llm_analysis = self.llm_client.validate_anomaly(anomaly_dict)
-                    # Enrichir l'anomalie
-                    enriched = {
-                        **anomaly_dict,
-                        'llm_validation': llm_analysis.get('llm_validation'),
-                        'llm_analysis': llm_analysis.get('llm_analysis'),
-                        'llm_model': llm_analysis.get('llm_model', 'mixtral-8x7b-32768'),
-                        'llm_validated': True,
-                        'llm_status': 'ok'
-                    }
-                except RateLimitError as re:
-                    logger.warning(f"LLM skipped due to rate limit: {re}")
-                    enriched = {
-                        **anomaly_dict,
-                        'llm_validated': False,
-                        'llm_status': 'rate_limited'
-                    }
+                    enriched_chunk = future.result()
                 except Exception as e:
-                    logger.error(f"LLM validation error: {e}")
-                    enriched = {
-                        **anomaly_dict,
-                        'llm_validated': False,
-                        'llm_status': 'error'
-                    }
-                # Décider si on garde l'anomalie
-                if keep_all or self._should_keep_anomaly(enriched):
-                    validated_anomalies.append(enriched)
-            except Exception as e:
-                logger.error(f"Error validating anomaly: {e}")
-                if keep_all:
-                    validated_anomalies.append(anomaly_dict)
-        
-        logger.info(f"LLM validation completed: {len(validated_anomalies)} anomalies kept")
+                    logger.error(f"Error validating anomaly: {e}")
+                    if keep_all:
+                        for i in chunk:
+                            results[i] = anomaly_dicts[i]
+                    continue
+                
+                for i, enriched in zip(chunk, enriched_chunk):
+                    results[i] = enriched
+                    if enriched.get('llm_status') == 'ok':
+                        self._cache_put(keys[i], enriched)
+        
+        # Décider si on garde chaque anomalie
+        for anomaly, enriched in zip(anomalies, results):
+            if enriched is None:
+                continue
+            if keep_all or self._should_keep_anomaly(enriched):
+                validated_anomalies.append((anomaly, enriched))
+        
+        logger.info("LLM validation completed: {} anomalies kept", len(validated_anomalies))
         return validated_anomalies
     
+    def _cache_key(self, anomaly: Dict[str, Any]) -> bytes:
+        """Empreinte des champs qui déterminent la réponse du LLM."""
+        key = "|".join((
+            str(anomaly.get('metric_name')),
+            str(anomaly.get('anomaly_type')),
+            str(anomaly.get('severity')),
+            str(round(anomaly.get('value') or 0, 2)),
+            str(round(anomaly.get('expected_value') or 0, 2)),
+            str(anomaly.get('detector_name'))
+        ))
+        return hashlib.blake2b(key.encode(), digest_size=16).digest()
+    
+    def _cache_get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        """Retourne le résultat LLM en cache s'il n'a pas expiré."""
+        entry = self._llm_cache.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] >= self.cache_ttl:
+            del self._llm_cache[key]
+            return None
+        self._llm_cache.move_to_end(key)
+        return entry[1]
+    
+    def _cache_put(self, key: bytes, enriched: Dict[str, Any]):
+        """Met en cache le résultat LLM d'une anomalie (éviction LRU)."""
+        self._llm_cache[key] = (
+            time.monotonic(),
+            {field: enriched.get(field) for field in _CACHED_FIELDS}
+        )
+        self._llm_cache.move_to_end(key)
+        while len(self._llm_cache) > self.cache_max_entries:
+            self._llm_cache.popitem(last=False)
+    
+    def _apply_llm_result(self, anomaly: Anomaly, enriched: Dict[str, Any]):
+        """Reporte le résultat LLM d'une anomalie sur l'objet Anomaly."""
+        if enriched.get('llm_analysis'):
+            anomaly.metadata['llm_analysis'] = enriched['llm_analysis']
+            anomaly.metadata['llm_validation'] = enriched.get('llm_validation')
+        if 'llm_validated' in enriched:
+            anomaly.llm_validated = enriched['llm_validated']
+        if 'llm_status' in enriched:
+            anomaly.llm_status = enriched['llm_status']
+    
+    def _validate_chunk(self, chunk: List[Anomaly]) -> List[Dict[str, Any]]:
+        """
+        Valide un lot d'anomalies avec une seule requête LLM.
+        
+        Si la réponse groupée est inexploitable, le lot est revalidé
+        anomalie par anomalie.
+        
+        Args:
+            chunk: Anomalies (ou dicts) du lot
+            
+        Returns:
+            Dictionnaires enrichis, dans l'ordre du lot
+        """
+        if len(chunk) == 1:
+            return [self._validate_one(chunk[0])]
+        
+        anomaly_dicts = [a.to_dict() if hasattr(a, 'to_dict') else a for a in chunk]
+        try:
+            analyses = self.llm_client.validate_anomalies_batch(
+                anomaly_dicts, batch_size=len(anomaly_dicts)
+            )
+        except RateLimitError as re:
+            logger.warning(f"LLM skipped due to rate limit: {re}")
+            return [
+                {**anomaly_dict, 'llm_validated': False, 'llm_status': 'rate_limited'}
+                for anomaly_dict in anomaly_dicts
+            ]
+        except Exception as e:
+            logger.warning(f"Batched LLM validation failed, validating one by one: {e}")
+            return self._validate_each(anomaly_dicts)
+        
+        return [
+            self._enrich(anomaly_dict, llm_analysis)
+            for anomaly_dict, llm_analysis in zip(anomaly_dicts, analyses)
+        ]
+    
+    def _enrich(self, anomaly_dict: Dict[str, Any], llm_analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Ajoute le résultat LLM au dictionnaire de l'anomalie."""
+        return {
+            **anomaly_dict,
+            'llm_validation': llm_analysis.get('llm_validation'),
+            'llm_analysis': llm_analysis.get('llm_analysis'),
+            'llm_model': llm_analysis.get('llm_model', 'mixtral-8x7b-32768'),
+            'llm_validated': True,
+            'llm_status': 'ok'
+        }
+    
+    def _validate_each(self, anomaly_dicts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Valide des anomalies une par une, requêtes LLM concurrentes
+        (au plus max_concurrent simultanées).
+        
+        Args:
+            anomaly_dicts: Anomalies à valider (format to_dict)
+            
+        Returns:
+            Dictionnaires enrichis, dans l'ordre d'entrée
+        """
+        try:
+            analyses = self.llm_client.validate_many_sync(
+                anomaly_dicts, max_concurrency=self.max_concurrent
+            )
+        except Exception as e:
+            logger.error(f"LLM validation error: {e}")
+            analyses = [e] * len(anomaly_dicts)
+        
+        enriched = []
+        for anomaly_dict, llm_analysis in zip(anomaly_dicts, analyses):
+            if isinstance(llm_analysis, RateLimitError):
+                logger.warning(f"LLM skipped due to rate limit: {llm_analysis}")
+                enriched.append({**anomaly_dict, 'llm_validated': False, 'llm_status': 'rate_limited'})
+            elif isinstance(llm_analysis, Exception):
+                logger.error(f"LLM validation error: {llm_analysis}")
+                enriched.append({**anomaly_dict, 'llm_validated': False, 'llm_status': 'error'})
+            else:
+                enriched.append(self._enrich(anomaly_dict, llm_analysis))
+        return enriched
+    
+    def _validate_one(self, anomaly: Anomaly) -> Dict[str, Any]:
+        """
+        Valide une anomalie avec le LLM.
+        
+        Args:
+            anomaly: Anomalie (ou dict) à valider
+            
+        Returns:
+            Dictionnaire de l'anomalie enrichi de l'analyse LLM
+        """
+        # Convertir en dict
+        anomaly_dict = anomaly.to_dict() if hasattr(anomaly, 'to_dict') else anomaly
+        # Valider avec LLM
+        try:
+            llm_analysis = self.llm_client.validate_anomaly(anomaly_dict)
+            # Enrichir l'anomalie
+            return self._enrich(anomaly_dict, llm_analysis)
+        except RateLimitError as re:
+            logger.warning(f"LLM skipped due to rate limit: {re}")
+            return {
+                **anomaly_dict,
+                'llm_validated': False,
+                'llm_status': 'rate_limited'
+            }
+        except Exception as e:
+            logger.error(f"LLM validation error: {e}")
+            return {
+                **anomaly_dict,
+                'llm_validated': False,
+                'llm_status': 'error'
+            }
+    
     def _should_keep_anomaly(self, anomaly: Dict[str, Any]) -> bool:
         """
         Décide si une anomalie doit être conservée basé sur l'analyse LLM.
@@ -152,17 +395,12 @@ class LLMValidator(BaseDetector):
         if not anomaly.get('llm_analysis'):
             return True
         
-        analysis = anomaly['llm_analysis'].lower()
-        
         # Filtrer les réponses explicitement négatives
-        negative_indicators = ['non', 'false positive', 'probably not', 'unlikely']
-        
-        for indicator in negative_indicators:
-            if indicator in analysis:
-                logger.warning(
-                    f"LLM marked as potential false positive: {anomaly.get('metric_name')}"
-                )
-                return False
+        if _NEGATIVE_RE.search(anomaly['llm_analysis']):
+            logger.warning(
+                f"LLM marked as potential false positive: {anomaly.get('metric_name')}"
+            )
+            return False
         
         return True
     
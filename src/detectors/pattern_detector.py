@@ -17,10 +17,11 @@ Méthodes utilisées:
 - Simple pattern matching: Comparaison avec le comportement historique
 """
 
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import numpy as np
 from scipy import signal
 
+from ._kernels import NUMBA_AVAILABLE, ma_deviation_hits
 from .base_detector import BaseDetector
 from ..models.metric import Metric
 from ..models.anomaly import Anomaly, AnomalyType, Severity
@@ -28,6 +29,33 @@ from ..utils.logger import get_logger
 
 logger = get_logger()
 
+# Sévérité selon la déviation (en σ): ]2.5, 3] LOW, ]3, 4] MEDIUM, > 4 HIGH
+_DEVIATION_SEVERITY_BOUNDS = (3.0, 4.0)
+_DEVIATION_SEVERITIES = (Severity.LOW, Severity.MEDIUM, Severity.HIGH)
+
+
+def _cumulative_sums(values: np.ndarray) -> Tuple[float, np.ndarray, np.ndarray]:
+    """
+    Sommes cumulées partagées par les calculs sur fenêtres glissantes.
+    
+    Les valeurs sont centrées sur leur moyenne (niveau) pour limiter la
+    perte de précision; cs[k] et cs2[k] sont les sommes des k premières
+    valeurs centrées et de leurs carrés, accumulées en float64.
+    
+    Returns:
+        Tuple (niveau, cs, cs2)
+    """
+    n = len(values)
+    level = float(values.mean()) if n else 0.0
+    centered = values - level
+    cs = np.empty(n + 1)
+    cs[0] = 0.0
+    np.cumsum(centered, dtype=np.float64, out=cs[1:])
+    cs2 = np.empty(n + 1)
+    cs2[0] = 0.0
+    np.cumsum(centered * centered, dtype=np.float64, out=cs2[1:])
+    return level, cs, cs2
+
 
 class PatternDetector(BaseDetector):
     """
@@ -41,6 +69,8 @@ class PatternDetector(BaseDetector):
     Configuration:
         - window_size: Taille de la fenêtre d'analyse (nombre de points)
         - seasonality_period: Période de saisonnalité attendue
+        - change_point_sigma: Seuil des changements de tendance, en
+          écarts-types du score de rupture, défaut 3.0
     """
     
     def __init__(self, config=None):
@@ -53,9 +83,10 @@ class PatternDetector(BaseDetector):
         # Initialiser le parent en premier
         super().__init__(config)
         
-        # Paramètres
-        self.window_size = self.config.get('window_size', 24)
+        # Paramètres (convertis une fois pour les calculs)
+        self.window_size = int(self.config.get('window_size', 24))
         self.seasonality_period = self.config.get('seasonality_period', 3600)
+        self.change_point_sigma = float(self.config.get('change_point_sigma', 3.0))
         
         logger.info(
             f"PatternDetector configured: window_size={self.window_size}, "
@@ -81,14 +112,17 @@ class PatternDetector(BaseDetector):
             return []
         
         anomalies = []
-        values = np.array(metric.get_values_array())
+        values = np.asarray(metric.values_np, dtype=self.compute_dtype)
+        timestamps = metric.timestamps_np
+        # Sommes cumulées calculées une fois pour les deux détections
+        sums = _cumulative_sums(values)
         
         # Détection 1: Changements de tendance brusques
-        trend_anomalies = self._detect_trend_changes(metric, values)
+        trend_anomalies = self._detect_trend_changes(metric, values, timestamps, sums)
         anomalies.extend(trend_anomalies)
         
         # Détection 2: Déviations par rapport à la moyenne mobile
-        ma_anomalies = self._detect_moving_average_deviations(metric, values)
+        ma_anomalies = self._detect_moving_average_deviations(metric, values, timestamps, sums)
         anomalies.extend(ma_anomalies)
         
         logger.info(
@@ -99,77 +133,79 @@ class PatternDetector(BaseDetector):
     def _detect_trend_changes(
         self,
         metric: Metric,
-        values: np.ndarray
+        values: np.ndarray,
+        timestamps: np.ndarray,
+        sums: Optional[Tuple[float, np.ndarray, np.ndarray]] = None
     ) -> List[Anomaly]:
         """
-        Détecte les changements brusques de tendance.
+        Détecte les changements brusques de tendance (ruptures de niveau).
         
-        Utilise la dérivée première pour identifier où la tendance change.
+        Méthode à fenêtres glissantes: pour chaque point t, compare la
+        fenêtre de h points qui le précède à celle de h points qui commence
+        en t. Le score est le gain de coût L2 obtenu en coupant en t:
+        c(y[t-h:t+h]) - c(y[t-h:t]) - c(y[t:t+h]) = h/2 * (m_avant - m_après)²,
+        calculé pour tous les t à partir d'une seule somme cumulée. Les pics
+        du score au-dessus de moyenne + change_point_sigma * écart-type
+        sont des changements de tendance.
         
         Args:
             metric: Métrique source
             values: Array de valeurs
+            timestamps: Timestamps des valeurs
+            sums: Sommes cumulées de _cumulative_sums (calculées si absentes)
             
         Returns:
             Liste d'anomalies
         """
         anomalies = []
         
-        # Calculer la dérivée (gradient)
-        gradient = np.gradient(values)
+        n = len(values)
+        h = max(self.window_size // 2, 2)
+        if n < 2 * h:
+            return []
         
-        # Lisser le gradient pour réduire le bruit
-        window = self.window_size // 2
-        smoothed_gradient = np.convolve(
-            gradient,
-            np.ones(window) / window,
-            mode='valid'
-        )
+        # Moyennes (centrées) des fenêtres avant/après chaque t
+        level, cs, _ = sums if sums is not None else _cumulative_sums(values)
+        t = np.arange(h, n - h + 1)
+        means_before = (cs[t] - cs[t - h]) / h
+        means_after = (cs[t + h] - cs[t]) / h
+        scores = 0.5 * h * (means_before - means_after) ** 2
         
-        # Détecter les changements de signe du gradient (inversions de tendance)
-        sign_changes = np.diff(np.sign(smoothed_gradient))
+        # Série sans rupture (ex: constante)
+        if not scores.any():
+            return []
         
-        # Trouver les inversions significatives
-        significant_changes = np.where(np.abs(sign_changes) > 0)[0]
+        # Pics du score: au plus un changement par demi-fenêtre
+        threshold = scores.mean() + self.change_point_sigma * scores.std()
+        peaks, _ = signal.find_peaks(scores, height=threshold, distance=h)
         
-        for idx in significant_changes:
-            # Ajuster l'index à cause du smoothing et du diff
-            real_idx = idx + window // 2 + 1
-            
-            if real_idx >= len(values):
-                continue
-            
+        spread = float(np.std(values))
+        
+        for peak in peaks.tolist():
+            real_idx = peak + h
             value = values[real_idx]
+            before = float(means_before[peak]) + level
+            after = float(means_after[peak]) + level
             
-            # Déterminer le type de changement
-            before_trend = np.mean(gradient[max(0, real_idx-5):real_idx])
-            after_trend = np.mean(gradient[real_idx:min(len(gradient), real_idx+5)])
-            
-            if before_trend > 0 and after_trend < 0:
-                trend_type = "hausse vers baisse"
-                severity = Severity.MEDIUM
-            elif before_trend < 0 and after_trend > 0:
-                trend_type = "baisse vers hausse"
-                severity = Severity.MEDIUM
-            else:
-                continue
-            
-            description = f"Changement de tendance détecté: {trend_type}"
+            trend_type = "hausse" if after > before else "baisse"
+            description = f"Changement de tendance détecté: {trend_type} du niveau"
             
             # Confiance basée sur l'amplitude du changement
-            confidence = min(abs(after_trend - before_trend) / np.std(gradient), 1.0)
+            confidence = min(abs(after - before) / spread, 1.0)
             
             anomaly = self._create_anomaly(
                 metric=metric,
                 anomaly_type=AnomalyType.PATTERN_ANOMALY,
-                severity=severity,
-                timestamp=metric.values[real_idx].timestamp,
+                severity=Severity.MEDIUM,
+                timestamp=timestamps[real_idx],
                 value=value,
                 confidence=confidence,
                 description=description,
+                expected_value=before,
                 metadata={
-                    'trend_before': round(float(before_trend), 4),
-                    'trend_after': round(float(after_trend), 4),
+                    'mean_before': round(before, 4),
+                    'mean_after': round(after, 4),
+                    'change_score': round(float(scores[peak]), 4),
                     'trend_type': trend_type,
                     'detection_method': 'trend_change'
                 }
@@ -182,7 +218,9 @@ class PatternDetector(BaseDetector):
     def _detect_moving_average_deviations(
         self,
         metric: Metric,
-        values: np.ndarray
+        values: np.ndarray,
+        timestamps: np.ndarray,
+        sums: Optional[Tuple[float, np.ndarray, np.ndarray]] = None
     ) -> List[Anomaly]:
         """
         Détecte les déviations significatives par rapport à la moyenne mobile.
@@ -193,76 +231,94 @@ class PatternDetector(BaseDetector):
         Args:
             metric: Métrique source
             values: Array de valeurs
+            timestamps: Timestamps des valeurs
+            sums: Sommes cumulées de _cumulative_sums (calculées si absentes)
             
         Returns:
             Liste d'anomalies
         """
         anomalies = []
         
-        # Calculer la moyenne mobile
-        ma = self._calculate_moving_average(values, self.window_size)
+        start_idx = self.window_size
         
-        # Calculer l'écart-type mobile
-        ma_std = self._calculate_moving_std(values, self.window_size)
+        # Moyenne et écart-type mobiles en O(N), à partir des sommes cumulées
+        ma = self._calculate_moving_average(values, self.window_size, sums)
+        ma_std = self._calculate_moving_std(values, self.window_size, sums)
         
-        # Pour chaque point (après la fenêtre initiale)
-        start_idx = self.window_size
+        if NUMBA_AVAILABLE:
+            # Sélection des points en une passe dans le noyau compilé
+            values = np.ascontiguousarray(values, dtype=np.float64)
+            hits, hit_deviations = ma_deviation_hits(values, ma, ma_std, start_idx, 2.5)
+        else:
+            # Déviation en nombre d'écarts-types de chaque point (après la
+            # fenêtre initiale); points sans variabilité ignorés (déviation 0)
+            std_tail = ma_std[start_idx:]
+            deviations = np.zeros(len(std_tail))
+            np.divide(
+                np.abs(values[start_idx:] - ma[start_idx:]),
+                std_tail,
+                out=deviations,
+                where=std_tail != 0
+            )
+            
+            # Seuil: 2.5 écarts-types
+            offsets = np.flatnonzero(deviations > 2.5)
+            hits = start_idx + offsets
+            hit_deviations = deviations[offsets]
+        
+        # Un point par épisode: maxima locaux de la déviation parmi les points
+        # retenus, espacés d'au moins window_size // 4 points (zéros en
+        # bordure pour que le premier et le dernier point puissent être retenus)
+        if len(hits) > 1:
+            padded = np.zeros(len(values) + 2)
+            padded[hits + 1] = hit_deviations
+            peaks, _ = signal.find_peaks(padded, distance=max(1, self.window_size // 4))
+            hits = peaks - 1
+            hit_deviations = padded[peaks]
         
-        for i in range(start_idx, len(values)):
+        # Seuls les points retenus sont parcourus
+        severity_levels = np.digitize(hit_deviations, _DEVIATION_SEVERITY_BOUNDS, right=True)
+        
+        for i, deviation, level in zip(hits, hit_deviations, severity_levels):
             value = values[i]
             expected = ma[i]
             std = ma_std[i]
+            severity = _DEVIATION_SEVERITIES[level]
             
-            # Si pas de variabilité, skip
-            if std == 0:
-                continue
+            # Calculer la confiance
+            confidence = min(deviation / 5.0, 1.0)
             
-            # Calculer la déviation en nombre d'écarts-types
-            deviation = abs(value - expected) / std
+            description = (
+                f"Déviation du pattern normal: valeur={value:.2f}, "
+                f"attendu≈{expected:.2f} (écart de {deviation:.2f}σ)"
+            )
             
-            # Seuil: 2.5 écarts-types
-            if deviation > 2.5:
-                # Calculer la sévérité
-                if deviation > 4.0:
-                    severity = Severity.HIGH
-                elif deviation > 3.0:
-                    severity = Severity.MEDIUM
-                else:
-                    severity = Severity.LOW
-                
-                # Calculer la confiance
-                confidence = min(deviation / 5.0, 1.0)
-                
-                description = (
-                    f"Déviation du pattern normal: valeur={value:.2f}, "
-                    f"attendu≈{expected:.2f} (écart de {deviation:.2f}σ)"
-                )
-                
-                anomaly = self._create_anomaly(
-                    metric=metric,
-                    anomaly_type=AnomalyType.PATTERN_ANOMALY,
-                    severity=severity,
-                    timestamp=metric.values[i].timestamp,
-                    value=value,
-                    confidence=confidence,
-                    description=description,
-                    expected_value=expected,
-                    metadata={
-                        'deviation_sigma': round(float(deviation), 2),
-                        'moving_average': round(float(expected), 2),
-                        'moving_std': round(float(std), 2),
-                        'detection_method': 'moving_average'
-                    }
-                )
-                
-                anomalies.append(anomaly)
+            anomaly = self._create_anomaly(
+                metric=metric,
+                anomaly_type=AnomalyType.PATTERN_ANOMALY,
+                severity=severity,
+                timestamp=timestamps[i],
+                value=value,
+                confidence=confidence,
+                description=description,
+                expected_value=expected,
+                metadata={
+                    'deviation_sigma': round(float(deviation), 2),
+                    'moving_average': round(float(expected), 2),
+                    'moving_std': round(float(std), 2),
+                    'detection_method': 'moving_average'
+                }
+            )
+            
+            anomalies.append(anomaly)
         
         return anomalies
     
     def _calculate_moving_average(
         self,
         values: np.ndarray,
-        window: int
+        window: int,
+        sums: Optional[Tuple[float, np.ndarray, np.ndarray]] = None
     ) -> np.ndarray:
         """
         Calcule la moyenne mobile.
@@ -270,27 +326,30 @@ class PatternDetector(BaseDetector):
         Args:
             values: Valeurs à traiter
             window: Taille de la fenêtre
+            sums: Sommes cumulées de _cumulative_sums (calculées si absentes)
             
         Returns:
             Array de moyennes mobiles (même taille que values)
         """
-        # Utiliser pandas rolling serait plus simple, mais on fait à la main
-        ma = np.zeros(len(values))
+        # Sommes cumulées des valeurs centrées sur le niveau
+        level, cs, _ = sums if sums is not None else _cumulative_sums(values)
+        n = len(values)
         
-        for i in range(len(values)):
-            if i < window:
-                # Pour les premiers points, utiliser ce qu'on a
-                ma[i] = np.mean(values[:i+1])
-            else:
-                # Moyenne des 'window' derniers points
-                ma[i] = np.mean(values[i-window:i])
+        ma = np.empty(n)
+        # Pour les premiers points, utiliser ce qu'on a (point courant inclus)
+        head = min(window, n)
+        ma[:head] = cs[1:head + 1] / np.arange(1, head + 1)
+        # Ensuite, moyenne des 'window' points précédents (point courant exclu)
+        ma[head:] = (cs[head:n] - cs[:n - head]) / window
+        ma += level
         
         return ma
     
     def _calculate_moving_std(
         self,
         values: np.ndarray,
-        window: int
+        window: int,
+        sums: Optional[Tuple[float, np.ndarray, np.ndarray]] = None
     ) -> np.ndarray:
         """
         Calcule l'écart-type mobile.
@@ -298,16 +357,36 @@ class PatternDetector(BaseDetector):
         Args:
             values: Valeurs à traiter
             window: Taille de la fenêtre
+            sums: Sommes cumulées de _cumulative_sums (calculées si absentes)
             
         Returns:
             Array d'écarts-types mobiles
         """
-        std = np.zeros(len(values))
+        n = len(values)
+        if n == 0:
+            return np.zeros(0)
+        
+        # Fenêtre de chaque point [starts, ends): mêmes bornes que la
+        # moyenne mobile (début de série inclusif, puis 'window' points précédents)
+        head = min(window, n)
+        starts = np.zeros(n, dtype=np.intp)
+        starts[head:] = np.arange(n - head)
+        ends = np.arange(1, n + 1)
+        ends[head:] = np.arange(head, n)
+        counts = ends - starts
+        
+        # Variance = moyenne des carrés - carré de la moyenne, à partir des
+        # sommes cumulées des valeurs centrées
+        _, cs, cs2 = sums if sums is not None else _cumulative_sums(values)
+        
+        mean = (cs[ends] - cs[starts]) / counts
+        var = (cs2[ends] - cs2[starts]) / counts - mean * mean
+        std = np.sqrt(np.maximum(var, 0.0))
         
-        for i in range(len(values)):
-            if i < window:
-                std[i] = np.std(values[:i+1])
-            else:
-                std[i] = np.std(values[i-window:i])
+        # Fenêtres constantes: écart-type exactement nul (comme np.std),
+        # sans résidu d'arrondi des sommes cumulées
+        changes = np.zeros(n, dtype=np.intp)
+        np.cumsum(values[1:] != values[:-1], out=changes[1:])
+        std[changes[ends - 1] == changes[starts]] = 0.0
         
-        return std
\ No newline at end of file
+        return std
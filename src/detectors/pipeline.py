@@ -0,0 +1,71 @@
+"""
+Exécution groupée des détecteurs sur une métrique.
+
+Tous les détecteurs lisent les mêmes tableaux partagés de la métrique
+(values_np, timestamps_np) et ses statistiques cumulées (mean, std), construits
+au premier accès puis réutilisés; les résultats de chaque détecteur sont
+mémorisés par version de la métrique.
+"""
+
+from itertools import chain
+from typing import Iterator, List, Sequence
+
+from .base_detector import BaseDetector
+from ..models.metric import Metric
+from ..models.anomaly import Anomaly
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+
+class DetectorPipeline:
+    """
+    Applique une liste de détecteurs à une métrique.
+    
+    Les détecteurs désactivés sont ignorés; un détecteur en erreur est
+    ignoré (erreur journalisée) sans empêcher les suivants de s'exécuter.
+    """
+    
+    def __init__(self, detectors: Sequence[BaseDetector]):
+        """
+        Initialise le pipeline.
+        
+        Args:
+            detectors: Détecteurs à appliquer, dans l'ordre
+        """
+        self.detectors = list(detectors)
+    
+    def detect(self, metric: Metric) -> List[Anomaly]:
+        """
+        Applique tous les détecteurs sur une métrique.
+        
+        Args:
+            metric: Métrique à analyser
+            
+        Returns:
+            Anomalies de tous les détecteurs, dans l'ordre des détecteurs
+        """
+        return list(chain.from_iterable(self.iter_detections(metric)))
+    
+    def iter_detections(self, metric: Metric) -> Iterator[List[Anomaly]]:
+        """Produit les anomalies de chaque détecteur, en ignorant ceux en erreur."""
+        for detector in self.detectors:
+            if not detector.enabled:
+                continue
+            
+            detector_name = detector.name
+            try:
+                anomalies = detector.detect_cached(metric)
+            except Exception as e:
+                logger.error(f"Error in {detector_name} for metric '{metric.name}': {e}")
+                continue
+            
+            if anomalies:
+                logger.debug("{} found {} anomalies", detector_name, len(anomalies))
+                yield anomalies
+    
+    def __len__(self) -> int:
+        return len(self.detectors)
+    
+    def __repr__(self) -> str:
+        return f"DetectorPipeline({', '.join(d.name for d in self.detectors)})"
@@ -18,6 +18,7 @@ c'est un pic de +100% (très suspect!)
 from typing import List
 import numpy as np
 
+from ._kernels import NUMBA_AVAILABLE, spike_hits
 from .base_detector import BaseDetector
 from ..models.metric import Metric
 from ..models.anomaly import Anomaly, AnomalyType, Severity
@@ -25,6 +26,11 @@ from ..utils.logger import get_logger
 
 logger = get_logger()
 
+# Sévérité selon l'amplitude du changement (%): < 75 LOW, [75, 100[ MEDIUM,
+# [100, 200[ HIGH, >= 200 CRITICAL
+_SEVERITY_BOUNDS = (75, 100, 200)
+_SEVERITIES = (Severity.LOW, Severity.MEDIUM, Severity.HIGH, Severity.CRITICAL)
+
 
 class SpikeDetector(BaseDetector):
     """
@@ -45,9 +51,9 @@ class SpikeDetector(BaseDetector):
         # Initialiser le parent en premier
         super().__init__(config)
         
-        # Paramètres de configuration
-        self.sensitivity = self.config.get('sensitivity', 0.8)
-        self.min_change_percent = self.config.get('min_change_percent', 50.0)
+        # Paramètres de configuration (convertis une fois pour les calculs)
+        self.sensitivity = float(self.config.get('sensitivity', 0.8))
+        self.min_change_percent = float(self.config.get('min_change_percent', 50.0))
         
         logger.info(
             f"SpikeDetector configured: sensitivity={self.sensitivity}, "
@@ -72,62 +78,77 @@ class SpikeDetector(BaseDetector):
             return []
         
         anomalies = []
-        values = metric.get_values_array()
+        values = np.asarray(metric.values_np, dtype=self.compute_dtype)
+        timestamps = metric.timestamps_np
+        previous = values[:-1]
+        current = values[1:]
         
-        # Calculer les changements percentuels entre chaque point
-        for i in range(1, len(values)):
-            previous_value = values[i - 1]
-            current_value = values[i]
+        if NUMBA_AVAILABLE and values.dtype == np.float64:
+            # Balayage en une passe dans le noyau compilé
+            hits, hit_changes = spike_hits(
+                np.ascontiguousarray(values), self.min_change_percent
+            )
+        else:
+            # Changements percentuels entre chaque point, calculés en une passe;
+            # passer de 0 à non-zéro compte comme un spike de 100%
+            nonzero_previous = previous != 0
+            ratios = np.zeros(len(current))
+            with np.errstate(invalid='ignore'):  # NaN/±Inf: écartés ci-dessous
+                np.divide(current - previous, previous, out=ratios, where=nonzero_previous)
+            percent_changes = np.where(nonzero_previous, ratios * 100, 100.0)
             
-            # Éviter la division par zéro
-            if previous_value == 0:
-                if current_value != 0:
-                    # Si on passe de 0 à non-zéro, c'est un spike de 100%
-                    percent_change = 100.0
-                else:
-                    continue
+            # Points dépassant le seuil (0 -> 0 ignoré: pas de changement;
+            # transitions depuis ou vers NaN/±Inf ignorées)
+            finite = np.isfinite(values)
+            hits = np.flatnonzero(
+                (np.abs(percent_changes) >= self.min_change_percent)
+                & (nonzero_previous | (current != 0))
+                & finite[:-1] & finite[1:]
+            )
+            hit_changes = percent_changes[hits]
+        
+        abs_changes = np.abs(hit_changes)
+        severities = np.digitize(abs_changes, _SEVERITY_BOUNDS)
+        
+        # Seuls les points retenus sont parcourus pour créer les anomalies
+        for i, percent_change, abs_change, current_value, previous_value, level in zip(
+            hits.tolist(),
+            hit_changes.tolist(),
+            abs_changes.tolist(),
+            current[hits].tolist(),
+            previous[hits].tolist(),
+            severities.tolist()
+        ):
+            # Déterminer le type : spike (hausse) ou drop (chute)
+            if percent_change > 0:
+                anomaly_type = AnomalyType.SPIKE
+                description = f"Spike détecté: hausse de {percent_change:.1f}%"
             else:
-                percent_change = ((current_value - previous_value) / previous_value) * 100
+                anomaly_type = AnomalyType.DROP
+                description = f"Drop détecté: chute de {abs_change:.1f}%"
+            
+            # Calculer la confiance basée sur la sensibilité
+            confidence = min(abs_change / 100.0, 1.0) * self.sensitivity
             
-            # Vérifier si le changement dépasse le seuil
-            abs_change = abs(percent_change)
+            # Créer l'anomalie (i indexe current, soit le point i + 1)
+            anomaly = self._create_anomaly(
+                metric=metric,
+                anomaly_type=anomaly_type,
+                severity=_SEVERITIES[level],
+                timestamp=timestamps[i + 1],
+                value=current_value,
+                confidence=confidence,
+                description=description,
+                expected_value=previous_value,
+                metadata={
+                    'percent_change': round(percent_change, 2),
+                    'previous_value': previous_value,
+                    'change_magnitude': abs_change
+                }
+            )
             
-            if abs_change >= self.min_change_percent:
-                # C'est une anomalie !
-                
-                # Déterminer le type : spike (hausse) ou drop (chute)
-                if percent_change > 0:
-                    anomaly_type = AnomalyType.SPIKE
-                    description = f"Spike détecté: hausse de {percent_change:.1f}%"
-                else:
-                    anomaly_type = AnomalyType.DROP
-                    description = f"Drop détecté: chute de {abs_change:.1f}%"
-                
-                # Calculer la sévérité basée sur l'amplitude du changement
-                severity = self._calculate_severity(abs_change)
-                
-                # Calculer la confiance basée sur la sensibilité
-                confidence = min(abs_change / 100.0, 1.0) * self.sensitivity
-                
-                # Créer l'anomalie
-                anomaly = self._create_anomaly(
-                    metric=metric,
-                    anomaly_type=anomaly_type,
-                    severity=severity,
-                    timestamp=metric.values[i].timestamp,
-                    value=current_value,
-                    confidence=confidence,
-                    description=description,
-                    expected_value=previous_value,
-                    metadata={
-                        'percent_change': round(percent_change, 2),
-                        'previous_value': previous_value,
-                        'change_magnitude': abs_change
-                    }
-                )
-                
-                anomalies.append(anomaly)
-                logger.info(f"Spike detected: {description} at {anomaly.timestamp}")
+            anomalies.append(anomaly)
+            logger.info(f"Spike detected: {description} at {anomaly.timestamp}")
         
         logger.info(f"SpikeDetector found {len(anomalies)} anomalies in '{metric.name}'")
         return anomalies
@@ -142,11 +163,4 @@ class SpikeDetector(BaseDetector):
         Returns:
             Niveau de sévérité
         """
-        if change_percent >= 200:
-            return Severity.CRITICAL  # Changement de plus de 200%
-        elif change_percent >= 100:
-            return Severity.HIGH      # Changement entre 100-200%
-        elif change_percent >= 75:
-            return Severity.MEDIUM    # Changement entre 75-100%
-        else:
-            return Severity.LOW       # Changement entre min_change et 75%
\ No newline at end of file
+        return _SEVERITIES[np.digitize(change_percent, _SEVERITY_BOUNDS)]
@@ -18,7 +18,11 @@ IQR = Q3 - Q1
 Outliers: valeurs < Q1 - 1.5*IQR ou > Q3 + 1.5*IQR
 """
 
-from typing import List
+from bisect import bisect_right
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import math
+import threading
 import numpy as np
 from scipy import stats
 
@@ -29,6 +33,21 @@ from ..utils.logger import get_logger
 
 logger = get_logger()
 
+# Sévérité selon le Z-Score: < 3.5 LOW, [3.5, 4[ MEDIUM, [4, 5[ HIGH, >= 5 CRITICAL
+_ZSCORE_SEVERITY_BOUNDS = (3.5, 4.0, 5.0)
+_ZSCORE_SEVERITIES = (Severity.LOW, Severity.MEDIUM, Severity.HIGH, Severity.CRITICAL)
+
+# Sévérité selon la distance IQR normalisée: < 1 LOW, [1, 2[ MEDIUM,
+# [2, 3[ HIGH, >= 3 CRITICAL
+_IQR_SEVERITY_BOUNDS = (1.0, 2.0, 3.0)
+_IQR_SEVERITIES = (Severity.LOW, Severity.MEDIUM, Severity.HIGH, Severity.CRITICAL)
+
+# Nombre d'anomalies à partir duquel la déduplication passe par NumPy
+_DEDUP_VECTORIZE_MIN = 1024
+
+# Percentiles des quartiles Q1, médiane et Q3
+_QUARTILES = (25, 50, 75)
+
 
 class StatisticalDetector(BaseDetector):
     """
@@ -41,6 +60,9 @@ class StatisticalDetector(BaseDetector):
     Configuration:
         - z_score_threshold: Seuil du Z-Score, défaut 3.0
         - iqr_multiplier: Multiplicateur IQR, défaut 1.5
+        - streaming: Z-Score calculé sur les statistiques cumulées de chaque
+          métrique (Welford) plutôt que sur la seule fenêtre analysée,
+          défaut False; seuls les nouveaux points sont intégrés à chaque appel
     """
     
     def __init__(self, config=None):
@@ -53,9 +75,15 @@ class StatisticalDetector(BaseDetector):
         # Initialiser le parent en premier
         super().__init__(config)
         
-        # Paramètres statistiques
-        self.z_score_threshold = self.config.get('z_score_threshold', 3.0)
-        self.iqr_multiplier = self.config.get('iqr_multiplier', 1.5)
+        # Paramètres statistiques (convertis une fois pour les calculs)
+        self.z_score_threshold = float(self.config.get('z_score_threshold', 3.0))
+        self.iqr_multiplier = float(self.config.get('iqr_multiplier', 1.5))
+        self.streaming = self.config.get('streaming', False)
+        
+        # Statistiques cumulées par métrique (mode streaming):
+        # nom -> (nombre de points, moyenne, M2, dernier timestamp intégré)
+        self._running_stats: Dict[str, Tuple[int, float, float, datetime]] = {}
+        self._stats_lock = threading.Lock()
         
         logger.info(
             f"StatisticalDetector configured: z_threshold={self.z_score_threshold}, "
@@ -80,14 +108,15 @@ class StatisticalDetector(BaseDetector):
             return []
         
         anomalies = []
-        values = np.array(metric.get_values_array())
+        values = np.asarray(metric.values_np, dtype=self.compute_dtype)
+        timestamps = metric.timestamps_np
         
         # Méthode 1: Z-Score
-        zscore_anomalies = self._detect_zscore_anomalies(metric, values)
+        zscore_anomalies = self._detect_zscore_anomalies(metric, values, timestamps)
         anomalies.extend(zscore_anomalies)
         
         # Méthode 2: IQR
-        iqr_anomalies = self._detect_iqr_anomalies(metric, values)
+        iqr_anomalies = self._detect_iqr_anomalies(metric, values, timestamps)
         anomalies.extend(iqr_anomalies)
         
         # Dédupliquer les anomalies (même timestamp)
@@ -101,7 +130,8 @@ class StatisticalDetector(BaseDetector):
     def _detect_zscore_anomalies(
         self,
         metric: Metric,
-        values: np.ndarray
+        values: np.ndarray,
+        timestamps: np.ndarray
     ) -> List[Anomaly]:
         """
         Détecte les anomalies avec la méthode Z-Score.
@@ -109,15 +139,22 @@ class StatisticalDetector(BaseDetector):
         Args:
             metric: Métrique source
             values: Array de valeurs
+            timestamps: Timestamps des valeurs
             
         Returns:
             Liste d'anomalies détectées
         """
         anomalies = []
         
-        # Calculer moyenne et écart-type
-        mean = np.mean(values)
-        std = np.std(values)
+        # Calculer moyenne et écart-type (cumulés en mode streaming)
+        if self.streaming:
+            mean, std = self._welford_update(metric.name, values, timestamps)
+        elif values.dtype == np.float64:
+            # Statistiques tenues à jour par la métrique à chaque ajout
+            mean, std = metric.mean, metric.std
+        else:
+            mean = np.mean(values)
+            std = np.std(values)
         
         # Si écart-type = 0, toutes les valeurs sont identiques
         if std == 0:
@@ -127,19 +164,26 @@ class StatisticalDetector(BaseDetector):
         # Calculer le Z-Score pour chaque valeur
         z_scores = np.abs((values - mean) / std)
         
-        # Trouver les indices des outliers
-        outlier_indices = np.where(z_scores > self.z_score_threshold)[0]
+        # Trouver les indices des outliers; sévérité, confiance et arrondis
+        # calculés sur ce seul sous-ensemble
+        outlier_indices = np.flatnonzero(z_scores > self.z_score_threshold)
+        outlier_z_scores = z_scores[outlier_indices]
+        severity_levels = np.digitize(outlier_z_scores, _ZSCORE_SEVERITY_BOUNDS)
+        # 5 écarts-types = confiance max
+        confidences = np.minimum(outlier_z_scores / 5.0, 1.0)
+        rounded_z_scores = np.round(outlier_z_scores, 2)
         
-        for idx in outlier_indices:
-            value = values[idx]
-            z_score = z_scores[idx]
-            
-            # Calculer la sévérité basée sur le Z-Score
-            severity = self._calculate_zscore_severity(z_score)
-            
-            # Calculer la confiance (normalisée entre 0 et 1)
-            confidence = min(z_score / 5.0, 1.0)  # 5 écarts-types = confiance max
-            
+        mean_rounded = round(float(mean), 2)
+        std_rounded = round(float(std), 2)
+        
+        for idx, value, z_score, z_rounded, confidence, level in zip(
+            outlier_indices.tolist(),
+            values[outlier_indices].tolist(),
+            outlier_z_scores.tolist(),
+            rounded_z_scores.tolist(),
+            confidences.tolist(),
+            severity_levels.tolist()
+        ):
             description = (
                 f"Valeur aberrante statistique: {value:.2f} "
                 f"(écart de {z_score:.2f} σ de la moyenne {mean:.2f})"
@@ -148,16 +192,16 @@ class StatisticalDetector(BaseDetector):
             anomaly = self._create_anomaly(
                 metric=metric,
                 anomaly_type=AnomalyType.STATISTICAL_OUTLIER,
-                severity=severity,
-                timestamp=metric.values[idx].timestamp,
+                severity=_ZSCORE_SEVERITIES[level],
+                timestamp=timestamps[idx],
                 value=value,
                 confidence=confidence,
                 description=description,
                 expected_value=mean,
                 metadata={
-                    'z_score': round(float(z_score), 2),
-                    'mean': round(float(mean), 2),
-                    'std': round(float(std), 2),
+                    'z_score': z_rounded,
+                    'mean': mean_rounded,
+                    'std': std_rounded,
                     'detection_method': 'z_score'
                 }
             )
@@ -166,10 +210,70 @@ class StatisticalDetector(BaseDetector):
         
         return anomalies
     
+    def reset(self, metric_name: Optional[str] = None):
+        """
+        Réinitialise les statistiques cumulées du mode streaming.
+        
+        Args:
+            metric_name: Métrique à réinitialiser (toutes si None)
+        """
+        with self._stats_lock:
+            if metric_name is None:
+                self._running_stats.clear()
+            else:
+                self._running_stats.pop(metric_name, None)
+        self.invalidate_cache()
+    
+    def _welford_update(
+        self,
+        metric_name: str,
+        values: np.ndarray,
+        timestamps: np.ndarray
+    ) -> Tuple[float, float]:
+        """
+        Intègre les nouveaux points aux statistiques cumulées de la métrique.
+        
+        Les points déjà vus (timestamp <= dernier timestamp intégré) sont
+        ignorés, les fenêtres successives se chevauchant. Le lot est combiné
+        aux statistiques existantes par la formule parallèle de Welford
+        (Chan et al.), en O(taille du lot).
+        
+        Args:
+            metric_name: Nom de la métrique
+            values: Array de valeurs
+            timestamps: Timestamps des valeurs (croissants)
+            
+        Returns:
+            Tuple (moyenne, écart-type) cumulés
+        """
+        with self._stats_lock:
+            count, mean, m2, last_seen = self._running_stats.get(
+                metric_name, (0, 0.0, 0.0, None)
+            )
+            
+            start = 0 if last_seen is None else bisect_right(timestamps, last_seen)
+            batch = values[start:]
+            
+            if len(batch):
+                batch_count = len(batch)
+                batch_mean = float(batch.mean(dtype=np.float64))
+                batch_m2 = float(np.square(batch - batch_mean, dtype=np.float64).sum())
+                
+                total = count + batch_count
+                delta = batch_mean - mean
+                mean += delta * batch_count / total
+                m2 += batch_m2 + delta * delta * count * batch_count / total
+                count = total
+                
+                self._running_stats[metric_name] = (count, mean, m2, timestamps[-1])
+        
+        return mean, math.sqrt(m2 / count) if count else 0.0
+    
     def _detect_iqr_anomalies(
         self,
         metric: Metric,
-        values: np.ndarray
+        values: np.ndarray,
+        timestamps: np.ndarray
     ) -> List[Anomaly]:
         """
         Détecte les anomalies avec la méthode IQR (Interquartile Range).
@@ -179,15 +283,15 @@ class StatisticalDetector(BaseDetector):
         Args:
             metric: Métrique source
             values: Array de valeurs
+            timestamps: Timestamps des valeurs
             
         Returns:
             Liste d'anomalies détectées
         """
         anomalies = []
         
-        # Calculer les quartiles
-        q1 = np.percentile(values, 25)
-        q3 = np.percentile(values, 75)
+        # Calculer les quartiles et la médiane (une seule sélection partielle)
+        q1, median_value, q3 = np.percentile(values, _QUARTILES)
         iqr = q3 - q1
         
         # Si IQR = 0, distribution très concentrée
@@ -200,45 +304,43 @@ class StatisticalDetector(BaseDetector):
         upper_bound = q3 + (self.iqr_multiplier * iqr)
         
         # Trouver les outliers
-        outlier_indices = np.where(
+        outlier_indices = np.flatnonzero(
             (values < lower_bound) | (values > upper_bound)
-        )[0]
+        )
+        outlier_values = values[outlier_indices]
         
-        for idx in outlier_indices:
-            value = values[idx]
-            
-            # Calculer la distance à la limite la plus proche
-            if value < lower_bound:
-                distance = lower_bound - value
-                bound_type = "inférieure"
-            else:
-                distance = value - upper_bound
-                bound_type = "supérieure"
-            
-            # Normaliser la distance pour calculer la sévérité
-            normalized_distance = distance / iqr if iqr > 0 else 0
-            severity = self._calculate_iqr_severity(normalized_distance)
-            
-            # Calculer la confiance
-            confidence = min(normalized_distance / 2.0, 1.0)
+        # Distance à la limite dépassée, normalisée par l'IQR, pour la
+        # sévérité et la confiance de tous les outliers en une passe
+        below = outlier_values < lower_bound
+        distances = np.where(below, lower_bound - outlier_values, outlier_values - upper_bound)
+        normalized_distances = distances / iqr
+        severity_levels = np.digitize(normalized_distances, _IQR_SEVERITY_BOUNDS)
+        confidences = np.minimum(normalized_distances / 2.0, 1.0)
+        
+        for idx, value, is_below, confidence, level in zip(
+            outlier_indices.tolist(),
+            outlier_values.tolist(),
+            below.tolist(),
+            confidences.tolist(),
+            severity_levels.tolist()
+        ):
+            bound_type = "inférieure" if is_below else "supérieure"
+            severity = _IQR_SEVERITIES[level]
             
             description = (
                 f"Outlier IQR: {value:.2f} dépasse la limite {bound_type} "
                 f"({lower_bound:.2f} - {upper_bound:.2f})"
             )
             
-            # Valeur attendue = médiane
-            expected_value = np.median(values)
-            
             anomaly = self._create_anomaly(
                 metric=metric,
                 anomaly_type=AnomalyType.STATISTICAL_OUTLIER,
                 severity=severity,
-                timestamp=metric.values[idx].timestamp,
+                timestamp=timestamps[idx],
                 value=value,
                 confidence=confidence,
                 description=description,
-                expected_value=expected_value,
+                expected_value=median_value,  # Valeur attendue = médiane
                 metadata={
                     'q1': round(float(q1), 2),
                     'q3': round(float(q3), 2),
@@ -255,25 +357,11 @@ class StatisticalDetector(BaseDetector):
     
     def _calculate_zscore_severity(self, z_score: float) -> Severity:
         """Calcule la sévérité basée sur le Z-Score."""
-        if z_score >= 5.0:
-            return Severity.CRITICAL
-        elif z_score >= 4.0:
-            return Severity.HIGH
-        elif z_score >= 3.5:
-            return Severity.MEDIUM
-        else:
-            return Severity.LOW
+        return _ZSCORE_SEVERITIES[np.digitize(z_score, _ZSCORE_SEVERITY_BOUNDS)]
     
     def _calculate_iqr_severity(self, normalized_distance: float) -> Severity:
         """Calcule la sévérité basée sur la distance IQR normalisée."""
-        if normalized_distance >= 3.0:
-            return Severity.CRITICAL
-        elif normalized_distance >= 2.0:
-            return Severity.HIGH
-        elif normalized_distance >= 1.0:
-            return Severity.MEDIUM
-        else:
-            return Severity.LOW
+        return _IQR_SEVERITIES[np.digitize(normalized_distance, _IQR_SEVERITY_BOUNDS)]
     
     def _deduplicate_anomalies(self, anomalies: List[Anomaly]) -> List[Anomaly]:
         """
@@ -282,22 +370,39 @@ class StatisticalDetector(BaseDetector):
         Si une même valeur est détectée par Z-Score et IQR,
         on garde celle avec la plus haute confiance.
         """
-        if not anomalies:
-            return []
+        if len(anomalies) >= _DEDUP_VECTORIZE_MIN:
+            return self._deduplicate_anomalies_vectorized(anomalies)
         
-        # Grouper par timestamp
-        by_timestamp = {}
+        # Une passe: meilleure anomalie par timestamp (à égalité, la
+        # première détectée), dans l'ordre d'apparition des timestamps
+        best: Dict[datetime, Anomaly] = {}
         for anomaly in anomalies:
-            ts = anomaly.timestamp
-            if ts not in by_timestamp:
-                by_timestamp[ts] = []
-            by_timestamp[ts].append(anomaly)
-        
-        # Garder la meilleure anomalie par timestamp
-        deduplicated = []
-        for ts, anoms in by_timestamp.items():
-            # Prendre celle avec la plus haute confiance
-            best = max(anoms, key=lambda a: a.confidence)
-            deduplicated.append(best)
-        
-        return deduplicated
\ No newline at end of file
+            previous = best.get(anomaly.timestamp)
+            if previous is None or anomaly.confidence > previous.confidence:
+                best[anomaly.timestamp] = anomaly
+        
+        return list(best.values())
+    
+    def _deduplicate_anomalies_vectorized(self, anomalies: List[Anomaly]) -> List[Anomaly]:
+        """
+        Variante NumPy de _deduplicate_anomalies pour les longues listes.
+        
+        Même résultat, avec un tri stable au lieu d'une boucle Python.
+        """
+        # Grouper par timestamp: un code entier par timestamp, et l'index
+        # de sa première apparition (ordre de sortie)
+        timestamps = np.empty(len(anomalies), dtype=object)
+        timestamps[:] = [a.timestamp for a in anomalies]
+        _, first_seen, codes = np.unique(timestamps, return_index=True, return_inverse=True)
+        confidences = np.fromiter((a.confidence for a in anomalies), dtype=np.float64, count=len(anomalies))
+        
+        # Un seul tri stable: par timestamp puis confiance décroissante; la
+        # première anomalie de chaque groupe est la meilleure (à égalité,
+        # la première détectée)
+        order = np.lexsort((-confidences, codes))
+        sorted_codes = codes[order]
+        group_starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+        best = order[group_starts]
+        
+        # Garder la meilleure anomalie par timestamp, dans l'ordre d'apparition
+        return [anomalies[i] for i in best[np.argsort(first_seen)].tolist()]
@@ -12,7 +12,11 @@ Concepts:
 C'est le détecteur le plus simple mais très utile pour des limites connues.
 """
 
-from typing import List, Dict, Optional
+from functools import lru_cache
+from typing import Callable, List, Dict, Optional, Tuple
+import fnmatch
+import re
+import numpy as np
 from .base_detector import BaseDetector
 from ..models.metric import Metric
 from ..models.anomaly import Anomaly, AnomalyType, Severity
@@ -20,6 +24,99 @@ from ..utils.logger import get_logger
 
 logger = get_logger()
 
+# Types de seuils par ordre de priorité: (type, comparaison, sévérité)
+_THRESHOLD_RULES = (
+    ('critical', np.greater_equal, Severity.CRITICAL),
+    ('warning', np.greater_equal, Severity.HIGH),
+    ('max', np.greater, Severity.HIGH),
+    ('min', np.less, Severity.MEDIUM),
+    ('max_rate', np.greater, Severity.HIGH),  # Pour les counters
+    ('min_rate', np.less, Severity.MEDIUM),   # Valeurs trop basses
+)
+
+# Seuils bas: le dépassement se mesure en dessous du seuil
+_LOWER_BOUND_TYPES = frozenset(('min', 'min_rate'))
+
+# Dépassement: (index du point, valeur, type de seuil, valeur du seuil, sévérité)
+Breach = Tuple[int, float, str, float, Severity]
+
+
+def _make_checker(thresholds: Dict) -> Callable[[np.ndarray], List[Breach]]:
+    """
+    Construit la fonction de vérification spécialisée pour un jeu de seuils.
+    
+    Seules les comparaisons configurées sont conservées, par ordre de
+    priorité; chaque point n'est signalé que pour le seuil le plus
+    prioritaire qu'il dépasse.
+    
+    Args:
+        thresholds: Seuils configurés (ex: {'warning': 70, 'critical': 90})
+        
+    Returns:
+        Fonction values -> dépassements, dans l'ordre des points
+    """
+    rules = tuple(
+        (threshold_type, thresholds[threshold_type], compare, severity)
+        for threshold_type, compare, severity in _THRESHOLD_RULES
+        if threshold_type in thresholds
+    )
+    
+    if len(rules) == 1:
+        # Un seul seuil: un masque suffit
+        ((threshold_type, threshold_value, compare, severity),) = rules
+        
+        def check_single(values: np.ndarray) -> List[Breach]:
+            hits = np.flatnonzero(compare(values, threshold_value))
+            return [
+                (idx, value, threshold_type, threshold_value, severity)
+                for idx, value in zip(hits.tolist(), values[hits].tolist())
+            ]
+        
+        return check_single
+    
+    def check(values: np.ndarray) -> List[Breach]:
+        # Règle retenue pour chaque point (-1: aucun dépassement); les règles
+        # sont appliquées de la moins à la plus prioritaire, qui l'emporte
+        matched = np.full(len(values), -1, dtype=np.int8)
+        for rule_index in range(len(rules) - 1, -1, -1):
+            _, threshold_value, compare, _ = rules[rule_index]
+            matched[compare(values, threshold_value)] = rule_index
+        
+        hits = np.flatnonzero(matched >= 0)
+        breaches = []
+        for idx, value, rule_index in zip(
+            hits.tolist(), values[hits].tolist(), matched[hits].tolist()
+        ):
+            threshold_type, threshold_value, _, severity = rules[rule_index]
+            breaches.append((idx, value, threshold_type, threshold_value, severity))
+        return breaches
+    
+    return check
+
+
+@lru_cache(maxsize=1024)
+def _compile_wildcards(patterns: Tuple[str, ...]) -> Tuple[Optional[re.Pattern], Dict[str, str]]:
+    """
+    Compile des patterns à wildcards en une seule regex (mémorisé).
+    
+    Chaque pattern (syntaxe fnmatch) devient un groupe nommé de
+    l'alternative, dans l'ordre donné (le premier qui correspond gagne).
+    Le résultat est partagé entre appels: ne pas le modifier.
+    
+    Args:
+        patterns: Patterns à wildcards, par ordre de priorité
+        
+    Returns:
+        Tuple (regex compilée ou None si aucun pattern, nom du groupe -> pattern)
+    """
+    if not patterns:
+        return None, {}
+    pattern_keys = {f"p{i}": pattern for i, pattern in enumerate(patterns)}
+    pattern_re = re.compile('|'.join(
+        f"(?P<{group}>{fnmatch.translate(pattern)})" for group, pattern in pattern_keys.items()
+    ))
+    return pattern_re, pattern_keys
+
 
 class ThresholdDetector(BaseDetector):
     """
@@ -35,6 +132,7 @@ class ThresholdDetector(BaseDetector):
             memory_usage:
                 max: 16000000000  # 16 GB
                 min: 1000000000   # 1 GB
+        verbose_descriptions: true  # false: ni description ni arrondis
     """
     
     def __init__(self, config=None):
@@ -50,6 +148,20 @@ class ThresholdDetector(BaseDetector):
         # Dictionnaire des seuils par métrique
         self.thresholds = self.config.get('thresholds', {})
         
+        # Descriptions lisibles et métadonnées arrondies; à désactiver sur
+        # les métriques bruyantes (l'orchestrateur a un libellé par défaut)
+        self._verbose = self.config.get('verbose_descriptions', True)
+        
+        # Fonctions de vérification spécialisées, par clé de configuration
+        self._checkers: Dict[str, Callable[[np.ndarray], List[Breach]]] = {
+            key: _make_checker(thresholds) for key, thresholds in self.thresholds.items()
+        }
+        self._build_pattern_index()
+        
+        # Résolution nom de métrique -> clé de seuils, mémorisée par nom
+        # (vidée par add_threshold)
+        self._resolve_key = lru_cache(maxsize=4096)(self._get_thresholds_key)
+        
         logger.info(
             f"ThresholdDetector configured with thresholds for "
             f"{len(self.thresholds)} metrics"
@@ -72,29 +184,27 @@ class ThresholdDetector(BaseDetector):
             return []
         
         # Récupérer les seuils pour cette métrique
-        metric_thresholds = self._get_metric_thresholds(metric.name)
+        key = self._resolve_key(metric.name)
         
-        if not metric_thresholds:
-            logger.debug(f"No thresholds configured for metric '{metric.name}'")
+        if key is None or not self.thresholds[key]:
+            logger.debug("No thresholds configured for metric '{}'", metric.name)
             return []
         
         anomalies = []
+        timestamps = metric.timestamps_np
         
-        # Analyser chaque valeur
-        for metric_value in metric.values:
-            value = metric_value.value
-            timestamp = metric_value.timestamp
-            
-            # Vérifier chaque type de seuil
-            anomaly = self._check_thresholds(
+        # Seuls les points en dépassement sont parcourus
+        for idx, value, threshold_type, threshold_value, severity in self._checkers[key](
+            metric.values_np
+        ):
+            anomalies.append(self._create_threshold_anomaly(
                 metric=metric,
                 value=value,
-                timestamp=timestamp,
-                thresholds=metric_thresholds
-            )
-            
-            if anomaly:
-                anomalies.append(anomaly)
+                timestamp=timestamps[idx],
+                threshold_value=threshold_value,
+                threshold_type=threshold_type,
+                severity=severity
+            ))
         
         logger.info(
             f"ThresholdDetector found {len(anomalies)} anomalies in '{metric.name}'"
@@ -113,107 +223,42 @@ class ThresholdDetector(BaseDetector):
         Returns:
             Dictionnaire de seuils ou None
         """
-        # Correspondance exacte
-        if metric_name in self.thresholds:
-            return self.thresholds[metric_name]
-        
-        # Correspondance par pattern (ex: "http_*" match "http_requests")
-        for pattern, thresholds in self.thresholds.items():
-            if '*' in pattern:
-                pattern_regex = pattern.replace('*', '.*')
-                import re
-                if re.match(pattern_regex, metric_name):
-                    return thresholds
-        
-        return None
+        key = self._resolve_key(metric_name)
+        return None if key is None else self.thresholds[key]
     
-    def _check_thresholds(
-        self,
-        metric: Metric,
-        value: float,
-        timestamp,
-        thresholds: Dict
-    ) -> Optional[Anomaly]:
+    def _get_thresholds_key(self, metric_name: str) -> Optional[str]:
         """
-        Vérifie si une valeur dépasse les seuils configurés.
+        Trouve la clé de configuration des seuils d'une métrique.
         
         Args:
-            metric: Métrique source
-            value: Valeur à vérifier
-            timestamp: Timestamp de la valeur
-            thresholds: Seuils configurés
+            metric_name: Nom de la métrique
             
         Returns:
-            Anomaly si seuil dépassé, None sinon
+            Nom exact ou pattern correspondant, ou None
         """
-        # Seuil CRITICAL (le plus important)
-        if 'critical' in thresholds and value >= thresholds['critical']:
-            return self._create_threshold_anomaly(
-                metric=metric,
-                value=value,
-                timestamp=timestamp,
-                threshold_value=thresholds['critical'],
-                threshold_type='critical',
-                severity=Severity.CRITICAL
-            )
-        
-        # Seuil WARNING
-        if 'warning' in thresholds and value >= thresholds['warning']:
-            return self._create_threshold_anomaly(
-                metric=metric,
-                value=value,
-                timestamp=timestamp,
-                threshold_value=thresholds['warning'],
-                threshold_type='warning',
-                severity=Severity.HIGH
-            )
-        
-        # Seuil MAX
-        if 'max' in thresholds and value > thresholds['max']:
-            return self._create_threshold_anomaly(
-                metric=metric,
-                value=value,
-                timestamp=timestamp,
-                threshold_value=thresholds['max'],
-                threshold_type='max',
-                severity=Severity.HIGH
-            )
-        
-        # Seuil MIN
-        if 'min' in thresholds and value < thresholds['min']:
-            return self._create_threshold_anomaly(
-                metric=metric,
-                value=value,
-                timestamp=timestamp,
-                threshold_value=thresholds['min'],
-                threshold_type='min',
-                severity=Severity.MEDIUM
-            )
+        # Correspondance exacte
+        if metric_name in self.thresholds:
+            return metric_name
         
-        # Seuil MAX_RATE (pour les counters)
-        if 'max_rate' in thresholds and value > thresholds['max_rate']:
-            return self._create_threshold_anomaly(
-                metric=metric,
-                value=value,
-                timestamp=timestamp,
-                threshold_value=thresholds['max_rate'],
-                threshold_type='max_rate',
-                severity=Severity.HIGH
-            )
-        
-        # Seuil MIN_RATE (détection de valeurs trop basses)
-        if 'min_rate' in thresholds and value < thresholds['min_rate']:
-            return self._create_threshold_anomaly(
-                metric=metric,
-                value=value,
-                timestamp=timestamp,
-                threshold_value=thresholds['min_rate'],
-                threshold_type='min_rate',
-                severity=Severity.MEDIUM
-            )
+        # Correspondance par pattern (ex: "http_*" match "http_requests"):
+        # une seule regex, le premier pattern configuré qui correspond l'emporte
+        if self._pattern_re is not None:
+            match = self._pattern_re.match(metric_name)
+            if match:
+                return self._pattern_keys[match.lastgroup]
         
         return None
     
+    def _build_pattern_index(self):
+        """
+        Compile les seuils à wildcards en une seule regex.
+        
+        Voir _compile_wildcards: la compilation est mémorisée par jeu de
+        patterns, un add_threshold qui ne change pas ce jeu ne recompile rien.
+        """
+        patterns = tuple(pattern for pattern in self.thresholds if '*' in pattern)
+        self._pattern_re, self._pattern_keys = _compile_wildcards(patterns)
+    
     def _create_threshold_anomaly(
         self,
         metric: Metric,
@@ -238,7 +283,7 @@ class ThresholdDetector(BaseDetector):
             Objet Anomaly
         """
         # Calculer le dépassement
-        if threshold_type in ['min', 'min_rate']:
+        if threshold_type in _LOWER_BOUND_TYPES:
             excess = threshold_value - value
             direction = "en dessous"
         else:
@@ -247,11 +292,16 @@ class ThresholdDetector(BaseDetector):
         
         excess_percent = (excess / threshold_value * 100) if threshold_value != 0 else 0
         
-        description = (
-            f"Seuil {threshold_type.upper()} dépassé: "
-            f"valeur={value:.2f} {direction} du seuil={threshold_value:.2f} "
-            f"(dépassement de {abs(excess_percent):.1f}%)"
-        )
+        if self._verbose:
+            description = (
+                f"Seuil {threshold_type.upper()} dépassé: "
+                f"valeur={value:.2f} {direction} du seuil={threshold_value:.2f} "
+                f"(dépassement de {abs(excess_percent):.1f}%)"
+            )
+            excess = round(excess, 2)
+            excess_percent = round(excess_percent, 2)
+        else:
+            description = ""
         
         # Confiance = 1.0 pour les seuils (détection certaine)
         confidence = 1.0
@@ -268,8 +318,8 @@ class ThresholdDetector(BaseDetector):
             metadata={
                 'threshold_type': threshold_type,
                 'threshold_value': threshold_value,
-                'excess': round(excess, 2),
-                'excess_percent': round(excess_percent, 2)
+                'excess': excess,
+                'excess_percent': excess_percent
             }
         )
     
@@ -305,4 +355,9 @@ class ThresholdDetector(BaseDetector):
             thresholds['max'] = max_val
         
         self.thresholds[metric_name] = thresholds
+        self._checkers[metric_name] = _make_checker(thresholds)
+        if '*' in metric_name:
+            self._build_pattern_index()
+        self._resolve_key.cache_clear()
+        self.invalidate_cache()
         logger.info(f"Updated thresholds for '{metric_name}': {thresholds}")
\ No newline at end of file
@@ -8,17 +8,23 @@ Ce fichier orchestre l'ensemble du système:
 4. Envoie les anomalies à l'orchestrateur
 """
 
-import time
 import signal
 import sys
+import time
+import queue
+import threading
 import requests
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collections import Counter
 from pathlib import Path
 from datetime import datetime
-from typing import List
+from typing import List, Optional, Tuple
 
 from .config import Settings
 from .collectors import PrometheusCollector
-from .models.anomaly import Anomaly
+from .models.anomaly import Anomaly, Severity
 from .utils.logger import LoggerConfig, get_logger
 from dotenv import load_dotenv
 
@@ -27,15 +33,17 @@ load_dotenv()
 # Module-level logger for imports and initialization
 logger = get_logger()
 
-# Variable globale pour le shutdown gracieux
-shutdown_requested = False
+# Événement global pour le shutdown gracieux (positionné par signal_handler)
+shutdown_event = threading.Event()
+
+# Nombre maximal d'envois en attente vers l'orchestrateur
+SEND_QUEUE_SIZE = 32
 
 
 def signal_handler(sig, frame):
     """Handler pour les signaux SIGINT et SIGTERM."""
-    global shutdown_requested
     logger.info("Shutdown signal received, stopping gracefully...")
-    shutdown_requested = True
+    shutdown_event.set()
 
 
 class MetricsAgent:
@@ -73,6 +81,29 @@ class MetricsAgent:
             'endpoint',
             'http://localhost:8000/api/anomalies'
         )
+        # Horodatage du payload: 'iso' (défaut) ou 'epoch' (secondes, float)
+        self._epoch_timestamps = (
+            self.settings.orchestrator_config.get('timestamp_format', 'iso') == 'epoch'
+        )
+        
+        # Arrêt de la boucle principale
+        self._stop = shutdown_event
+        
+        # Session HTTP réutilisée (keep-alive + pool) pour l'orchestrateur
+        self._session = self._create_session()
+        
+        # Envois à l'orchestrateur en tâche de fond: la collecte n'attend
+        # pas le POST; au-delà de SEND_QUEUE_SIZE envois en attente, le
+        # plus ancien est abandonné
+        self._send_queue: "queue.Queue[Optional[Tuple[int, bytes]]]" = queue.Queue(
+            maxsize=SEND_QUEUE_SIZE
+        )
+        self._sender = threading.Thread(
+            target=self._sender_loop,
+            name="orchestrator-sender",
+            daemon=True
+        )
+        self._sender.start()
         
         # Paramètres de l'agent
         self.check_interval = self.settings.agent_config.get('check_interval', 60)
@@ -88,11 +119,34 @@ class MetricsAgent:
         LoggerConfig(
             level=log_config.get('level', 'INFO'),
             log_file=log_config.get('file'),
-            rotation=log_config.get('rotation', '100 MB'),
+            rotation=log_config.get('rotation', '20 MB'),
             retention=log_config.get('retention', '30 days'),
             format_type=log_config.get('format', 'text')
         )
     
+    def _create_session(self) -> requests.Session:
+        """
+        Crée la session HTTP vers l'orchestrateur.
+        
+        Les connexions sont conservées entre les itérations et les
+        erreurs transitoires (502, 503, 504) sont réessayées avec backoff.
+        
+        Returns:
+            Session requests configurée
+        """
+        retries = Retry(
+            total=self.settings.orchestrator_config.get('retry_attempts', 3),
+            backoff_factor=0.5,
+            status_forcelist=[502, 503, 504],
+            allowed_methods=frozenset(['POST'])
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retries)
+        
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+    
     def _initialize_collector(self) -> PrometheusCollector:
         """
         Initialise le collecteur Prometheus.
@@ -106,7 +160,9 @@ class MetricsAgent:
             prometheus_url=prom_config.get('url', 'http://localhost:9090'),
             detectors_config=self.settings.detectors_config,
             metrics_to_monitor=self.settings.metrics_config,
-            lookback_window=self.settings.agent_config.get('lookback_window', 3600)
+            lookback_window=self.settings.agent_config.get('lookback_window', 3600),
+            max_workers=self.settings.agent_config.get('max_workers'),
+            cache_ttl=prom_config.get('cache_ttl', 0)
         )
         
         return collector
@@ -117,13 +173,11 @@ class MetricsAgent:
         
         Exécute la collecte et l'analyse à intervalles réguliers.
         """
-        global shutdown_requested
-        
         logger.info("Agent started - entering main loop")
         
         iteration = 0
         
-        while not shutdown_requested:
+        while not self._stop.is_set():
             iteration += 1
             logger.info(f"--- Iteration {iteration} ---")
             
@@ -146,17 +200,38 @@ class MetricsAgent:
             # Attendre avant la prochaine itération
             logger.info(f"Waiting {self.check_interval}s before next check...")
             
-            # Sleep interruptible
-            for _ in range(self.check_interval):
-                if shutdown_requested:
-                    break
-                time.sleep(1)
+            # Attente interruptible: se termine dès le signal d'arrêt
+            if self._stop.wait(self.check_interval):
+                break
         
+        self.close()
         logger.info("Agent stopped")
     
+    def close(self):
+        """
+        Arrête le thread d'envoi après les envois en attente, ferme la
+        session et libère les ressources du collecteur.
+        """
+        if self._sender.is_alive():
+            # Sans bloquer: file pleine (orchestrateur lent), la sentinelle
+            # remplace l'envoi le plus ancien
+            self._enqueue(None)
+            self._sender.join(timeout=self.settings.orchestrator_config.get('timeout', 10))
+            if self._sender.is_alive():
+                logger.warning(
+                    f"Orchestrator sender still busy, "
+                    f"{self._send_queue.qsize()} payloads not sent"
+                )
+        self._session.close()
+        self.collector.close()
+    
     def _send_to_orchestrator(self, anomalies: List[Anomaly]):
         """
-        Envoie les anomalies détectées à l'orchestrateur.
+        Met en file l'envoi des anomalies détectées à l'orchestrateur.
+        
+        Le corps JSON est construit ici; le POST est fait par le thread
+        d'envoi (voir _sender_loop). Si la file est pleine, l'envoi le
+        plus ancien est abandonné.
         
         Args:
             anomalies: Liste des anomalies à envoyer
@@ -164,20 +239,61 @@ class MetricsAgent:
         if not anomalies:
             return
         
-        logger.info(f"Sending {len(anomalies)} anomalies to orchestrator...")
-        
         # Convertir les anomalies en JSON
         payload = {
             'agent': self.settings.agent_config.get('name', 'metrics-agent'),
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': time.time() if self._epoch_timestamps else datetime.now().isoformat(),
             'anomalies': [anomaly.to_orchestrator_dict() for anomaly in anomalies]
         }
+        self._enqueue((len(anomalies), orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)))
+    
+    def _enqueue(self, item: Optional[Tuple[int, bytes]]):
+        """
+        Met un élément dans la file d'envoi sans bloquer; si elle est pleine,
+        l'envoi le plus ancien est abandonné.
+        
+        Args:
+            item: (nombre d'anomalies, corps JSON), ou None pour arrêter le thread d'envoi
+        """
+        try:
+            self._send_queue.put_nowait(item)
+        except queue.Full:
+            try:
+                dropped = self._send_queue.get_nowait()
+                if dropped is not None:
+                    logger.warning(
+                        f"Orchestrator send queue full, dropping {dropped[0]} older anomalies"
+                    )
+            except queue.Empty:
+                pass
+            self._send_queue.put_nowait(item)
+    
+    def _sender_loop(self):
+        """
+        Boucle du thread d'envoi: poste les corps en file jusqu'à la sentinelle None.
+        """
+        while True:
+            item = self._send_queue.get()
+            if item is None:
+                break
+            self._post_anomalies(*item)
+    
+    def _post_anomalies(self, count: int, body: bytes):
+        """
+        Envoie un corps JSON d'anomalies à l'orchestrateur.
+        
+        Args:
+            count: Nombre d'anomalies dans le corps
+            body: Corps JSON sérialisé
+        """
+        logger.info(f"Sending {count} anomalies to orchestrator...")
         
         try:
             # Envoyer la requête POST
-            response = requests.post(
+            response = self._session.post(
                 self.orchestrator_url,
-                json=payload,
+                data=body,
+                headers={'Content-Type': 'application/json'},
                 timeout=self.settings.orchestrator_config.get('timeout', 10)
             )
             
@@ -190,7 +306,6 @@ class MetricsAgent:
                 
         except requests.exceptions.RequestException as e:
             logger.error(f"Error sending to orchestrator: {e}")
-            # En production, on pourrait stocker localement pour retry
     
     def _print_summary(self, anomalies: List[Anomaly]):
         """
@@ -202,25 +317,20 @@ class MetricsAgent:
         if not anomalies:
             return
         
-        # Grouper par sévérité
-        by_severity = {}
-        for anomaly in anomalies:
-            severity = anomaly.severity.value
-            if severity not in by_severity:
-                by_severity[severity] = []
-            by_severity[severity].append(anomaly)
+        # Compter par sévérité
+        counts = Counter(anomaly.severity_str for anomaly in anomalies)
         
         # Afficher le résumé
         logger.info("--- Anomalies Summary ---")
-        for severity in ['critical', 'high', 'medium', 'low']:
-            if severity in by_severity:
-                count = len(by_severity[severity])
-                logger.info(f"{severity.upper()}: {count} anomalies")
+        for severity in ('critical', 'high', 'medium', 'low'):
+            if severity in counts:
+                logger.info(f"{severity.upper()}: {counts[severity]} anomalies")
         
         # Afficher les anomalies critiques en détail
-        if 'critical' in by_severity:
+        if 'critical' in counts:
+            criticals = [a for a in anomalies if a.severity is Severity.CRITICAL]
             logger.warning("CRITICAL anomalies detected:")
-            for anomaly in by_severity['critical']:
+            for anomaly in criticals:
                 logger.warning(f"  - {anomaly.metric_name}: {anomaly.description}")
 
 
@@ -0,0 +1,9 @@
+"""
+Compatibilité entre versions de Python pour les modèles.
+"""
+
+import sys
+
+# Options de @dataclass pour des instances à __slots__ (moins de mémoire,
+# accès aux attributs plus rapide); slots=True n'existe qu'à partir de 3.10
+DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
@@ -4,12 +4,14 @@ Modèle de données pour les anomalies détectées.
 Ce module définit la structure des anomalies identifiées par les détecteurs.
 """
 
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
 from uuid import uuid4
 from datetime import datetime
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Tuple
 from enum import Enum
-import json
+import orjson
+
+from ._compat import DATACLASS_SLOTS
 
 
 class AnomalyType(Enum):
@@ -42,8 +44,14 @@ ANOMALY_TYPE_TO_DETECTOR = {
     AnomalyType.PATTERN_ANOMALY: "pattern_detector"
 }
 
+# Composition des deux tables: (détecteur, catégorie) par type d'anomalie
+ANOMALY_TYPE_TO_DETECTOR_CATEGORY: Dict[AnomalyType, Tuple[str, str]] = {
+    anomaly_type: (detector, DETECTOR_TO_CATEGORY.get(detector, "unknown"))
+    for anomaly_type, detector in ANOMALY_TYPE_TO_DETECTOR.items()
+}
+
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class Anomaly:
     """
     Représente une anomalie détectée dans une métrique.
@@ -60,6 +68,7 @@ class Anomaly:
         description: Description de l'anomalie
         metadata: Données supplémentaires (seuils, écarts, etc.)
         labels: Labels de la métrique
+        llm_analysis: Analyse textuelle du LLM (si validée par LLM)
     """
     metric_name: str
     anomaly_type: AnomalyType
@@ -77,12 +86,31 @@ class Anomaly:
     end_time: Optional[datetime] = None
     llm_validated: bool = False
     llm_status: Optional[str] = None
+    llm_analysis: Optional[str] = None
+    # Chaînes des enums (severity.value, anomaly_type.value), tenues à
+    # jour par __setattr__
+    severity_str: str = field(init=False, repr=False, compare=False)
+    type_str: str = field(init=False, repr=False, compare=False)
+    # Dict orchestrateur mémorisé (voir to_orchestrator_dict)
+    _odict: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self):
         """Validation après initialisation."""
         if not 0 <= self.confidence <= 1:
             raise ValueError(f"Confidence must be between 0 and 1, got {self.confidence}")
     
+    def __setattr__(self, name: str, value: Any) -> None:
+        """
+        Invalide le dict orchestrateur mémorisé à chaque modification et
+        tient à jour severity_str/type_str.
+        """
+        object.__setattr__(self, '_odict', None)
+        if name == 'severity':
+            object.__setattr__(self, 'severity_str', value.value)
+        elif name == 'anomaly_type':
+            object.__setattr__(self, 'type_str', value.value)
+        object.__setattr__(self, name, value)
+    
     @property
     def deviation(self) -> Optional[float]:
         """
@@ -102,12 +130,28 @@ class Anomaly:
         Returns:
             Dictionnaire représentant l'anomalie
         """
-        data = asdict(self)
-        data['anomaly_type'] = self.anomaly_type.value
-        data['severity'] = self.severity.value
-        data['timestamp'] = self.timestamp.isoformat()
-        if self.deviation is not None:
-            data['deviation_percent'] = round(self.deviation, 2)
+        data = {
+            'metric_name': self.metric_name,
+            'anomaly_type': self.type_str,
+            'severity': self.severity_str,
+            'timestamp': self.timestamp.isoformat(),
+            'value': self.value,
+            'detector_name': self.detector_name,
+            'confidence': self.confidence,
+            'expected_value': self.expected_value,
+            'description': self.description,
+            'metadata': dict(self.metadata),
+            'labels': dict(self.labels),
+            'anomaly_id': self.anomaly_id,
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+            'llm_validated': self.llm_validated,
+            'llm_status': self.llm_status,
+            'llm_analysis': self.llm_analysis
+        }
+        deviation = self.deviation
+        if deviation is not None:
+            data['deviation_percent'] = round(deviation, 2)
         return data
     
     def to_json(self) -> str:
@@ -117,7 +161,10 @@ class Anomaly:
         Returns:
             String JSON de l'anomalie
         """
-        return json.dumps(self.to_dict(), indent=2)
+        return orjson.dumps(
+            self.to_dict(),
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+        ).decode()
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Anomaly':
@@ -144,16 +191,39 @@ class Anomaly:
     
     def __repr__(self) -> str:
         return (f"Anomaly(metric={self.metric_name}, "
-                f"type={self.anomaly_type.value}, "
-                f"severity={self.severity.value}, "
+                f"type={self.type_str}, "
+                f"severity={self.severity_str}, "
                 f"value={self.value}, "
                 f"confidence={self.confidence:.2f})")
     
     def to_orchestrator_dict(self) -> Dict[str, Any]:
-        detector = ANOMALY_TYPE_TO_DETECTOR.get(
-            self.anomaly_type,
-            self.detector_name
-        )
+        """
+        Retourne l'anomalie au format attendu par l'orchestrateur.
+        
+        Le résultat est mémorisé sur l'instance et invalidé dès qu'un
+        attribut est réassigné. Le dict retourné est partagé: ne pas le
+        modifier (ni muter metadata/labels en place après l'appel).
+        """
+        result = self._odict
+        if result is None:
+            result = self._build_orchestrator_dict()
+            object.__setattr__(self, '_odict', result)
+        return result
+    
+    def _build_orchestrator_dict(self) -> Dict[str, Any]:
+        """Construit le dict orchestrateur (voir to_orchestrator_dict)."""
+        pair = ANOMALY_TYPE_TO_DETECTOR_CATEGORY.get(self.anomaly_type)
+        if pair is None:
+            detector = self.detector_name
+            category = DETECTOR_TO_CATEGORY.get(detector, "unknown")
+        else:
+            detector, category = pair
+        md = self.metadata
+        start = self.start_time or self.timestamp
+        end = self.end_time or self.timestamp
+        start_iso = start.isoformat()
+        # Cas courant (ni début ni fin explicites): une seule conversion
+        end_iso = start_iso if end is start else end.isoformat()
 
         result = {
             "anomaly_id": self.anomaly_id,
@@ -161,29 +231,28 @@ class Anomaly:
             "metric_name": self.metric_name,
             "labels": self.labels,
             "detector": detector,
-            "severity": self.severity.value,
-            "description": self.description or f"{self.anomaly_type.value} detected",
+            "severity": self.severity_str,
+            "description": self.description or f"{self.type_str} detected",
             "observed_value": self.value,
             "expected_value": self.expected_value,
-            "threshold": self.metadata.get("threshold"),
+            "threshold": md.get("threshold"),
             "confidence": round(self.confidence, 2),
-            "start_time": (self.start_time or self.timestamp).isoformat(),
-            "end_time": (self.end_time or self.timestamp).isoformat(),
+            "start_time": start_iso,
+            "end_time": end_iso,
             "context": {
-                "metric_type": self.metadata.get("metric_type", "unknown"),
-                "unit": self.metadata.get("unit", ""),
-                "lookback_window": self.metadata.get("lookback_window", "")
+                "metric_type": md.get("metric_type", "unknown"),
+                "unit": md.get("unit", ""),
+                "lookback_window": md.get("lookback_window", "")
             },
-            "suggested_category": DETECTOR_TO_CATEGORY.get(detector, "unknown")
+            "suggested_category": category
         }
         # Add LLM fields if present
-        if hasattr(self, 'llm_analysis') and self.llm_analysis is not None:
+        if self.llm_analysis is not None:
             result["llm_analysis"] = self.llm_analysis
-        if hasattr(self, 'llm_status') and self.llm_status is not None:
+        if self.llm_status is not None:
             result["llm_status"] = self.llm_status
-        if hasattr(self, 'llm_validated'):
-            result["llm_validated"] = self.llm_validated
+        result["llm_validated"] = self.llm_validated
         # Also check metadata for llm_analysis if not set directly
-        if "llm_analysis" not in result and self.metadata.get("llm_analysis"):
-            result["llm_analysis"] = self.metadata["llm_analysis"]
+        if "llm_analysis" not in result and md.get("llm_analysis"):
+            result["llm_analysis"] = md["llm_analysis"]
         return result
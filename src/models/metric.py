@@ -6,9 +6,20 @@ Ce module définit la structure des métriques collectées.
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List, Optional
+import math
+from typing import Any, Dict, List, Optional, Sequence
 from enum import Enum
 
+import numpy as np
+
+from ._compat import DATACLASS_SLOTS
+
+
+# Tampon initial partagé des métriques vides (jamais écrit: réalloué au
+# premier ajout)
+_EMPTY_BUFFER = np.empty(0, dtype=np.float64)
+_EMPTY_BUFFER.flags.writeable = False
+
 
 class MetricType(Enum):
     """Types de métriques Prometheus."""
@@ -18,7 +29,7 @@ class MetricType(Enum):
     SUMMARY = "summary"
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class MetricValue:
     """
     Représente une valeur de métrique à un instant donné.
@@ -36,21 +47,182 @@ class MetricValue:
         return f"MetricValue(timestamp={self.timestamp}, value={self.value}, labels={self.labels})"
 
 
-@dataclass
+@dataclass(init=False, **DATACLASS_SLOTS)
 class Metric:
     """
     Représente une métrique complète avec son historique.
     
+    Les points sont stockés par colonnes (timestamps, valeurs) plutôt
+    qu'en objets MetricValue: les valeurs dans un tableau float64 dont la
+    capacité double quand il est plein, les timestamps dans une liste.
+    Les labels, généralement identiques sur toute une série Prometheus,
+    sont partagés.
+    
+    Avec max_history, seuls les max_history derniers points sont gardés
+    (fenêtre glissante, mémoire bornée): les points les plus anciens sont
+    écartés à chaque ajout.
+    
     Attributes:
         name: Nom de la métrique (ex: "http_requests_total")
         metric_type: Type de métrique
-        values: Liste des valeurs collectées
         description: Description de la métrique
+        labels: Labels de la série (ceux du premier point ajouté)
+        max_history: Nombre maximal de points gardés (None: illimité)
     """
     name: str
     metric_type: MetricType
-    values: List[MetricValue] = field(default_factory=list)
     description: Optional[str] = None
+    labels: Dict[str, str] = field(default_factory=dict)
+    max_history: Optional[int] = field(default=None, repr=False, compare=False)
+    # Colonnes des points; les points actifs commencent à l'index _start
+    # (les points écartés par max_history restent en tête jusqu'à la
+    # prochaine réallocation du tampon)
+    _timestamps: List[datetime] = field(default_factory=list, repr=False, compare=False)
+    # Tampon des valeurs (capacité >= _start + _n) et nombre de points
+    _values: np.ndarray = field(default=None, repr=False, compare=False)
+    _start: int = field(default=0, repr=False, compare=False)
+    _n: int = field(default=0, repr=False, compare=False)
+    # Labels par point, créés seulement si un point diffère de 'labels'
+    # (alignés sur _timestamps)
+    _point_labels: Optional[List[Dict[str, str]]] = field(
+        default=None, repr=False, compare=False
+    )
+    # Vue en lecture seule des valeurs et tableau des timestamps, construits
+    # à la demande pour la version _np_version (voir values_np et timestamps_np)
+    _values_np: Optional[np.ndarray] = field(default=None, repr=False, compare=False)
+    _timestamps_np: Optional[np.ndarray] = field(default=None, repr=False, compare=False)
+    _np_version: int = field(default=0, repr=False, compare=False)
+    # Compteur incrémenté à chaque ajout de points, et résultats mémorisés
+    # des détecteurs pour une version donnée (voir BaseDetector.detect_cached)
+    _version: int = field(default=0, repr=False, compare=False)
+    _detect_cache: Optional[Dict[Any, Any]] = field(default=None, repr=False, compare=False)
+    # Moyenne et somme des carrés des écarts (M2), tenues à jour à chaque
+    # ajout (Welford) tant qu'aucun point n'est écarté, sinon recalculées à
+    # la demande; valables pour la version _stats_version (voir mean et std)
+    _mean: float = field(default=0.0, repr=False, compare=False)
+    _m2: float = field(default=0.0, repr=False, compare=False)
+    _stats_version: int = field(default=0, repr=False, compare=False)
+    
+    def __init__(
+        self,
+        name: str,
+        metric_type: MetricType,
+        values: Optional[List[MetricValue]] = None,
+        description: Optional[str] = None,
+        max_history: Optional[int] = None
+    ):
+        if max_history is not None and max_history < 1:
+            raise ValueError(f"max_history must be at least 1, got {max_history}")
+        self.name = name
+        self.metric_type = metric_type
+        self.description = description
+        self.labels = {}
+        self.max_history = max_history
+        self._timestamps = []
+        self._values = _EMPTY_BUFFER
+        self._start = 0
+        self._n = 0
+        self._point_labels = None
+        self._values_np = None
+        self._timestamps_np = None
+        self._np_version = 0
+        self._version = 0
+        self._detect_cache = None
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._stats_version = 0
+        for v in values or ():
+            self.add_value(v.timestamp, v.value, v.labels)
+    
+    @property
+    def version(self) -> int:
+        """Version du contenu: change à chaque ajout de points."""
+        return self._version
+    
+    @property
+    def mean(self) -> float:
+        """
+        Moyenne des valeurs (nan si la métrique est vide).
+        
+        En O(1), sauf après que max_history a écarté des points:
+        recalculée alors une fois par version.
+        """
+        if self._stats_version != self._version:
+            self._recompute_stats()
+        return self._mean if self._n else math.nan
+    
+    @property
+    def std(self) -> float:
+        """
+        Écart-type (de population, comme np.std) des valeurs.
+        
+        Même coût que mean; nan si la métrique est vide.
+        """
+        if self._stats_version != self._version:
+            self._recompute_stats()
+        return math.sqrt(self._m2 / self._n) if self._n else math.nan
+    
+    @property
+    def values(self) -> List[MetricValue]:
+        """
+        Points sous forme d'objets MetricValue (compatibilité).
+        
+        Liste construite à chaque appel: préférer values_np, timestamps_np
+        ou len(metric) dans le code sensible aux performances.
+        """
+        start = self._start
+        values = self.values_np.tolist()
+        timestamps = self._timestamps[start:]
+        if self._point_labels is None:
+            labels = self.labels
+            return [MetricValue(ts, v, labels) for ts, v in zip(timestamps, values)]
+        return [
+            MetricValue(ts, v, lbl)
+            for ts, v, lbl in zip(timestamps, values, self._point_labels[start:])
+        ]
+    
+    @property
+    def values_np(self) -> np.ndarray:
+        """
+        Valeurs sous forme de tableau NumPy float64 contigu, en lecture seule.
+        
+        Vue sans copie sur le tampon des valeurs, partagée par tous les
+        détecteurs; renouvelée si des valeurs ont été ajoutées depuis (les
+        vues déjà distribuées restent valides).
+        """
+        if self._np_version != self._version:
+            self._values_np = self._timestamps_np = None
+            self._np_version = self._version
+        arr = self._values_np
+        if arr is None:
+            arr = self._values[self._start:self._start + self._n]
+            arr.flags.writeable = False
+            self._values_np = arr
+        return arr
+    
+    @property
+    def timestamps_np(self) -> np.ndarray:
+        """
+        Timestamps sous forme de tableau NumPy (objets datetime), en lecture seule.
+        
+        Même cycle de vie que values_np. Les datetime sont conservés tels
+        quels (fuseau horaire compris).
+        """
+        if self._np_version != self._version:
+            self._values_np = self._timestamps_np = None
+            self._np_version = self._version
+        arr = self._timestamps_np
+        if arr is None:
+            arr = np.empty(self._n, dtype=object)
+            arr[:] = self._timestamps[self._start:]
+            arr.flags.writeable = False
+            self._timestamps_np = arr
+        return arr
+    
+    def recent(self, n: int) -> np.ndarray:
+        """Vue (sans copie, lecture seule) des n dernières valeurs."""
+        values = self.values_np
+        return values[max(len(values) - n, 0):]
     
     def add_value(self, timestamp: datetime, value: float, labels: Optional[Dict[str, str]] = None):
         """
@@ -61,28 +233,166 @@ class Metric:
             value: Valeur mesurée
             labels: Labels optionnels
         """
-        metric_value = MetricValue(
-            timestamp=timestamp,
-            value=value,
-            labels=labels or {}
-        )
-        self.values.append(metric_value)
+        labels = labels or {}
+        n = self._n
+        if not n:
+            self.labels = labels
+        elif self._point_labels is not None:
+            self._point_labels.append(labels)
+        elif labels is not self.labels and labels != self.labels:
+            # Premier point aux labels différents: passage aux labels par point
+            self._point_labels = [self.labels] * len(self._timestamps) + [labels]
+        end = self._start + n
+        if end == len(self._values):
+            self._reallocate(n + 1)
+            end = n
+        self._values[end] = value
+        self._timestamps.append(timestamp)
+        n += 1
+        
+        if self.max_history is not None and n > self.max_history:
+            # Fenêtre pleine: écarter le point le plus ancien; les
+            # statistiques seront recalculées à la demande (un Welford
+            # inverse accumulerait des erreurs d'arrondi)
+            self._start += 1
+            n -= 1
+        elif self._stats_version == self._version:
+            # Mise à jour de Welford (valeur relue depuis le tampon float64)
+            x = float(self._values[end])
+            delta = x - self._mean
+            self._mean += delta / n
+            self._m2 += delta * (x - self._mean)
+            self._stats_version += 1
+        self._n = n
+        self._version += 1
+    
+    def extend_from_arrays(
+        self,
+        timestamps: Sequence[datetime],
+        values: np.ndarray,
+        labels: Optional[Dict[str, str]] = None
+    ):
+        """
+        Ajoute une série de points en une fois (mêmes labels pour tous).
+        
+        Si la métrique est vide, le tableau 'values' (float64 contigu) sert
+        directement de tampon, sans copie.
+        
+        Args:
+            timestamps: Moments des mesures
+            values: Valeurs mesurées, alignées sur timestamps
+            labels: Labels optionnels, communs aux points ajoutés
+        """
+        values = np.asarray(values, dtype=np.float64)
+        n = len(values)
+        if len(timestamps) != n:
+            raise ValueError(
+                f"timestamps and values must have the same length, "
+                f"got {len(timestamps)} and {n}"
+            )
+        if n == 0:
+            return
+        
+        labels = labels or {}
+        count = self._n
+        if not count:
+            self.labels = labels
+        elif self._point_labels is not None:
+            self._point_labels.extend([labels] * n)
+        elif labels is not self.labels and labels != self.labels:
+            self._point_labels = [self.labels] * len(self._timestamps) + [labels] * n
+        self._timestamps.extend(timestamps)
+        
+        if not count and values.flags.c_contiguous:
+            # Seules les positions au-delà des points actifs sont écrites
+            # ensuite (après réallocation): le tableau de l'appelant n'est
+            # pas modifié
+            self._values = values
+            self._start = 0
+        else:
+            end = self._start + count
+            if end + n > len(self._values):
+                self._reallocate(count + n)
+                end = count
+            self._values[end:end + n] = values
+        self._n = count + n
+        
+        if self.max_history is not None and self._n > self.max_history:
+            # Garder les max_history derniers points (statistiques
+            # recalculées à la demande)
+            self._start += self._n - self.max_history
+            self._n = self.max_history
+        elif self._stats_version == self._version:
+            # Combinaison des statistiques du lot et des précédentes (Chan et al.)
+            batch_mean = float(values.mean())
+            batch_m2 = float(np.square(values - batch_mean).sum())
+            total = count + n
+            delta = batch_mean - self._mean
+            self._mean += delta * n / total
+            self._m2 += batch_m2 + delta * delta * count * n / total
+            self._stats_version += 1
+        self._version += 1
+    
+    def _reallocate(self, needed: int):
+        """
+        Copie les points actifs en tête d'un nouveau tampon (capacité doublée,
+        au moins 'needed') et libère les points écartés par max_history.
+        
+        Un nouveau tampon est toujours alloué: les vues déjà distribuées par
+        values_np ne sont jamais modifiées.
+        """
+        start, n = self._start, self._n
+        buffer = np.empty(max(needed, 2 * n, 8), dtype=np.float64)
+        buffer[:n] = self._values[start:start + n]
+        self._values = buffer
+        if start:
+            del self._timestamps[:start]
+            if self._point_labels is not None:
+                del self._point_labels[:start]
+            self._start = 0
+    
+    def _recompute_stats(self):
+        """Recalcule moyenne et M2 sur les points actifs (version courante)."""
+        values = self.values_np
+        self._mean = float(values.mean()) if self._n else 0.0
+        self._m2 = float(np.square(values - self._mean).sum())
+        self._stats_version = self._version
     
     def get_values_array(self) -> List[float]:
         """Retourne uniquement les valeurs (sans timestamps)."""
-        return [v.value for v in self.values]
+        return self.values_np.tolist()
     
     def get_timestamps_array(self) -> List[datetime]:
         """Retourne uniquement les timestamps."""
-        return [v.timestamp for v in self.values]
+        return self._timestamps[self._start:]
     
     def get_latest_value(self) -> Optional[MetricValue]:
         """Retourne la dernière valeur collectée."""
-        return self.values[-1] if self.values else None
+        if not self._n:
+            return None
+        labels = self.labels if self._point_labels is None else self._point_labels[-1]
+        return MetricValue(
+            self._timestamps[-1], float(self._values[self._start + self._n - 1]), labels
+        )
     
     def __len__(self) -> int:
         """Retourne le nombre de valeurs."""
-        return len(self.values)
+        return self._n
+    
+    def __eq__(self, other: object) -> bool:
+        # Seuls les points actifs comptent (le tampon peut avoir une capacité
+        # et un début différents)
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (
+            (self.name, self.metric_type, self.description, self.labels,
+             self._timestamps[self._start:],
+             None if self._point_labels is None else self._point_labels[self._start:])
+            == (other.name, other.metric_type, other.description, other.labels,
+                other._timestamps[other._start:],
+                None if other._point_labels is None else other._point_labels[other._start:])
+            and np.array_equal(self.values_np, other.values_np)
+        )
     
     def __repr__(self) -> str:
-        return f"Metric(name={self.name}, type={self.metric_type.value}, points={len(self.values)})"
\ No newline at end of file
+        return f"Metric(name={self.name}, type={self.metric_type.value}, points={len(self)})"
@@ -4,6 +4,7 @@ Package utils - Utilitaires.
 
 from .logger import get_logger, LoggerConfig
 from .prometheus_client import PrometheusClient
-from .llm_client import get_llm_client, LLMClient
+from .async_prometheus_client import AsyncPrometheusClient
+from .llm_client import get_llm_client, LLMClient, BatchingLLMClient
 
-__all__ = ['get_logger', 'LoggerConfig', 'PrometheusClient', 'get_llm_client', 'LLMClient']
\ No newline at end of file
+__all__ = ['get_logger', 'LoggerConfig', 'PrometheusClient', 'AsyncPrometheusClient', 'get_llm_client', 'LLMClient', 'BatchingLLMClient']
\ No newline at end of file
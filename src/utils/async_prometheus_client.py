@@ -0,0 +1,121 @@
+"""
+Client Prometheus asynchrone.
+
+Utilisé par l'API FastAPI pour interroger Prometheus sans bloquer la boucle
+d'événements. Un seul httpx.AsyncClient est partagé par toute l'application
+(pool de connexions keep-alive, HTTP/2 si le paquet h2 est installé).
+"""
+
+import asyncio
+import importlib.util
+from typing import Any, Dict, List, Optional
+
+import httpx
+import orjson
+
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+# HTTP/2 nécessite le paquet optionnel h2 (pip install "httpx[http2]")
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class AsyncPrometheusClient:
+    """
+    Client asynchrone pour l'API HTTP de Prometheus.
+
+    Le client sync (PrometheusClient) reste utilisé par le collecteur;
+    celui-ci sert aux endpoints de l'API.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        timeout: float = 5.0,
+        verify_ssl: bool = True,
+        max_keepalive_connections: int = 20,
+        max_connections: int = 100
+    ):
+        """
+        Initialise le client.
+
+        Args:
+            url: URL du serveur Prometheus (ex: http://localhost:9090)
+            timeout: Timeout des requêtes en secondes
+            verify_ssl: Vérifier le certificat SSL
+            max_keepalive_connections: Connexions gardées ouvertes dans le pool
+            max_connections: Nombre maximum de connexions simultanées
+        """
+        self.url = url
+        self.client = httpx.AsyncClient(
+            base_url=url,
+            http2=_HTTP2_AVAILABLE,
+            verify=verify_ssl,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_keepalive_connections=max_keepalive_connections,
+                max_connections=max_connections
+            )
+        )
+        logger.info(f"Async Prometheus client ready for {url} (http2={_HTTP2_AVAILABLE})")
+
+    async def get_metric_data(self, metric_name: str) -> List[Dict[str, Any]]:
+        """
+        Récupère les séries actuelles d'une métrique (requête instantanée).
+
+        Args:
+            metric_name: Nom de la métrique ou requête PromQL
+
+        Returns:
+            Liste des séries retournées par Prometheus (vide si aucune)
+        """
+        response = await self.client.get("/api/v1/query", params={"query": metric_name})
+        response.raise_for_status()
+
+        payload = orjson.loads(response.content)
+        if payload.get("status") != "success":
+            raise RuntimeError(f"Prometheus query failed: {payload.get('error', 'unknown error')}")
+
+        return payload.get("data", {}).get("result", [])
+
+    async def get_current_values_many(
+        self,
+        queries: List[str],
+        max_concurrency: int = 32
+    ) -> Dict[str, Optional[float]]:
+        """
+        Récupère la valeur actuelle de plusieurs requêtes en parallèle.
+
+        Les requêtes partagent le pool de connexions du client; au plus
+        max_concurrency sont en vol en même temps.
+
+        Args:
+            queries: Requêtes PromQL
+            max_concurrency: Nombre maximum de requêtes simultanées
+
+        Returns:
+            Dictionnaire requête -> valeur de la première série
+            (None si pas de résultat ou en cas d'erreur)
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch(query: str) -> Optional[float]:
+            async with semaphore:
+                try:
+                    result = await self.get_metric_data(query)
+                except Exception as e:
+                    logger.error(f"Error executing query '{query}': {e}")
+                    return None
+            if not result:
+                logger.warning(f"Query '{query}' returned no results")
+                return None
+            return float(result[0]['value'][1])
+
+        unique = list(dict.fromkeys(queries))
+        values = await asyncio.gather(*(fetch(query) for query in unique))
+        return dict(zip(unique, values))
+
+    async def aclose(self):
+        """Ferme le pool de connexions."""
+        await self.client.aclose()
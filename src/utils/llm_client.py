@@ -1,11 +1,115 @@
 class RateLimitError(Exception):
     pass
-from typing import Optional, Dict, Any
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Dict, Any, Awaitable, Callable, List, Tuple, Union
+import asyncio
+import hashlib
+import json
 import os
+import queue
+import re
+import threading
+import time
+
+import httpx
+
 from ..utils.logger import get_logger
+from .async_prometheus_client import _HTTP2_AVAILABLE
+
+# Décodeur JSON des réponses LLM: orjson si disponible (plus rapide)
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 logger = get_logger()
 
+# Budget de tokens de réponse par anomalie d'un lot, et maximum par requête:
+# un lot compte au plus _MAX_BATCH_TOKENS // _TOKENS_PER_ANOMALY anomalies
+_TOKENS_PER_ANOMALY = 300
+_MAX_BATCH_TOKENS = 4096
+
+# Objet JSON entouré de texte (ex: bloc ```json ... ```) dans une réponse
+_JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+# Sous ce nombre de requêtes restantes (en-tête x-ratelimit-remaining-requests),
+# les appels attendent la réinitialisation du quota (x-ratelimit-reset-requests)
+_RATE_LIMIT_MIN_REMAINING = 2
+
+# Durée Groq des en-têtes de quota (ex: "2m59.56s", "7.66s", "120ms")
+_DURATION_RE = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+_DURATION_UNITS = {'h': 3600.0, 'm': 60.0, 's': 1.0, 'ms': 0.001}
+
+
+def _parse_duration(value: str) -> float:
+    """Convertit une durée d'en-tête de quota en secondes (0 si illisible)."""
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in _DURATION_RE.findall(value))
+
+
+class _AdaptiveLimiter:
+    """
+    Concurrence adaptative des requêtes asynchrones vers le LLM.
+    
+    Limite AIMD: +1 requête simultanée après un succès (jusqu'au maximum),
+    divisée par 2 après un 429. Quand les en-têtes de quota annoncent
+    moins de _RATE_LIMIT_MIN_REMAINING requêtes restantes, les nouveaux
+    appels attendent la réinitialisation annoncée. À créer dans la boucle
+    asyncio qui l'utilise.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = self.max_concurrency
+        self._in_flight = 0
+        self._resume_at = 0.0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self):
+        """Attend une place libre puis la fin d'une éventuelle pause de quota."""
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+        delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def release(self, rate_limited: bool = False):
+        """Libère une place et ajuste la limite (AIMD)."""
+        async with self._cond:
+            self._in_flight -= 1
+            if rate_limited:
+                self.limit = max(1, self.limit // 2)
+            elif self.limit < self.max_concurrency:
+                self.limit += 1
+            self._cond.notify_all()
+
+    def observe(self, headers: Any):
+        """Programme une pause si le quota restant est presque épuisé."""
+        remaining = headers.get('x-ratelimit-remaining-requests')
+        reset = headers.get('x-ratelimit-reset-requests')
+        if remaining is None or reset is None:
+            return
+        try:
+            remaining = int(remaining)
+        except ValueError:
+            return
+        if remaining < _RATE_LIMIT_MIN_REMAINING:
+            resume_at = time.monotonic() + _parse_duration(reset)
+            if resume_at > self._resume_at:
+                self._resume_at = resume_at
+                logger.warning(f"LLM quota nearly exhausted, pausing requests for {reset}")
+
+
+class _PromptFields(dict):
+    """Champs d'une anomalie pour les gabarits de prompt (valeur par défaut si absent)."""
+
+    _DEFAULTS = {'metric_name': 'unknown', 'anomaly_type': 'unknown', 'severity': 'unknown'}
+
+    def __missing__(self, key: str) -> str:
+        return self._DEFAULTS.get(key, 'N/A')
+
 
 class LLMClient:
     """
@@ -15,12 +119,81 @@ class LLMClient:
 
     # Modèle par défaut
     DEFAULT_MODEL = "llama-3.3-70b-versatile"
-    FALLBACK_MODEL = "openai/gpt-oss-120b"  
+    FALLBACK_MODEL = "openai/gpt-oss-120b"
+    # Modèles essayés dans l'ordre quand le modèle courant est indisponible
+    MODEL_CASCADE = [DEFAULT_MODEL, FALLBACK_MODEL]
+
+    # Message système identique pour toutes les requêtes (préfixe commun)
+    SYSTEM_PROMPT = "Tu es un expert en métriques et monitoring."
+
+    # Gabarits des prompts, remplis par str.format_map (voir _PromptFields)
+    VALIDATION_PROMPT_TEMPLATE = """
+Tu es un expert en détection d'anomalies de monitoring.
+Valide si cette anomalie est réelle et fournis une analyse :
+
+ANOMALIE DÉTECTÉE:
+- Métrique: {metric_name}
+- Type: {anomaly_type}
+- Valeur observée: {value}
+- Valeur attendue: {expected_value}
+- Sévérité: {severity}
+- Confiance du détecteur: {confidence}
+- Description initiale: {description}
+
+DEMANDES:
+1. Cette anomalie est-elle réelle (Oui/Non) et pourquoi ?
+2. Quel impact potentiel sur le service ?
+3. Des actions recommend pour investigation ?
+4. Peut-on filtrer des faux positifs ?
+
+Sois précis et concis.
+"""
+
+    BATCH_LINE_TEMPLATE = (
+        "[{index}] Métrique: {metric_name} | "
+        "Type: {anomaly_type} | "
+        "Valeur observée: {value} | "
+        "Valeur attendue: {expected_value} | "
+        "Sévérité: {severity} | "
+        "Confiance du détecteur: {confidence} | "
+        "Description initiale: {description}"
+    )
+
+    BATCH_PROMPT_TEMPLATE = """
+Tu es un expert en détection d'anomalies de monitoring.
+Valide si chacune de ces anomalies est réelle et fournis une analyse :
+
+ANOMALIES DÉTECTÉES:
+{anomalies_block}
+
+Pour chaque anomalie, indique si elle est réelle (Oui/Non) et pourquoi,
+l'impact potentiel sur le service et les actions recommandées.
+
+Réponds uniquement avec un objet JSON de la forme:
+{{"results": [{{"index": 0, "llm_validation": true, "llm_analysis": "..."}}]}}
+avec exactement un élément par anomalie, "index" reprenant son numéro.
+Sois précis et concis.
+"""
 
-    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: Optional[str] = None,
+        cache_ttl: float = 3600,
+        cache_max_entries: int = 10000
+    ):
         self.api_key = api_key or os.getenv("GROQ_API_KEY")
         self.model = model or self.DEFAULT_MODEL
 
+        # Cache LRU des réponses de validate_anomaly: SHA-256 du prompt
+        # (les champs volatils comme le timestamp n'y figurent pas)
+        # -> (instant, résultat)
+        self.cache_ttl = cache_ttl
+        self.cache_max_entries = cache_max_entries
+        self.cache_hits = 0
+        self._cache: 'OrderedDict[str, Tuple[float, Dict[str, Any]]]' = OrderedDict()
+        self._cache_lock = threading.Lock()
+
         if not self.api_key:
             logger.warning(
                 "GROQ_API_KEY not found. LLM features disabled."
@@ -34,7 +207,12 @@ class LLMClient:
             from groq import Groq
 
             try:
-                self.client = Groq(api_key=self.api_key)
+                # Transport httpx explicite: HTTP/2 (multiplexage des
+                # requêtes concurrentes sur une connexion) si h2 est installé
+                self.client = Groq(
+                    api_key=self.api_key,
+                    http_client=httpx.Client(http2=_HTTP2_AVAILABLE)
+                )
                 self.enabled = True
                 logger.info(f"LLM Client initialized with Groq API (model={self.model})")
             except Exception as e:
@@ -49,34 +227,290 @@ class LLMClient:
             return {"llm_validation": None, "llm_analysis": None}
 
         prompt = self._build_validation_prompt(anomaly_dict)
+        key = self._cache_key(prompt)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        result = self._validate_prompt(prompt)
+        self._cache_put(key, result)
+        return result
 
+    def _validate_prompt(self, prompt: str) -> Dict[str, Any]:
+        """Envoie le prompt de validation (avec bascule sur MODEL_CASCADE)."""
         try:
-            return self._call_model(prompt, self.model)
+            result, _ = self._call_with_fallback(
+                lambda model_name: self._call_model(prompt, model_name)
+            )
+            return result
         except Exception as e:
             # Rate limit error handling
             if ("rate limit" in str(e).lower() or "429" in str(e)):
                 logger.warning(f"LLM rate limit reached: {e}")
                 raise RateLimitError(str(e))
-            # Si modèle décommissionné ou non trouvé, bascule sur fallback
-            if "model_decommissioned" in str(e) or "model_not_found" in str(e):
-                logger.warning(
-                    f"Modèle {self.model} indisponible, bascule sur {self.FALLBACK_MODEL}"
-                )
+            logger.error(f"LLM validation error: {e}")
+            return {"llm_validation": False, "llm_error": str(e)}
+
+    @property
+    def _fallback_models(self) -> List[str]:
+        """Modèles de MODEL_CASCADE à essayer après self.model."""
+        return [model_name for model_name in self.MODEL_CASCADE if model_name != self.model]
+
+    @staticmethod
+    def _is_model_unavailable(error: Exception) -> bool:
+        """Indique si l'erreur signale un modèle décommissionné ou inconnu."""
+        return "model_decommissioned" in str(error) or "model_not_found" in str(error)
+
+    def _call_with_fallback(self, call: Callable[[str], Any]) -> Tuple[Any, str]:
+        """
+        Appelle call(modèle) avec self.model puis, tant que le modèle est
+        indisponible, avec les modèles suivants de MODEL_CASCADE.
+
+        Returns:
+            Tuple (résultat, modèle qui a répondu)
+
+        Raises:
+            La dernière erreur si aucun modèle n'a répondu
+        """
+        model_name = self.model
+        fallbacks = iter(self._fallback_models)
+        while True:
+            try:
+                return call(model_name), model_name
+            except Exception as e:
+                next_model = next(fallbacks, None) if self._is_model_unavailable(e) else None
+                if next_model is None:
+                    raise
+                logger.warning(f"Modèle {model_name} indisponible, bascule sur {next_model}")
+                model_name = next_model
+
+    async def _call_with_fallback_async(
+        self,
+        call: Callable[[str], Awaitable[Any]]
+    ) -> Any:
+        """Version asynchrone de _call_with_fallback (retourne le résultat seul)."""
+        model_name = self.model
+        fallbacks = iter(self._fallback_models)
+        while True:
+            try:
+                return await call(model_name)
+            except Exception as e:
+                next_model = next(fallbacks, None) if self._is_model_unavailable(e) else None
+                if next_model is None:
+                    raise
+                logger.warning(f"Modèle {model_name} indisponible, bascule sur {next_model}")
+                model_name = next_model
+
+    async def validate_anomaly_async(
+        self,
+        anomaly_dict: Dict[str, Any],
+        aclient: Any,
+        limiter: Optional[_AdaptiveLimiter] = None
+    ) -> Dict[str, Any]:
+        """
+        Version asynchrone de validate_anomaly.
+        
+        Args:
+            anomaly_dict: Anomalie à valider (format to_dict)
+            aclient: Client AsyncGroq (voir validate_many)
+            limiter: Limiteur informé des en-têtes de quota (optionnel)
+            
+        Returns:
+            Résultat LLM de l'anomalie
+            
+        Raises:
+            RateLimitError: Limite de débit atteinte
+        """
+        prompt = self._build_validation_prompt(anomaly_dict)
+        key = self._cache_key(prompt)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        result = await self._validate_prompt_async(aclient, prompt, limiter)
+        self._cache_put(key, result)
+        return result
+
+    async def _validate_prompt_async(
+        self,
+        aclient: Any,
+        prompt: str,
+        limiter: Optional[_AdaptiveLimiter] = None
+    ) -> Dict[str, Any]:
+        """Version asynchrone de _validate_prompt."""
+        try:
+            return await self._call_with_fallback_async(
+                lambda model_name: self._call_model_async(aclient, prompt, model_name, limiter)
+            )
+        except Exception as e:
+            if ("rate limit" in str(e).lower() or "429" in str(e)):
+                response = getattr(e, 'response', None)
+                if limiter is not None and response is not None:
+                    limiter.observe(response.headers)
+                logger.warning(f"LLM rate limit reached: {e}")
+                raise RateLimitError(str(e))
+            logger.error(f"LLM validation error: {e}")
+            return {"llm_validation": False, "llm_error": str(e)}
+
+    async def validate_many(
+        self,
+        anomaly_dicts: List[Dict[str, Any]],
+        max_concurrency: int = 16
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Valide plusieurs anomalies (une requête chacune) en parallèle.
+        
+        Les requêtes partagent un client AsyncGroq (pool de connexions,
+        HTTP/2 si h2 est installé) et au plus max_concurrency sont en
+        cours à la fois. Le multiplexage HTTP/2 n'apporte un gain net
+        qu'à partir d'une trentaine de requêtes simultanées.
+        
+        La concurrence s'adapte au quota (voir _AdaptiveLimiter); les 429
+        sont d'abord réessayés par le SDK Groq (backoff exponentiel avec
+        jitter, max_retries).
+        
+        Args:
+            anomaly_dicts: Anomalies à valider (format to_dict)
+            max_concurrency: Nombre maximal de requêtes simultanées
+            
+        Returns:
+            Un résultat par anomalie, dans l'ordre d'entrée; une exception
+            (ex: RateLimitError) à la place du résultat en cas d'échec
+        """
+        if not self.enabled:
+            return [{"llm_validation": None, "llm_analysis": None} for _ in anomaly_dicts]
+
+        from groq import AsyncGroq
+
+        limiter = _AdaptiveLimiter(max_concurrency)
+        http_client = httpx.AsyncClient(
+            http2=_HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency
+            )
+        )
+
+        async with AsyncGroq(api_key=self.api_key, http_client=http_client) as aclient:
+            async def run(anomaly_dict: Dict[str, Any]) -> Dict[str, Any]:
+                await limiter.acquire()
+                rate_limited = False
                 try:
-                    return self._call_model(prompt, self.FALLBACK_MODEL)
-                except Exception as e2:
-                    logger.error(f"LLM fallback also failed: {e2}")
-                    return {"llm_validation": False, "llm_error": str(e2)}
-            else:
-                logger.error(f"LLM validation error: {e}")
-                return {"llm_validation": False, "llm_error": str(e)}
+                    return await self.validate_anomaly_async(anomaly_dict, aclient, limiter)
+                except RateLimitError:
+                    rate_limited = True
+                    raise
+                finally:
+                    await limiter.release(rate_limited)
+
+            return await asyncio.gather(
+                *(run(anomaly_dict) for anomaly_dict in anomaly_dicts),
+                return_exceptions=True
+            )
+
+    def validate_many_sync(
+        self,
+        anomaly_dicts: List[Dict[str, Any]],
+        max_concurrency: int = 16
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Appelle validate_many depuis du code synchrone.
+        
+        Utilise une boucle asyncio dédiée (dans un thread à part si une
+        boucle tourne déjà dans le thread appelant).
+        """
+        coro = self.validate_many(anomaly_dicts, max_concurrency)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, coro).result()
+
+    def _cache_key(self, prompt: str) -> str:
+        """Empreinte SHA-256 d'un prompt pour le modèle courant."""
+        return hashlib.sha256(f"{self.model}\n{prompt}".encode()).hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Retourne la réponse en cache si elle n'a pas expiré."""
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] >= self.cache_ttl:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            hits = self.cache_hits
+        logger.debug("LLM response cache hit ({} hits)", hits)
+        return dict(entry[1])
+
+    def _cache_put(self, key: str, result: Dict[str, Any]):
+        """Met en cache une réponse réussie (éviction LRU)."""
+        if not result.get("llm_analysis") or "llm_error" in result:
+            return
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic(), dict(result))
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_max_entries:
+                self._cache.popitem(last=False)
+
+    def validate_anomalies_batch(
+        self,
+        anomaly_dicts: List[Dict[str, Any]],
+        batch_size: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Valide plusieurs anomalies avec une requête LLM par lot.
+        
+        Le prompt système et les consignes ne sont envoyés qu'une fois par
+        lot; le modèle répond un objet JSON contenant un résultat par anomalie.
+        La taille des lots est bornée pour que les réponses tiennent dans
+        le budget de tokens d'une requête.
+        
+        Args:
+            anomaly_dicts: Anomalies à valider (format to_dict)
+            batch_size: Nombre d'anomalies par requête
+            
+        Returns:
+            Un résultat par anomalie, dans l'ordre d'entrée
+            
+        Raises:
+            RateLimitError: Limite de débit atteinte
+            ValueError: Réponse du LLM inexploitable
+        """
+        if not self.enabled:
+            return [{"llm_validation": None, "llm_analysis": None} for _ in anomaly_dicts]
+
+        batch_size = max(1, min(batch_size, _MAX_BATCH_TOKENS // _TOKENS_PER_ANOMALY))
+
+        results = []
+        for i in range(0, len(anomaly_dicts), batch_size):
+            chunk = anomaly_dicts[i:i + batch_size]
+            prompt = self._build_batch_prompt(chunk)
+            max_tokens = _TOKENS_PER_ANOMALY * len(chunk)
+
+            try:
+                content, model_name = self._call_with_fallback(
+                    lambda model_name: self._call_model_json(prompt, model_name, max_tokens)
+                )
+            except Exception as e:
+                if ("rate limit" in str(e).lower() or "429" in str(e)):
+                    logger.warning(f"LLM rate limit reached: {e}")
+                    raise RateLimitError(str(e))
+                raise
+
+            results.extend(self._parse_batch_response(content, len(chunk), model_name))
+
+        return results
 
     def _call_model(self, prompt: str, model_name: str) -> Dict[str, Any]:
         """Appelle Groq API avec le modèle spécifié"""
         message = self.client.chat.completions.create(
             model=model_name,
             messages=[
-                {"role": "system", "content": "Tu es un expert en métriques et monitoring."},
+                {"role": "system", "content": self.SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.3,
@@ -84,35 +518,203 @@ class LLMClient:
             top_p=0.9
         )
         llm_response = message.choices[0].message.content
-        logger.debug(f"LLM Validation ({model_name}): {llm_response}")
+        logger.debug("LLM Validation ({}): {}", model_name, llm_response)
         return {
             "llm_validation": True,
             "llm_analysis": llm_response,
             "llm_model": model_name
         }
 
+    async def _call_model_async(
+        self,
+        aclient: Any,
+        prompt: str,
+        model_name: str,
+        limiter: Optional[_AdaptiveLimiter] = None
+    ) -> Dict[str, Any]:
+        """Appelle Groq API (client asynchrone) avec le modèle spécifié"""
+        raw = await aclient.chat.completions.with_raw_response.create(
+            model=model_name,
+            messages=[
+                {"role": "system", "content": self.SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            max_tokens=500,
+            top_p=0.9
+        )
+        if limiter is not None:
+            limiter.observe(raw.headers)
+        message = await raw.parse()
+        llm_response = message.choices[0].message.content
+        logger.debug("LLM Validation ({}): {}", model_name, llm_response)
+        return {
+            "llm_validation": True,
+            "llm_analysis": llm_response,
+            "llm_model": model_name
+        }
+
+    def _call_model_json(self, prompt: str, model_name: str, max_tokens: int) -> str:
+        """Appelle Groq API en mode JSON et retourne le contenu brut"""
+        message = self.client.chat.completions.create(
+            model=model_name,
+            messages=[
+                {"role": "system", "content": self.SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            max_tokens=max_tokens,
+            top_p=0.9,
+            response_format={"type": "json_object"}
+        )
+        llm_response = message.choices[0].message.content
+        logger.debug("LLM Batch Validation ({}): {}", model_name, llm_response)
+        return llm_response
+
+    def _parse_batch_response(
+        self,
+        content: str,
+        expected: int,
+        model_name: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Répartit la réponse JSON d'un lot par anomalie.
+        
+        Raises:
+            ValueError: JSON invalide ou résultat manquant pour une anomalie
+        """
+        try:
+            items = _json_loads(content).get("results", [])
+        except (ValueError, AttributeError) as e:
+            # Réponse non strictement JSON: extraire l'objet JSON qu'elle contient
+            match = _JSON_OBJECT_RE.search(content or "")
+            try:
+                items = _json_loads(match.group(0)).get("results", []) if match else None
+            except (ValueError, AttributeError):
+                items = None
+            if items is None:
+                raise ValueError(f"Invalid batch LLM response: {e}")
+
+        by_index = {}
+        for item in items:
+            if isinstance(item, dict) and isinstance(item.get("index"), int):
+                by_index[item["index"]] = item
+
+        missing = [i for i in range(expected) if i not in by_index]
+        if missing:
+            raise ValueError(f"Batch LLM response missing results for {missing}")
+
+        return [
+            {
+                "llm_validation": bool(by_index[i].get("llm_validation")),
+                "llm_analysis": str(by_index[i].get("llm_analysis", "")),
+                "llm_model": model_name
+            }
+            for i in range(expected)
+        ]
+
+    def _build_batch_prompt(self, anomalies: List[Dict[str, Any]]) -> str:
+        anomalies_block = "\n".join(
+            self.BATCH_LINE_TEMPLATE.format_map(_PromptFields(anomaly, index=i))
+            for i, anomaly in enumerate(anomalies)
+        )
+        return self.BATCH_PROMPT_TEMPLATE.format(anomalies_block=anomalies_block)
+
     def _build_validation_prompt(self, anomaly: Dict[str, Any]) -> str:
-        return f"""
-Tu es un expert en détection d'anomalies de monitoring.
-Valide si cette anomalie est réelle et fournis une analyse :
+        return self.VALIDATION_PROMPT_TEMPLATE.format_map(_PromptFields(anomaly))
 
-ANOMALIE DÉTECTÉE:
-- Métrique: {anomaly.get('metric_name', 'unknown')}
-- Type: {anomaly.get('anomaly_type', 'unknown')}
-- Valeur observée: {anomaly.get('value', 'N/A')}
-- Valeur attendue: {anomaly.get('expected_value', 'N/A')}
-- Sévérité: {anomaly.get('severity', 'unknown')}
-- Confiance du détecteur: {anomaly.get('confidence', 'N/A')}
-- Description initiale: {anomaly.get('description', 'N/A')}
+class BatchingLLMClient:
+    """
+    Regroupe les appels concurrents à validate_anomaly en requêtes par lot.
+    
+    Chaque appel met son anomalie en file et attend son résultat; un thread
+    de fond envoie la file au LLM dès que max_batch anomalies sont en
+    attente ou que max_wait_ms s'est écoulé depuis la première
+    (validate_anomalies_batch). Même interface que LLMClient: les autres
+    méthodes sont déléguées au client enveloppé.
+    """
 
-DEMANDES:
-1. Cette anomalie est-elle réelle (Oui/Non) et pourquoi ?
-2. Quel impact potentiel sur le service ?
-3. Des actions recommend pour investigation ?
-4. Peut-on filtrer des faux positifs ?
+    def __init__(self, client: LLMClient, max_batch: int = 8, max_wait_ms: float = 50):
+        self._client = client
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[Tuple[Dict[str, Any], Future]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+    def validate_anomaly(self, anomaly_dict: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Valide une anomalie, regroupée avec les appels concurrents.
+        
+        Raises:
+            RateLimitError: Limite de débit atteinte
+        """
+        if not self._client.enabled:
+            return {"llm_validation": None, "llm_analysis": None}
+
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((anomaly_dict, future))
+        return future.result()
+
+    def _ensure_worker(self):
+        """Démarre le thread de regroupement au premier appel."""
+        if self._worker is not None:
+            return
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run,
+                    name="llm-autobatch",
+                    daemon=True
+                )
+                self._worker.start()
+
+    def _run(self):
+        """Boucle du thread: collecte un lot puis l'envoie."""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: List[Tuple[Dict[str, Any], Future]]):
+        """Envoie un lot et résout le futur de chaque anomalie."""
+        anomaly_dicts = [anomaly_dict for anomaly_dict, _ in batch]
+        try:
+            if len(batch) == 1:
+                results = [self._client.validate_anomaly(anomaly_dicts[0])]
+            else:
+                results = self._client.validate_anomalies_batch(
+                    anomaly_dicts, batch_size=len(anomaly_dicts)
+                )
+        except RateLimitError as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        except Exception as e:
+            # Réponse groupée inexploitable: validation une par une
+            logger.warning(f"Batched LLM validation failed, validating one by one: {e}")
+            for anomaly_dict, future in batch:
+                try:
+                    future.set_result(self._client.validate_anomaly(anomaly_dict))
+                except Exception as e2:
+                    future.set_exception(e2)
+            return
+
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
 
-Sois précis et concis.
-"""
 
 # --- Fonction utilitaire pour obtenir l'instance globale ---
 
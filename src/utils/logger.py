@@ -17,7 +17,7 @@ class LoggerConfig:
         self,
         level: str = "INFO",
         log_file: Optional[str] = None,
-        rotation: str = "100 MB",
+        rotation: str = "20 MB",
         retention: str = "30 days",
         format_type: str = "text"
     ):
@@ -45,11 +45,18 @@ class LoggerConfig:
     
     def _setup_logger(self):
         """Configure les handlers du logger."""
+        # Emplacement complet (fonction:ligne) seulement en DEBUG: inutile
+        # à formater pour chaque message en production
+        if str(self.level).upper() == "DEBUG":
+            location = "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan>"
+        else:
+            location = "<cyan>{name}</cyan>"
+        
         # Format pour la console (coloré et lisible)
         console_format = (
             "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
             "<level>{level: <8}</level> | "
-            "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | "
+            f"{location} | "
             "<level>{message}</level>"
         )
         
@@ -80,6 +87,8 @@ class LoggerConfig:
             
             format_to_use = json_format if self.format_type == "json" else console_format
             
+            # enqueue: l'écriture et la compression à la rotation se font
+            # dans le thread de loguru, sans bloquer l'appelant
             logger.add(
                 self.log_file,
                 format=format_to_use,
@@ -87,7 +96,8 @@ class LoggerConfig:
                 rotation=self.rotation,
                 retention=self.retention,
                 compression="zip",
-                serialize=self.format_type == "json"
+                serialize=self.format_type == "json",
+                enqueue=True
             )
     
     @staticmethod
@@ -120,10 +130,11 @@ def log_function_call(func):
             pass
     """
     def wrapper(*args, **kwargs):
-        logger.debug(f"Calling {func.__name__} with args={args}, kwargs={kwargs}")
+        # Arguments passés à part: formatés seulement si DEBUG est actif
+        logger.debug("Calling {} with args={}, kwargs={}", func.__name__, args, kwargs)
         try:
             result = func(*args, **kwargs)
-            logger.debug(f"{func.__name__} completed successfully")
+            logger.debug("{} completed successfully", func.__name__)
             return result
         except Exception as e:
             logger.error(f"{func.__name__} failed with error: {e}")
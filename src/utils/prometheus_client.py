@@ -4,17 +4,90 @@ Client Prometheus pour la collecte de métriques.
 Ce module gère la connexion à Prometheus et l'exécution de requêtes PromQL.
 """
 
+import asyncio
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Union
 from prometheus_api_client import PrometheusConnect
+from prometheus_api_client.exceptions import PrometheusApiClientException
 from prometheus_api_client.utils import parse_datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import httpx
+import numpy as np
+import orjson
 import pandas as pd
 
 from ..models.metric import Metric, MetricValue, MetricType
 from ..utils.logger import get_logger
+from .async_prometheus_client import AsyncPrometheusClient, _HTTP2_AVAILABLE
 
 logger = get_logger()
 
+# Nom de métrique Prometheus brut (par opposition à une expression PromQL)
+METRIC_NAME_PATTERN = re.compile(r'[a-zA-Z_:][a-zA-Z0-9_:]*')
+
+# Nombre maximal de requêtes combinées dans une même expression PromQL
+# (limite de complexité des requêtes côté Prometheus)
+BATCH_MAX_QUERIES = 20
+
+# Durée de validité (secondes) de la liste des métriques et des métadonnées
+METRICS_LIST_TTL = 60.0
+METADATA_TTL = 300.0
+METADATA_CACHE_MAX_ENTRIES = 1024
+
+# Politique de retry des requêtes httpx si la session PrometheusConnect n'en
+# fournit pas (mêmes valeurs que prometheus_api_client)
+_DEFAULT_RETRY = Retry(
+    total=3,
+    backoff_factor=1,
+    status_forcelist=[408, 429, 500, 502, 503, 504]
+)
+
+# Période maximale (secondes) convertie avec un décalage UTC unique quand
+# il est le même aux deux bornes (aucun fuseau ne change deux fois d'heure
+# en une semaine)
+_SINGLE_OFFSET_MAX_SPAN = 7 * 86400
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _utc_offset(timestamp: float) -> int:
+    """Décalage (secondes) de l'heure locale par rapport à UTC à cet instant."""
+    seconds = int(timestamp)
+    return (datetime.fromtimestamp(seconds) - _EPOCH) // timedelta(seconds=1) - seconds
+
+
+def _local_datetimes(timestamps: np.ndarray) -> np.ndarray:
+    """
+    Convertit des timestamps Unix en heures locales naïves.
+    
+    Même résultat que datetime.fromtimestamp point par point, mais calculé
+    en NumPy quand le décalage UTC est constant sur la période.
+    
+    Args:
+        timestamps: Timestamps Unix (float64)
+        
+    Returns:
+        Tableau datetime64[us]
+    """
+    if len(timestamps) == 0:
+        return np.empty(0, dtype='datetime64[us]')
+    
+    first, last = float(timestamps.min()), float(timestamps.max())
+    offset = _utc_offset(first)
+    if last - first > _SINGLE_OFFSET_MAX_SPAN or _utc_offset(last) != offset:
+        # Changement d'heure possible dans la période: conversion point par point
+        return np.array(
+            [datetime.fromtimestamp(t) for t in timestamps.tolist()], dtype='datetime64[us]'
+        )
+    
+    micros = np.rint(timestamps * 1e6).astype(np.int64) + offset * 1_000_000
+    return micros.astype('datetime64[us]')
+
 
 class PrometheusClient:
     """
@@ -27,7 +100,8 @@ class PrometheusClient:
         self,
         url: str,
         timeout: int = 30,
-        verify_ssl: bool = True
+        verify_ssl: bool = True,
+        pool_size: int = 10
     ):
         """
         Initialise le client Prometheus.
@@ -36,21 +110,138 @@ class PrometheusClient:
             url: URL du serveur Prometheus (ex: http://localhost:9090)
             timeout: Timeout des requêtes en secondes
             verify_ssl: Vérifier le certificat SSL
+            pool_size: Nombre de connexions HTTP gardées ouvertes
+                (au moins le nombre de threads qui interrogent Prometheus)
         """
         self.url = url
         self.timeout = timeout
         self.verify_ssl = verify_ssl
         
+        # Caches TTL de list_metrics / get_metric_metadata: (monotonic, résultat)
+        self._metrics_list: Optional[tuple] = None
+        self._metadata_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
         try:
             self.prom = PrometheusConnect(
                 url=url,
                 disable_ssl=not verify_ssl
             )
-            logger.info(f"Connected to Prometheus at {url}")
+            self._resize_pool(pool_size)
+            # Même politique de retry pour les requêtes httpx (voir _get)
+            self._retry = self._session_retry()
+            # Client dédié aux query_range (chemin critique du collecteur):
+            # connexions persistantes partagées par tous les threads et,
+            # si h2 est installé, requêtes multiplexées sur une connexion
+            self._http = httpx.Client(
+                http2=_HTTP2_AVAILABLE,
+                verify=self.prom.ssl_verification,
+                timeout=timeout,
+                headers=self.prom.headers,
+                auth=self.prom.auth,
+                limits=httpx.Limits(
+                    max_keepalive_connections=pool_size,
+                    max_connections=pool_size
+                )
+            )
+            logger.info(f"Connected to Prometheus at {url} (http2={_HTTP2_AVAILABLE})")
         except Exception as e:
             logger.error(f"Failed to connect to Prometheus: {e}")
             raise
     
+    def _resize_pool(self, pool_size: int):
+        """
+        Remplace l'adaptateur HTTP de la session PrometheusConnect par un
+        adaptateur au pool dimensionné (en conservant sa politique de retry).
+        """
+        session = getattr(self.prom, '_session', None)
+        if session is None:
+            return
+        retry = session.get_adapter(self.prom.url).max_retries
+        session.mount(
+            self.prom.url,
+            HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+        )
+    
+    def _session_retry(self) -> Retry:
+        """Politique de retry de la session PrometheusConnect (ou _DEFAULT_RETRY)."""
+        session = getattr(self.prom, '_session', None)
+        if session is None:
+            return _DEFAULT_RETRY
+        retry = session.get_adapter(self.prom.url).max_retries
+        if not retry.total or not retry.status_forcelist:
+            return _DEFAULT_RETRY
+        return retry
+    
+    def _get(self, path: str, params: Dict[str, Any]) -> httpx.Response:
+        """
+        GET sur l'API Prometheus via le client httpx partagé, avec la
+        politique de retry de la session PrometheusConnect.
+        
+        Les erreurs de transport et les statuts de status_forcelist (408,
+        429, 5xx) sont retentés jusqu'à retry.total fois, avec un délai
+        exponentiel (backoff_factor * 2^(n-1)) ou l'en-tête Retry-After.
+        
+        Args:
+            path: Chemin de l'API (ex: /api/v1/query_range)
+            params: Paramètres de la requête
+            
+        Returns:
+            Dernière réponse reçue (éventuellement en erreur)
+            
+        Raises:
+            httpx.TransportError: Échec de connexion après tous les essais
+        """
+        retry = self._retry
+        url = f"{self.prom.url}{path}"
+        attempt = 0
+        while True:
+            response = None
+            try:
+                response = self._http.get(url, params=params)
+            except httpx.TransportError as e:
+                if attempt >= retry.total:
+                    raise
+                reason = repr(e)
+            else:
+                if response.status_code not in retry.status_forcelist or attempt >= retry.total:
+                    return response
+                reason = f"HTTP {response.status_code}"
+            
+            attempt += 1
+            delay = self._retry_delay(retry, attempt, response)
+            logger.warning(
+                "Prometheus request {} failed ({}), retry {}/{} in {:.1f}s",
+                path, reason, attempt, retry.total, delay
+            )
+            time.sleep(delay)
+    
+    @staticmethod
+    def _retry_delay(retry: Retry, attempt: int, response: Optional[httpx.Response]) -> float:
+        """Délai avant le nouvel essai n° attempt (Retry-After prioritaire)."""
+        backoff_max = getattr(retry, 'backoff_max', Retry.DEFAULT_BACKOFF_MAX)
+        if response is not None and retry.respect_retry_after_header:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after is not None:
+                try:
+                    return min(max(float(retry_after), 0.0), backoff_max)
+                except ValueError:
+                    pass
+        return min(retry.backoff_factor * 2 ** (attempt - 1), backoff_max)
+    
+    def close(self):
+        """Ferme les connexions HTTP du client."""
+        self._http.close()
+        session = getattr(self.prom, '_session', None)
+        if session is not None:
+            session.close()
+    
+    def invalidate_cache(self):
+        """Vide les caches de list_metrics et get_metric_metadata."""
+        with self._cache_lock:
+            self._metrics_list = None
+            self._metadata_cache.clear()
+    
     def check_connection(self) -> bool:
         """
         Vérifie que la connexion à Prometheus fonctionne.
@@ -86,7 +277,7 @@ class PrometheusClient:
             
             if result and len(result) > 0:
                 value = float(result[0]['value'][1])
-                logger.debug(f"Query '{query}' returned: {value}")
+                logger.debug("Query '{}' returned: {}", query, value)
                 return value
             
             logger.warning(f"Query '{query}' returned no results")
@@ -96,11 +287,113 @@ class PrometheusClient:
             logger.error(f"Error executing query '{query}': {e}")
             return None
     
+    def get_current_values(
+        self,
+        queries: List[str],
+        max_concurrency: int = 32
+    ) -> Dict[str, Optional[float]]:
+        """
+        Récupère la valeur actuelle de plusieurs requêtes en parallèle.
+        
+        Version groupée de get_current_value: les requêtes sont envoyées
+        simultanément par un AsyncPrometheusClient (boucle asyncio dédiée,
+        dans un thread à part si une boucle tourne déjà dans le thread
+        appelant).
+        
+        Args:
+            queries: Requêtes PromQL
+            max_concurrency: Nombre maximum de requêtes simultanées
+            
+        Returns:
+            Dictionnaire requête -> valeur (None si pas de résultat)
+        """
+        async def fetch_all() -> Dict[str, Optional[float]]:
+            client = AsyncPrometheusClient(
+                self.url, timeout=self.timeout, verify_ssl=self.verify_ssl
+            )
+            try:
+                return await client.get_current_values_many(queries, max_concurrency)
+            finally:
+                await client.aclose()
+        
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(fetch_all())
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, fetch_all()).result()
+    
+    def get_current_values_bulk(self, exprs: Dict[str, str]) -> Dict[str, Optional[float]]:
+        """
+        Récupère la valeur actuelle de plusieurs requêtes en un seul appel.
+        
+        Même principe que get_metrics_range_batch: chaque expression est
+        marquée par label_replace avec un __name__ synthétique et les
+        expressions sont combinées avec "or" (par groupes de
+        BATCH_MAX_QUERIES). Un groupe refusé par Prometheus (ex: HTTP 422)
+        est repris requête par requête avec get_current_values.
+        
+        Args:
+            exprs: Dictionnaire nom -> requête PromQL
+            
+        Returns:
+            Dictionnaire nom -> valeur de la première série
+            (None si pas de résultat)
+        """
+        values: Dict[str, Optional[float]] = {}
+        names = list(exprs)
+        
+        for offset in range(0, len(names), BATCH_MAX_QUERIES):
+            group = names[offset:offset + BATCH_MAX_QUERIES]
+            tags = {f"batch_{i}": name for i, name in enumerate(group)}
+            expression = " or ".join(
+                f'label_replace({exprs[name]}, "__name__", "{tag}", "", "")'
+                for tag, name in tags.items()
+            )
+            
+            try:
+                result = self._query(expression)
+            except Exception as e:
+                logger.warning(
+                    f"Bulk query failed for {len(group)} queries, querying one by one: {e}"
+                )
+                fallback = self.get_current_values([exprs[name] for name in group])
+                for name in group:
+                    values[name] = fallback.get(exprs[name])
+                continue
+            
+            for series in result or []:
+                name = tags.get(series.get('metric', {}).get('__name__'))
+                # Comme get_current_value: première série de chaque requête
+                if name is not None and name not in values:
+                    values[name] = float(series['value'][1])
+        
+        found = sum(value is not None for value in values.values())
+        logger.debug("Bulk query returned {} values for {} queries", found, len(names))
+        return {name: values.get(name) for name in names}
+    
+    def _query(self, query: str) -> List[Dict[str, Any]]:
+        """
+        Exécute une requête instantanée via le client httpx partagé.
+        
+        Returns:
+            Liste des séries retournées
+            
+        Raises:
+            PrometheusApiClientException: Réponse HTTP autre que 200
+        """
+        response = self._get("/api/v1/query", {"query": query})
+        if response.status_code != 200:
+            raise PrometheusApiClientException(
+                f"HTTP Status Code {response.status_code} ({response.content!r})"
+            )
+        return orjson.loads(response.content)["data"]["result"]
+    
     def get_metric_range(
         self,
         query: str,
-        start_time: datetime,
-        end_time: datetime,
+        start_time: Union[datetime, float],
+        end_time: Union[datetime, float],
         step: str = "1m"
     ) -> Optional[Metric]:
         """
@@ -108,8 +401,8 @@ class PrometheusClient:
         
         Args:
             query: Requête PromQL
-            start_time: Début de la période
-            end_time: Fin de la période
+            start_time: Début de la période (datetime ou timestamp Unix)
+            end_time: Fin de la période (datetime ou timestamp Unix)
             step: Pas d'échantillonnage (ex: "1m", "5m", "1h")
             
         Returns:
@@ -123,41 +416,152 @@ class PrometheusClient:
             60
         """
         try:
-            result = self.prom.custom_query_range(
-                query=query,
-                start_time=start_time,
-                end_time=end_time,
-                step=step
-            )
+            result = self._query_range(query, start_time, end_time, step)
             
             if not result or len(result) == 0:
-                logger.warning(f"Query '{query}' returned no results")
+                logger.warning("Query '{}' returned no results", query)
                 return None
             
-            # Créer l'objet Metric
-            metric = Metric(
-                name=query,
-                metric_type=MetricType.GAUGE  # On peut améliorer la détection du type
-            )
-            
-            # Extraire les valeurs
-            for data_point in result[0]['values']:
-                timestamp = datetime.fromtimestamp(data_point[0])
-                value = float(data_point[1])
-                
-                metric.add_value(
-                    timestamp=timestamp,
-                    value=value,
-                    labels=result[0].get('metric', {})
-                )
+            metric = self._build_metric(query, result[0])
             
-            logger.info(f"Collected {len(metric.values)} data points for '{query}'")
+            logger.info("Collected {} data points for '{}'", len(metric), query)
             return metric
             
         except Exception as e:
             logger.error(f"Error getting metric range for '{query}': {e}")
             return None
     
+    def _query_range(
+        self,
+        query: str,
+        start_time: Union[datetime, float],
+        end_time: Union[datetime, float],
+        step: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Exécute un query_range via le client httpx partagé.
+        
+        Contrairement à custom_query_range, accepte directement des
+        timestamps Unix (envoyés tels quels, Prometheus les accepte
+        nativement) en plus des datetime.
+        
+        Returns:
+            Liste des séries retournées
+            
+        Raises:
+            PrometheusApiClientException: Réponse HTTP autre que 200
+        """
+        if isinstance(start_time, datetime):
+            start_time = start_time.timestamp()
+        if isinstance(end_time, datetime):
+            end_time = end_time.timestamp()
+        
+        response = self._get(
+            "/api/v1/query_range",
+            {"query": query, "start": start_time, "end": end_time, "step": step}
+        )
+        if response.status_code != 200:
+            raise PrometheusApiClientException(
+                f"HTTP Status Code {response.status_code} ({response.content!r})"
+            )
+        return orjson.loads(response.content)["data"]["result"]
+    
+    def get_metrics_range_batch(
+        self,
+        queries: List[str],
+        start_time: Union[datetime, float],
+        end_time: Union[datetime, float],
+        step: str = "1m"
+    ) -> Optional[Dict[str, Metric]]:
+        """
+        Récupère l'historique de plusieurs requêtes en un seul query_range.
+        
+        Chaque requête est marquée par label_replace avec un __name__
+        synthétique, puis les requêtes sont combinées avec "or"; les séries
+        retournées sont ensuite réparties par requête d'origine. Au plus
+        BATCH_MAX_QUERIES requêtes doivent être passées par appel.
+        
+        Args:
+            queries: Requêtes PromQL (noms de métriques ou expressions)
+            start_time: Début de la période (datetime ou timestamp Unix)
+            end_time: Fin de la période (datetime ou timestamp Unix)
+            step: Pas d'échantillonnage
+            
+        Returns:
+            Dictionnaire requête -> Metric (les requêtes sans données sont
+            absentes), ou None si la requête a échoué (ex: HTTP 422)
+        """
+        tags = {f"batch_{i}": query for i, query in enumerate(queries)}
+        expression = " or ".join(
+            f'label_replace({query}, "__name__", "{tag}", "", "")'
+            for tag, query in tags.items()
+        )
+        
+        try:
+            result = self._query_range(expression, start_time, end_time, step)
+        except Exception as e:
+            logger.error(f"Error getting batched metric range for {len(queries)} queries: {e}")
+            return None
+        
+        metrics = {}
+        for series in result or []:
+            labels = series.get('metric', {})
+            query = tags.get(labels.get('__name__'))
+            # Comme get_metric_range: une seule série par requête
+            if query is None or query in metrics:
+                continue
+            # Rétablir le __name__ qu'aurait retourné la requête seule
+            if self.is_metric_name(query):
+                labels['__name__'] = query
+            else:
+                labels.pop('__name__', None)
+            metrics[query] = self._build_metric(query, series)
+        
+        logger.info(
+            "Collected {}/{} metrics in one batched query", len(metrics), len(queries)
+        )
+        return metrics
+    
+    @staticmethod
+    def is_metric_name(query: str) -> bool:
+        """Indique si la requête est un nom de métrique brut."""
+        return METRIC_NAME_PATTERN.fullmatch(query) is not None
+    
+    def _build_metric(self, name: str, series: Dict[str, Any]) -> Metric:
+        """
+        Construit un objet Metric depuis une série de query_range.
+        
+        Args:
+            name: Nom à donner à la métrique
+            series: Série Prometheus ({'metric': {...}, 'values': [...]})
+            
+        Returns:
+            Objet Metric avec les valeurs
+        """
+        metric = Metric(
+            name=name,
+            metric_type=MetricType.GAUGE  # On peut améliorer la détection du type
+        )
+        
+        # Extraire les valeurs: une conversion NumPy pour toute la série
+        points = series['values']
+        values = np.fromiter(
+            (data_point[1] for data_point in points),
+            dtype=np.float64,
+            count=len(points)
+        )
+        timestamps = np.fromiter(
+            (data_point[0] for data_point in points),
+            dtype=np.float64,
+            count=len(points)
+        )
+        
+        metric.extend_from_arrays(
+            _local_datetimes(timestamps).tolist(), values, labels=series.get('metric', {})
+        )
+        
+        return metric
+    
     def get_metric_dataframe(
         self,
         query: str,
@@ -177,49 +581,88 @@ class PrometheusClient:
         Returns:
             DataFrame avec colonnes 'timestamp' et 'value'
         """
-        metric = self.get_metric_range(query, start_time, end_time, step)
+        try:
+            result = self._query_range(query, start_time, end_time, step)
+        except Exception as e:
+            logger.error(f"Error getting metric dataframe for '{query}': {e}")
+            return None
         
-        if metric is None or len(metric.values) == 0:
+        if not result or not result[0]['values']:
+            logger.warning("Query '{}' returned no results", query)
             return None
         
-        df = pd.DataFrame([
-            {
-                'timestamp': v.timestamp,
-                'value': v.value
-            }
-            for v in metric.values
-        ])
+        # Conversion directe de la réponse, sans passer par un objet Metric
+        points = np.asarray(result[0]['values'], dtype=object)
+        # Heure locale naïve, comme dans _build_metric
+        timestamps = _local_datetimes(points[:, 0].astype(np.float64))
         
-        return df
+        return pd.DataFrame({
+            'timestamp': timestamps.astype('datetime64[ns]'),
+            'value': points[:, 1].astype(np.float64)
+        })
     
-    def list_metrics(self) -> List[str]:
+    def list_metrics(self, force_refresh: bool = False) -> List[str]:
         """
         Liste toutes les métriques disponibles dans Prometheus.
         
+        La liste est gardée en cache METRICS_LIST_TTL secondes.
+        
+        Args:
+            force_refresh: Ignorer le cache et interroger Prometheus
+        
         Returns:
             Liste des noms de métriques
         """
+        cached = self._metrics_list
+        if (not force_refresh and cached is not None
+                and time.monotonic() - cached[0] < METRICS_LIST_TTL):
+            return list(cached[1])
+        
         try:
             metrics = self.prom.all_metrics()
             logger.info(f"Found {len(metrics)} metrics in Prometheus")
-            return metrics
         except Exception as e:
             logger.error(f"Error listing metrics: {e}")
             return []
+        
+        with self._cache_lock:
+            self._metrics_list = (time.monotonic(), list(metrics))
+        return metrics
     
-    def get_metric_metadata(self, metric_name: str) -> Optional[Dict[str, Any]]:
+    def get_metric_metadata(
+        self,
+        metric_name: str,
+        force_refresh: bool = False
+    ) -> Optional[Dict[str, Any]]:
         """
         Récupère les métadonnées d'une métrique.
         
+        Les réponses sont gardées en cache METADATA_TTL secondes
+        (au plus METADATA_CACHE_MAX_ENTRIES métriques, éviction LRU).
+        
         Args:
             metric_name: Nom de la métrique
+            force_refresh: Ignorer le cache et interroger Prometheus
             
         Returns:
             Dictionnaire avec type, help, etc.
         """
+        if not force_refresh:
+            with self._cache_lock:
+                entry = self._metadata_cache.get(metric_name)
+                if entry is not None and time.monotonic() - entry[0] < METADATA_TTL:
+                    self._metadata_cache.move_to_end(metric_name)
+                    return entry[1]
+        
         try:
             metadata = self.prom.get_metric_metadata(metric_name)
-            return metadata
         except Exception as e:
             logger.error(f"Error getting metadata for '{metric_name}': {e}")
-            return None
\ No newline at end of file
+            return None
+        
+        with self._cache_lock:
+            self._metadata_cache[metric_name] = (time.monotonic(), metadata)
+            self._metadata_cache.move_to_end(metric_name)
+            while len(self._metadata_cache) > METADATA_CACHE_MAX_ENTRIES:
+                self._metadata_cache.popitem(last=False)
+        return metadata
\ No newline at end of file
@@ -4,6 +4,8 @@ import json
 import time
 
 base_url = "http://localhost:8000"
+# Une seule connexion keep-alive pour tous les endpoints
+session = requests.Session()
 
 print("\n" + "="*70)
 print("METRICS AGENT API - COMPREHENSIVE TEST")
@@ -12,7 +14,7 @@ print("="*70 + "\n")
 # Test 1: Health Check
 print("[1] GET /health - Health Check:")
 try:
-    r = requests.get(f"{base_url}/health", timeout=5)
+    r = session.get(f"{base_url}/health", timeout=5)
     if r.status_code == 200:
         print(json.dumps(r.json(), indent=2))
     else:
@@ -23,7 +25,7 @@ except Exception as e:
 # Test 2: Config
 print("\n[2] GET /config - Agent Configuration:")
 try:
-    r = requests.get(f"{base_url}/config", timeout=5)
+    r = session.get(f"{base_url}/config", timeout=5)
     if r.status_code == 200:
         config = r.json()
         print(f"  Agent Name: {config.get('agent', {}).get('name')}")
@@ -38,7 +40,7 @@ except Exception as e:
 # Test 3: Detectors
 print("\n[3] GET /detectors - Available Detectors:")
 try:
-    r = requests.get(f"{base_url}/detectors", timeout=5)
+    r = session.get(f"{base_url}/detectors", timeout=5)
     if r.status_code == 200:
         detectors = r.json()
         print(f"  Total: {detectors.get('total_detectors')}")
@@ -52,7 +54,7 @@ except Exception as e:
 # Test 4: Metrics
 print("\n[4] GET /metrics - Monitored Metrics:")
 try:
-    r = requests.get(f"{base_url}/metrics", timeout=5)
+    r = session.get(f"{base_url}/metrics", timeout=5)
     if r.status_code == 200:
         metrics = r.json()
         print(f"  Total: {metrics.get('total_metrics')}")
@@ -66,7 +68,7 @@ except Exception as e:
 # Test 5: Anomalies
 print("\n[5] GET /anomalies - Latest Anomalies:")
 try:
-    r = requests.get(f"{base_url}/anomalies", timeout=5)
+    r = session.get(f"{base_url}/anomalies", timeout=5)
     if r.status_code == 200:
         anomalies = r.json()
         print(f"  Count: {anomalies.get('count')}")
@@ -92,3 +94,5 @@ print("  GET  /anomalies     - Get latest anomalies")
 print("  POST /analyze       - Trigger analysis")
 print("  GET  /docs          - Swagger UI (http://localhost:8000/docs)")
 print("="*70 + "\n")
+
+session.close()
@@ -0,0 +1,112 @@
+"""
+Tests unitaires du cache des séries du PrometheusCollector.
+
+Le PrometheusClient et l'horloge monotonic sont simulés: aucun serveur
+Prometheus n'est nécessaire.
+"""
+
+from unittest.mock import MagicMock
+from datetime import datetime, timedelta
+import src.collectors.prometheus_collector as collector_module
+from src.collectors.prometheus_collector import PrometheusCollector
+from src.models.metric import Metric, MetricType
+
+
+def make_metric(name, values):
+    """Métrique à une minute d'écart entre points."""
+    metric = Metric(name=name, metric_type=MetricType.GAUGE)
+    for i, value in enumerate(values):
+        metric.add_value(datetime(2024, 1, 1) + timedelta(minutes=i), value)
+    return metric
+
+
+class FakeClock:
+    """Horloge monotonic contrôlée par le test."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class TestCollectorCache:
+    """Tests du cache TTL des séries collectées (cache_ttl)."""
+
+    START, END = 1_700_000_000.0, 1_700_003_600.0
+
+    def make_collector(self, monkeypatch, cache_ttl):
+        """Collecteur branché sur un PrometheusClient simulé."""
+        monkeypatch.delenv("GROQ_API_KEY", raising=False)
+        self.prom = MagicMock()
+        self.prom.check_connection.return_value = True
+        self.prom.get_metric_range.side_effect = lambda query, **kwargs: make_metric(query, [1.0, 2.0])
+        self.prom.get_metrics_range_batch.side_effect = lambda queries, *args, **kwargs: {
+            q: make_metric(q, [3.0, 4.0]) for q in queries
+        }
+        self.clock = FakeClock()
+        monkeypatch.setattr(collector_module, "PrometheusClient", lambda **kwargs: self.prom)
+        monkeypatch.setattr(collector_module, "time", self.clock)
+        return PrometheusCollector(
+            prometheus_url="http://prometheus.test:9090",
+            detectors_config={},
+            metrics_to_monitor=[{"name": "up"}, {"name": "node_load1"}],
+            max_workers=1,
+            cache_ttl=cache_ttl
+        )
+
+    def test_cache_hit_within_ttl(self, monkeypatch):
+        """Même fenêtre avant expiration: pas de nouvelle requête."""
+        collector = self.make_collector(monkeypatch, cache_ttl=60)
+
+        first = collector._collect_metric("up", self.START, self.END)
+        self.clock.now += 59
+        second = collector._collect_metric("up", self.START, self.END)
+
+        assert second is first
+        assert self.prom.get_metric_range.call_count == 1
+
+    def test_cache_expires(self, monkeypatch):
+        """Après cache_ttl secondes, la série est collectée à nouveau."""
+        collector = self.make_collector(monkeypatch, cache_ttl=60)
+
+        first = collector._collect_metric("up", self.START, self.END)
+        self.clock.now += 60
+        second = collector._collect_metric("up", self.START, self.END)
+
+        assert second is not first
+        assert self.prom.get_metric_range.call_count == 2
+        # Entrée expirée purgée: une seule entrée pour cette fenêtre
+        assert len(collector._cache) == 1
+
+    def test_cache_keyed_by_window(self, monkeypatch):
+        """Une autre fenêtre n'est pas servie depuis le cache."""
+        collector = self.make_collector(monkeypatch, cache_ttl=60)
+
+        collector._collect_metric("up", self.START, self.END)
+        collector._collect_metric("up", self.START + 60, self.END + 60)
+
+        assert self.prom.get_metric_range.call_count == 2
+
+    def test_cache_disabled(self, monkeypatch):
+        """cache_ttl=0: chaque appel interroge Prometheus."""
+        collector = self.make_collector(monkeypatch, cache_ttl=0)
+
+        collector._collect_metric("up", self.START, self.END)
+        collector._collect_metric("up", self.START, self.END)
+
+        assert self.prom.get_metric_range.call_count == 2
+        assert collector._cache == {}
+
+    def test_batch_fills_cache(self, monkeypatch):
+        """Les séries d'un lot sont mises en cache; un lot entièrement en cache n'est pas relancé."""
+        collector = self.make_collector(monkeypatch, cache_ttl=60)
+
+        collected = collector._collect_batch(["up", "node_load1"], self.START, self.END)
+        assert set(collected) == {"up", "node_load1"}
+        assert self.prom.get_metrics_range_batch.call_count == 1
+
+        assert collector._collect_batch(["up", "node_load1"], self.START, self.END) == {}
+        assert collector._collect_metric("node_load1", self.START, self.END) is collected["node_load1"]
+        assert self.prom.get_metrics_range_batch.call_count == 1
+        assert self.prom.get_metric_range.call_count == 0
@@ -0,0 +1,127 @@
+"""
+Tests unitaires des résultats des détecteurs.
+
+Vérifient la mémorisation des anomalies par version de la métrique
+(detect_cached) et les résultats des détecteurs par rapport au calcul
+NumPy direct.
+"""
+
+import numpy as np
+from datetime import datetime, timedelta
+from src.models.metric import Metric, MetricType
+from src.detectors.spike_detector import SpikeDetector
+from src.detectors.statistical_detector import StatisticalDetector
+from src.detectors.threshold_detector import ThresholdDetector
+
+
+def make_metric(values, name="test_metric"):
+    """Construit une métrique point par point (une minute d'écart)."""
+    metric = Metric(name=name, metric_type=MetricType.GAUGE)
+    base_time = datetime(2024, 1, 1)
+    for i, value in enumerate(values):
+        metric.add_value(base_time + timedelta(minutes=i), value)
+    return metric
+
+
+class CountingSpikeDetector(SpikeDetector):
+    """SpikeDetector qui compte ses appels à detect()."""
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        self.calls = 0
+
+    def detect(self, metric):
+        self.calls += 1
+        return super().detect(metric)
+
+
+class TestDetectCached:
+    """Tests de la mémorisation des résultats par version de la métrique."""
+
+    def test_same_result_as_detect(self):
+        """detect_cached retourne les mêmes anomalies que detect."""
+        detector = SpikeDetector(config={'min_change_percent': 50.0})
+        metric = make_metric([100, 100, 300, 100, 100])
+
+        expected = [(a.timestamp, a.value) for a in detector.detect(metric)]
+        cached = [(a.timestamp, a.value) for a in detector.detect_cached(metric)]
+        assert cached == expected
+        assert len(cached) == 2
+
+    def test_memoized_until_add_value(self):
+        """Pas de recalcul tant que la métrique ne change pas."""
+        detector = CountingSpikeDetector(config={'min_change_percent': 50.0})
+        metric = make_metric([100, 100, 300])
+
+        first = detector.detect_cached(metric)
+        second = detector.detect_cached(metric)
+        assert detector.calls == 1
+        assert second == first
+        # Nouvelle liste à chaque appel: la modifier ne touche pas au cache
+        assert second is not first
+        second.clear()
+        assert len(detector.detect_cached(metric)) == 1
+
+        metric.add_value(datetime(2024, 1, 1, 1), 1000)
+        assert len(detector.detect_cached(metric)) == 2
+        assert detector.calls == 2
+
+    def test_invalidated_by_add_threshold(self):
+        """add_threshold invalide les résultats mémorisés."""
+        detector = ThresholdDetector(config={'thresholds': {'test_metric': {'critical': 500}}})
+        metric = make_metric([100, 200, 300])
+
+        assert detector.detect_cached(metric) == []
+
+        detector.add_threshold('test_metric', critical=250)
+        anomalies = detector.detect_cached(metric)
+        assert [a.value for a in anomalies] == [300]
+
+    def test_per_detector(self):
+        """Chaque détecteur a ses propres résultats sur une même métrique."""
+        strict = SpikeDetector(config={'min_change_percent': 500.0})
+        loose = SpikeDetector(config={'min_change_percent': 50.0})
+        metric = make_metric([100, 100, 300, 100])
+
+        assert strict.detect_cached(metric) == []
+        assert len(loose.detect_cached(metric)) == 2
+
+    def test_disabled_detector(self):
+        """Un détecteur désactivé ne retourne rien et ne crée pas de cache."""
+        detector = CountingSpikeDetector(config={'enabled': False})
+        metric = make_metric([100, 100, 300])
+
+        assert detector.detect_cached(metric) == []
+        assert detector.calls == 0
+        assert metric._detect_cache is None
+
+
+class TestDetectorsAgainstNumpy:
+    """Résultats des détecteurs comparés au calcul NumPy direct."""
+
+    def test_zscore_uses_metric_stats(self):
+        """Le z-score utilise les statistiques cumulées de la métrique (= NumPy)."""
+        values = np.random.default_rng(4).normal(100, 5, 200)
+        values[150] = 200.0
+        metric = make_metric(values.tolist())
+        detector = StatisticalDetector(config={'z_score_threshold': 3.0})
+
+        anomalies = [a for a in detector.detect(metric) if a.metadata.get('detection_method') == 'z_score']
+
+        mean, std = np.mean(values), np.std(values)
+        expected = set(np.flatnonzero(np.abs(values - mean) / std > 3.0).tolist())
+        assert {int(a.timestamp.hour * 60 + a.timestamp.minute) for a in anomalies} == expected
+        assert 150 in expected
+        assert anomalies[0].metadata['mean'] == round(mean, 2)
+        assert anomalies[0].metadata['std'] == round(std, 2)
+
+    def test_spike_matches_numpy(self):
+        """Les spikes retenus sont ceux du calcul NumPy des variations."""
+        values = np.abs(np.random.default_rng(5).normal(100, 40, 300)) + 1
+        metric = make_metric(values.tolist())
+        detector = SpikeDetector(config={'min_change_percent': 50.0})
+
+        changes = (values[1:] - values[:-1]) / values[:-1] * 100
+        expected = (np.flatnonzero(np.abs(changes) >= 50.0) + 1).tolist()
+        found = [a.timestamp.hour * 60 + a.timestamp.minute for a in detector.detect(metric)]
+        assert found == expected
@@ -0,0 +1,93 @@
+"""
+Tests unitaires du LLMClient (sans appel à l'API Groq).
+
+Vérifient la répartition par anomalie de la réponse d'une validation
+par lot (_parse_batch_response).
+"""
+
+import pytest
+from src.utils.llm_client import LLMClient
+
+
+MODEL = "test-model"
+
+
+class TestParseBatchResponse:
+    """Tests de _parse_batch_response."""
+
+    @pytest.fixture(autouse=True)
+    def client_without_key(self, monkeypatch):
+        """Client sans clé API: aucune connexion au LLM."""
+        monkeypatch.delenv("GROQ_API_KEY", raising=False)
+        self.client = LLMClient()
+
+    def test_results_in_order(self):
+        """Une entrée par anomalie, dans l'ordre des index."""
+        content = (
+            '{"results": ['
+            '{"index": 0, "llm_validation": true, "llm_analysis": "pic réel"},'
+            '{"index": 1, "llm_validation": false, "llm_analysis": "bruit"}'
+            ']}'
+        )
+
+        results = self.client._parse_batch_response(content, 2, MODEL)
+
+        assert results == [
+            {"llm_validation": True, "llm_analysis": "pic réel", "llm_model": MODEL},
+            {"llm_validation": False, "llm_analysis": "bruit", "llm_model": MODEL},
+        ]
+
+    def test_out_of_order_index(self):
+        """Les résultats sont réordonnés selon leur index."""
+        content = (
+            '{"results": ['
+            '{"index": 2, "llm_validation": true, "llm_analysis": "c"},'
+            '{"index": 0, "llm_validation": false, "llm_analysis": "a"},'
+            '{"index": 1, "llm_validation": true, "llm_analysis": "b"}'
+            ']}'
+        )
+
+        results = self.client._parse_batch_response(content, 3, MODEL)
+
+        assert [r["llm_analysis"] for r in results] == ["a", "b", "c"]
+        assert [r["llm_validation"] for r in results] == [False, True, True]
+
+    def test_missing_index(self):
+        """Un résultat manquant fait échouer le lot."""
+        content = '{"results": [{"index": 0, "llm_validation": true, "llm_analysis": "a"}]}'
+
+        with pytest.raises(ValueError, match=r"missing results for \[1\]"):
+            self.client._parse_batch_response(content, 2, MODEL)
+
+    def test_invalid_index_ignored(self):
+        """Les entrées sans index entier ne comptent pas comme résultat."""
+        content = (
+            '{"results": ['
+            '{"index": "0", "llm_validation": true},'
+            '{"llm_validation": true},'
+            '"texte"'
+            ']}'
+        )
+
+        with pytest.raises(ValueError, match="missing results"):
+            self.client._parse_batch_response(content, 1, MODEL)
+
+    def test_json_wrapped_in_prose(self):
+        """Le JSON entouré de texte (ou d'un bloc markdown) est extrait."""
+        content = (
+            "Voici mon analyse:\n```json\n"
+            '{"results": [{"index": 0, "llm_validation": true, "llm_analysis": "ok"}]}'
+            "\n```\nN'hésitez pas si besoin."
+        )
+
+        results = self.client._parse_batch_response(content, 1, MODEL)
+
+        assert results == [{"llm_validation": True, "llm_analysis": "ok", "llm_model": MODEL}]
+
+    def test_invalid_json(self):
+        """Une réponse sans objet JSON exploitable lève ValueError."""
+        with pytest.raises(ValueError, match="Invalid batch LLM response"):
+            self.client._parse_batch_response("Je ne peux pas répondre.", 1, MODEL)
+
+        with pytest.raises(ValueError):
+            self.client._parse_batch_response("", 1, MODEL)
@@ -0,0 +1,218 @@
+"""
+Tests unitaires du modèle Metric.
+
+Vérifient le stockage par colonnes (tampon float64, vues values_np et
+timestamps_np), la fenêtre glissante max_history et les statistiques
+cumulées (mean, std) par rapport au résultat NumPy direct.
+"""
+
+import numpy as np
+import pytest
+from datetime import datetime, timedelta
+from src.models.metric import Metric, MetricType
+
+
+BASE_TIME = datetime(2024, 1, 1)
+
+
+def make_metric(values, max_history=None, labels=None):
+    """Construit une métrique point par point avec add_value."""
+    metric = Metric(name="test_metric", metric_type=MetricType.GAUGE, max_history=max_history)
+    for i, value in enumerate(values):
+        metric.add_value(BASE_TIME + timedelta(minutes=i), value, labels)
+    return metric
+
+
+def timestamps(n, offset=0):
+    """n timestamps consécutifs (une minute d'écart) à partir de offset."""
+    return [BASE_TIME + timedelta(minutes=offset + i) for i in range(n)]
+
+
+class TestMetricStorage:
+    """Tests du tampon de valeurs et des vues NumPy."""
+
+    def test_values_np_matches_added_values(self):
+        """values_np contient les valeurs ajoutées, en float64."""
+        values = np.random.default_rng(0).normal(100, 10, 50)
+        metric = make_metric(values.tolist())
+
+        assert len(metric) == 50
+        assert metric.values_np.dtype == np.float64
+        np.testing.assert_array_equal(metric.values_np, values)
+        assert metric.get_values_array() == values.tolist()
+        assert [v.value for v in metric.values] == values.tolist()
+
+    def test_values_np_is_read_only(self):
+        """La vue partagée n'est pas modifiable."""
+        metric = make_metric([1.0, 2.0, 3.0])
+
+        with pytest.raises(ValueError):
+            metric.values_np[0] = 42.0
+
+    def test_views_survive_appends(self):
+        """Une vue déjà distribuée n'est pas modifiée par les ajouts suivants."""
+        metric = make_metric([1.0, 2.0, 3.0])
+        view = metric.values_np
+
+        for i in range(100):
+            metric.add_value(BASE_TIME + timedelta(hours=1, minutes=i), 1000.0 + i)
+
+        np.testing.assert_array_equal(view, [1.0, 2.0, 3.0])
+        assert len(metric.values_np) == 103
+        assert metric.values_np[-1] == 1099.0
+
+    def test_timestamps_np_aligned_with_values(self):
+        """timestamps_np est indexé comme values_np."""
+        metric = make_metric([5.0, 6.0, 7.0])
+
+        assert list(metric.timestamps_np) == timestamps(3)
+        assert metric.get_timestamps_array() == timestamps(3)
+        assert metric.get_latest_value().value == 7.0
+        assert metric.get_latest_value().timestamp == timestamps(3)[-1]
+
+    def test_version_changes_on_append(self):
+        """La version change à chaque ajout de points."""
+        metric = make_metric([1.0])
+        version = metric.version
+
+        metric.add_value(BASE_TIME + timedelta(minutes=1), 2.0)
+        assert metric.version != version
+
+        version = metric.version
+        metric.extend_from_arrays(timestamps(2, offset=2), np.array([3.0, 4.0]))
+        assert metric.version != version
+
+    def test_labels_per_point(self):
+        """Les labels différents sont conservés point par point."""
+        metric = Metric(name="test_metric", metric_type=MetricType.GAUGE)
+        metric.add_value(BASE_TIME, 1.0, {"instance": "a"})
+        metric.add_value(BASE_TIME + timedelta(minutes=1), 2.0, {"instance": "a"})
+        metric.add_value(BASE_TIME + timedelta(minutes=2), 3.0, {"instance": "b"})
+
+        assert [v.labels["instance"] for v in metric.values] == ["a", "a", "b"]
+        assert metric.labels == {"instance": "a"}
+
+
+class TestMetricExtend:
+    """Tests de extend_from_arrays."""
+
+    def test_extend_empty_metric(self):
+        """Sur une métrique vide, le tableau fourni devient le tampon sans être modifié."""
+        values = np.array([1.0, 2.0, 3.0, 4.0])
+        metric = Metric(name="test_metric", metric_type=MetricType.GAUGE)
+        metric.extend_from_arrays(timestamps(4), values, labels={"job": "node"})
+
+        np.testing.assert_array_equal(metric.values_np, values)
+        assert list(metric.timestamps_np) == timestamps(4)
+        assert metric.labels == {"job": "node"}
+
+        # Les ajouts suivants ne touchent pas au tableau de l'appelant
+        metric.add_value(BASE_TIME + timedelta(minutes=4), 5.0)
+        metric.extend_from_arrays(timestamps(3, offset=5), np.array([6.0, 7.0, 8.0]))
+        np.testing.assert_array_equal(values, [1.0, 2.0, 3.0, 4.0])
+        np.testing.assert_array_equal(metric.values_np, np.arange(1.0, 9.0))
+
+    def test_extend_non_empty_metric(self):
+        """Sur une métrique non vide, les points sont ajoutés à la suite."""
+        metric = make_metric([1.0, 2.0])
+        metric.extend_from_arrays(timestamps(3, offset=2), np.array([3.0, 4.0, 5.0]))
+
+        np.testing.assert_array_equal(metric.values_np, [1.0, 2.0, 3.0, 4.0, 5.0])
+        assert list(metric.timestamps_np) == timestamps(5)
+        assert metric == make_metric([1.0, 2.0, 3.0, 4.0, 5.0])
+
+    def test_extend_length_mismatch(self):
+        """Des tableaux de tailles différentes sont refusés."""
+        metric = Metric(name="test_metric", metric_type=MetricType.GAUGE)
+
+        with pytest.raises(ValueError):
+            metric.extend_from_arrays(timestamps(2), np.array([1.0, 2.0, 3.0]))
+
+
+class TestMetricHistory:
+    """Tests de la fenêtre glissante max_history."""
+
+    def test_add_value_past_max_history(self):
+        """Seuls les max_history derniers points sont gardés."""
+        values = np.arange(100, dtype=np.float64)
+        metric = make_metric(values.tolist(), max_history=10)
+
+        assert len(metric) == 10
+        np.testing.assert_array_equal(metric.values_np, values[-10:])
+        assert list(metric.timestamps_np) == timestamps(100)[-10:]
+        assert metric.get_timestamps_array() == timestamps(100)[-10:]
+        assert metric.get_latest_value().value == 99.0
+
+    def test_extend_past_max_history(self):
+        """extend_from_arrays garde aussi les max_history derniers points."""
+        metric = make_metric([1.0, 2.0, 3.0], max_history=5)
+        metric.extend_from_arrays(timestamps(4, offset=3), np.array([4.0, 5.0, 6.0, 7.0]))
+
+        np.testing.assert_array_equal(metric.values_np, [3.0, 4.0, 5.0, 6.0, 7.0])
+        assert list(metric.timestamps_np) == timestamps(7)[-5:]
+
+        # Lot plus grand que la fenêtre sur une métrique vide
+        metric = Metric(name="test_metric", metric_type=MetricType.GAUGE, max_history=3)
+        metric.extend_from_arrays(timestamps(6), np.arange(6.0))
+        np.testing.assert_array_equal(metric.values_np, [3.0, 4.0, 5.0])
+
+    def test_labels_follow_window(self):
+        """Les labels par point restent alignés après réallocation."""
+        metric = Metric(name="test_metric", metric_type=MetricType.GAUGE, max_history=4)
+        for i in range(20):
+            metric.add_value(BASE_TIME + timedelta(minutes=i), float(i), {"i": str(i % 2)})
+
+        assert [v.labels["i"] for v in metric.values] == ["0", "1", "0", "1"]
+        assert [v.value for v in metric.values] == [16.0, 17.0, 18.0, 19.0]
+
+    def test_invalid_max_history(self):
+        """max_history doit être au moins 1."""
+        with pytest.raises(ValueError):
+            Metric(name="test_metric", metric_type=MetricType.GAUGE, max_history=0)
+
+
+class TestMetricStats:
+    """Tests des statistiques cumulées mean et std."""
+
+    def test_empty_metric(self):
+        """Moyenne et écart-type valent nan sur une métrique vide."""
+        metric = Metric(name="test_metric", metric_type=MetricType.GAUGE)
+
+        assert np.isnan(metric.mean)
+        assert np.isnan(metric.std)
+
+    def test_add_value_matches_numpy(self):
+        """Mise à jour point par point (Welford) = np.mean / np.std."""
+        values = np.random.default_rng(1).normal(1e6, 50, 500)
+        metric = make_metric(values.tolist())
+
+        assert metric.mean == pytest.approx(np.mean(values), rel=1e-12)
+        assert metric.std == pytest.approx(np.std(values), rel=1e-9)
+
+    def test_extend_matches_numpy(self):
+        """Combinaison par lots (Chan) = np.mean / np.std."""
+        rng = np.random.default_rng(2)
+        first, second = rng.normal(10, 2, 30), rng.normal(50, 5, 70)
+        metric = Metric(name="test_metric", metric_type=MetricType.GAUGE)
+        metric.extend_from_arrays(timestamps(30), first)
+        metric.add_value(BASE_TIME + timedelta(minutes=30), 12.5)
+        metric.extend_from_arrays(timestamps(70, offset=31), second)
+
+        expected = np.concatenate([first, [12.5], second])
+        assert metric.mean == pytest.approx(np.mean(expected), rel=1e-12)
+        assert metric.std == pytest.approx(np.std(expected), rel=1e-9)
+
+    def test_window_matches_numpy(self):
+        """Avec max_history, les statistiques portent sur la fenêtre."""
+        values = np.random.default_rng(3).normal(0, 1, 200)
+        metric = make_metric(values.tolist(), max_history=25)
+
+        assert metric.mean == pytest.approx(np.mean(values[-25:]), rel=1e-12)
+        assert metric.std == pytest.approx(np.std(values[-25:]), rel=1e-12)
+
+    def test_constant_window_has_zero_std(self):
+        """Une fenêtre constante a un écart-type exactement nul."""
+        metric = make_metric([1.3] * 5 + [7.1] * 10, max_history=10)
+
+        assert metric.mean == 7.1
+        assert metric.std == 0.0
@@ -0,0 +1,175 @@
+"""
+Tests unitaires du PrometheusClient.
+
+Les réponses de Prometheus sont simulées par un transport httpx: aucun
+serveur n'est nécessaire.
+"""
+
+import re
+import httpx
+from datetime import datetime
+from src.utils import prometheus_client
+from src.utils.prometheus_client import PrometheusClient
+
+
+TAG_PATTERN = re.compile(r'label_replace\((.+?), "__name__", "(batch_\d+)", "", ""\)')
+
+
+def series(name, labels, values):
+    """Série de query_range au format de l'API Prometheus."""
+    return {"metric": {"__name__": name, **labels}, "values": values}
+
+
+def matrix(result):
+    """Réponse query_range réussie."""
+    return {"status": "success", "data": {"resultType": "matrix", "result": result}}
+
+
+class TestRangeBatch:
+    """Tests de get_metrics_range_batch (requêtes combinées par label_replace)."""
+
+    def setup_method(self):
+        """Client branché sur un transport simulé."""
+        self.requests = []
+        self.handler = None
+        self.client = PrometheusClient(url="http://prometheus.test:9090")
+        self.client._http.close()
+        self.client._http = httpx.Client(transport=httpx.MockTransport(self._handle))
+
+    def teardown_method(self):
+        self.client.close()
+
+    def _handle(self, request):
+        self.requests.append(request)
+        return self.handler(request)
+
+    def test_single_combined_query(self):
+        """Une seule requête: un label_replace par expression, combinés par 'or'."""
+        self.handler = lambda request: httpx.Response(200, json=matrix([]))
+        queries = ["up", "rate(http_requests_total[5m])", "node_load1"]
+
+        self.client.get_metrics_range_batch(queries, 1000.0, 1600.0, step="1m")
+
+        assert len(self.requests) == 1
+        params = self.requests[0].url.params
+        assert self.requests[0].url.path == "/api/v1/query_range"
+        assert (params["start"], params["end"], params["step"]) == ("1000.0", "1600.0", "1m")
+        parts = params["query"].split(" or ")
+        assert [TAG_PATTERN.fullmatch(p).groups() for p in parts] == [
+            ("up", "batch_0"),
+            ("rate(http_requests_total[5m])", "batch_1"),
+            ("node_load1", "batch_2"),
+        ]
+
+    def test_series_split_by_query(self):
+        """Chaque série revient à sa requête, __name__ d'origine rétabli."""
+        self.handler = lambda request: httpx.Response(200, json=matrix([
+            # Ordre de réponse différent de l'ordre des requêtes
+            series("batch_1", {"job": "api"}, [[1000, "0.5"], [1060, "1.5"]]),
+            series("batch_0", {"instance": "a:9100"}, [[1000, "1"], [1060, "0"], [1120, "1"]]),
+        ]))
+        queries = ["up", "rate(http_requests_total[5m])", "node_load1"]
+
+        metrics = self.client.get_metrics_range_batch(queries, 1000.0, 1200.0)
+
+        # Requête sans données: absente du résultat
+        assert set(metrics) == {"up", "rate(http_requests_total[5m])"}
+
+        up = metrics["up"]
+        assert up.name == "up"
+        assert up.get_values_array() == [1.0, 0.0, 1.0]
+        assert up.get_timestamps_array() == [
+            datetime.fromtimestamp(ts) for ts in (1000, 1060, 1120)
+        ]
+        # Nom de métrique brut: __name__ rétabli
+        assert up.labels == {"__name__": "up", "instance": "a:9100"}
+
+        rate = metrics["rate(http_requests_total[5m])"]
+        assert rate.get_values_array() == [0.5, 1.5]
+        # Expression: pas de __name__, comme une requête seule
+        assert rate.labels == {"job": "api"}
+
+    def test_one_series_per_query(self):
+        """Comme get_metric_range: seule la première série d'une requête est gardée."""
+        self.handler = lambda request: httpx.Response(200, json=matrix([
+            series("batch_0", {"instance": "a"}, [[1000, "1"]]),
+            series("batch_0", {"instance": "b"}, [[1000, "2"]]),
+            series("unrelated", {}, [[1000, "3"]]),
+        ]))
+
+        metrics = self.client.get_metrics_range_batch(["up"], 1000.0, 1200.0)
+
+        assert list(metrics) == ["up"]
+        assert metrics["up"].labels["instance"] == "a"
+        assert metrics["up"].get_values_array() == [1.0]
+
+    def test_http_error_returns_none(self):
+        """Requête refusée (ex: HTTP 422): None, pour repli requête par requête."""
+        self.handler = lambda request: httpx.Response(422, json={"status": "error"})
+
+        assert self.client.get_metrics_range_batch(["up", "node_load1"], 1000.0, 1200.0) is None
+
+
+class TestRetry:
+    """Tests de la politique de retry des requêtes httpx (_get)."""
+
+    def setup_method(self):
+        """Client branché sur un transport simulé, sans attente réelle."""
+        self.requests = []
+        self.responses = []
+        self.delays = []
+        self.client = PrometheusClient(url="http://prometheus.test:9090")
+        self.client._http.close()
+        self.client._http = httpx.Client(transport=httpx.MockTransport(self._handle))
+
+    def teardown_method(self):
+        self.client.close()
+
+    def _handle(self, request):
+        self.requests.append(request)
+        return self.responses.pop(0)
+
+    def test_retry_after_unavailable(self, monkeypatch):
+        """Un 503 suivi d'un 200: la requête aboutit au second essai."""
+        monkeypatch.setattr(prometheus_client.time, "sleep", self.delays.append)
+        self.responses = [
+            httpx.Response(503, text="unavailable"),
+            httpx.Response(200, json=matrix([series("batch_0", {}, [[1000, "1"]])])),
+        ]
+
+        metrics = self.client.get_metrics_range_batch(["up"], 1000.0, 1200.0)
+
+        assert len(self.requests) == 2
+        assert metrics["up"].get_values_array() == [1.0]
+        # Délai de la politique PrometheusConnect (backoff_factor=1)
+        assert self.delays == [1.0]
+
+    def test_retry_after_header(self, monkeypatch):
+        """L'en-tête Retry-After d'un 429 fixe le délai."""
+        monkeypatch.setattr(prometheus_client.time, "sleep", self.delays.append)
+        self.responses = [
+            httpx.Response(429, headers={"Retry-After": "2"}),
+            httpx.Response(200, json={"status": "success", "data": {"result": []}}),
+        ]
+
+        assert self.client._query("up") == []
+        assert self.delays == [2.0]
+
+    def test_retries_exhausted(self, monkeypatch):
+        """Après retry.total essais supplémentaires, l'erreur est remontée."""
+        monkeypatch.setattr(prometheus_client.time, "sleep", self.delays.append)
+        total = self.client._retry.total
+        self.responses = [httpx.Response(503) for _ in range(total + 1)]
+
+        assert self.client.get_metrics_range_batch(["up"], 1000.0, 1200.0) is None
+        assert len(self.requests) == total + 1
+        assert self.delays == [2.0 ** i for i in range(total)]
+
+    def test_client_error_not_retried(self, monkeypatch):
+        """Un statut hors status_forcelist (ex: 400) n'est pas retenté."""
+        monkeypatch.setattr(prometheus_client.time, "sleep", self.delays.append)
+        self.responses = [httpx.Response(400, json={"status": "error"})]
+
+        assert self.client.get_metrics_range_batch(["up"], 1000.0, 1200.0) is None
+        assert len(self.requests) == 1
+        assert self.delays == []
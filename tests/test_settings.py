@@ -0,0 +1,77 @@
+"""
+Tests unitaires du chargement de la configuration (Settings).
+
+Vérifient que le cache des fichiers YAML ne partage pas la configuration
+entre instances de Settings.
+"""
+
+import pytest
+from src.config.settings import Settings
+from src.detectors.threshold_detector import ThresholdDetector
+
+
+CONFIG_YAML = """
+agent:
+  name: "metrics-agent"
+detectors:
+  threshold_detector:
+    enabled: true
+    thresholds:
+      cpu_usage:
+        warning: 80
+        critical: 95
+"""
+
+RULES_YAML = """
+metrics:
+  cpu_usage:
+    detectors:
+      - threshold_detector
+"""
+
+
+@pytest.fixture
+def config_dir(tmp_path):
+    """Répertoire de configuration temporaire."""
+    (tmp_path / "config.yaml").write_text(CONFIG_YAML)
+    (tmp_path / "metrics_rules.yaml").write_text(RULES_YAML)
+    return tmp_path
+
+
+class TestSettingsIsolation:
+    """Chaque Settings a sa propre copie de la configuration."""
+
+    def test_detector_mutation_not_shared(self, config_dir):
+        """add_threshold sur un Settings n'apparaît pas dans un autre."""
+        first = Settings(config_dir=str(config_dir))
+        detector = ThresholdDetector(config=first.get_detector_config('threshold_detector'))
+        detector.add_threshold('injected_metric', critical=10)
+        assert 'injected_metric' in first.get_detector_config('threshold_detector')['thresholds']
+
+        second = Settings(config_dir=str(config_dir))
+        thresholds = second.get_detector_config('threshold_detector')['thresholds']
+        assert set(thresholds) == {'cpu_usage'}
+
+        # Rechargement: configuration des fichiers, sans la modification
+        first.reload()
+        assert set(first.get_detector_config('threshold_detector')['thresholds']) == {'cpu_usage'}
+
+    def test_config_mutation_not_shared(self, config_dir):
+        """Modifier le dict config d'un Settings ne touche pas les suivants."""
+        first = Settings(config_dir=str(config_dir))
+        first.config['agent']['name'] = 'modified'
+        first.rules.clear()
+
+        second = Settings(config_dir=str(config_dir))
+        assert second.config['agent']['name'] == 'metrics-agent'
+        assert 'cpu_usage' in second.rules['metrics']
+
+    def test_cache_follows_file_changes(self, config_dir):
+        """Un fichier modifié est relu (cache invalidé par mtime/taille)."""
+        first = Settings(config_dir=str(config_dir))
+        assert first.config['agent']['name'] == 'metrics-agent'
+
+        (config_dir / "config.yaml").write_text(CONFIG_YAML.replace('"metrics-agent"', '"other-agent"'))
+
+        second = Settings(config_dir=str(config_dir))
+        assert second.config['agent']['name'] == 'other-agent'